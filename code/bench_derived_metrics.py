@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from math import sqrt, atan2, degrees
+from derived_metrics import derive
+
+# Benchmark of the vectorized derived telemetry (plain and fused) against the old row-wise
+# DataFrame.apply code
+# Usage: python bench_derived_metrics.py [rows ...]   (default: 1000 10000 100000)
+
+LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "Flight4.csv")
+# Rocket_Drift is not compared: derive() computes it in the East/North plane (geodesy.py),
+# the old code scaled degrees by 111139 m and called the pad 0/0 a position
+DERIVED = ["Total_Acceleration", "Vertical_Acceleration", "Vertical_Velocity",
+           "Pitch", "Roll", "Yaw"]
+
+
+def derive_apply(df):
+    # The previous post_flight_plot.py implementation, kept for comparison
+    initial_total_acc = sqrt(df["Accel_X (m/s²)"][0]**2 + df["Accel_Y (m/s²)"][0]**2 + df["Accel_Z (m/s²)"][0]**2)
+    initial_vertical_acc = df["Accel_Z (m/s²)"][0]
+    initial_roll = degrees(atan2(df["Accel_X (m/s²)"][0], sqrt(df["Accel_Y (m/s²)"][0]**2 + df["Accel_Z (m/s²)"][0]**2)))
+    df["Total_Acceleration"] = df[["Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)"]].apply(
+        lambda row: sqrt(row.iloc[0]**2 + row.iloc[1]**2 + row.iloc[2]**2), axis=1) - initial_total_acc
+    df["Vertical_Acceleration"] = df["Accel_Z (m/s²)"] - initial_vertical_acc
+    df["Vertical_Velocity"] = df["Altitude (m)"].diff().fillna(0)
+    df["Pitch"] = df[["Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)"]].apply(
+        lambda row: degrees(atan2(row.iloc[1], sqrt(row.iloc[0]**2 + row.iloc[2]**2))), axis=1)
+    df["Roll"] = df[["Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)"]].apply(
+        lambda row: degrees(atan2(row.iloc[0], sqrt(row.iloc[1]**2 + row.iloc[2]**2))), axis=1) - initial_roll
+    df["Yaw"] = df[["Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)"]].apply(
+        lambda row: degrees(atan2(row.iloc[2], sqrt(row.iloc[0]**2 + row.iloc[1]**2))), axis=1)
+    df["Rocket_Drift"] = df.apply(
+        lambda row: sqrt((row["GPS_Latitude"] - df["GPS_Latitude"][0])**2 +
+                         (row["GPS_Longitude"] - df["GPS_Longitude"][0])**2) * 111139,
+        axis=1)
+    return df
+
+
+def make_log(rows):
+    # Flight4 repeated to the requested length, with the 1 Hz time axis post_flight_plot.py uses
+    base = pd.read_csv(LOG, sep=";")
+    df = pd.concat([base] * (rows // len(base) + 1), ignore_index=True).iloc[:rows].copy()
+    df["Time"] = range(len(df))
+    return df
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    func(df)
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 10000, 100000]
+    # fused=False: the apply code has no state estimator, compare the same (accelerometer-only) math.
+    # fused=True (the default of derive()) adds the state estimator and is timed as well
+    print(f"{'rows':>8} {'apply (s)':>10} {'vectorized (s)':>15} {'speedup':>8} {'fused (s)':>10} {'speedup':>8}")
+    for rows in sizes:
+        old, new, fused = make_log(rows), make_log(rows), make_log(rows)
+        t_old = timed(derive_apply, old)
+        t_new = timed(lambda df: derive(df, time_column="Time", fused=False), new)
+        t_fused = timed(lambda df: derive(df, time_column="Time"), fused)
+        for name in DERIVED:
+            if not np.allclose(old[name], new[name]):
+                print(f"⚠️ {name} differs between implementations")
+        print(f"{rows:>8} {t_old:>10.3f} {t_new:>15.4f} {t_old / t_new:>7.0f}x {t_fused:>10.4f} {t_old / t_fused:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
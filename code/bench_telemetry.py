@@ -0,0 +1,395 @@
+import os
+import sys
+import json
+import time
+import socket
+import platform
+import argparse
+import datetime
+import resource
+import tracemalloc
+import subprocess
+import multiprocessing
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import mock_sensors
+from flight_log import load_flight
+from derived_metrics import derive
+from state_estimator import StateEstimator
+from event_detector import FlightEventDetector
+from scheduler import RateScheduler
+from telemetry_packet import Sample, encode, decode, FORMAT_TEXT, HEALTH_STAGES
+from telemetry_receiver import TelemetryReceiver
+from telemetry_replay import log_samples
+from health import HealthMonitor
+from ground_station import GroundProcessor, create_dashboard
+
+# Throughput, latency, CPU and memory of the whole telemetry chain
+#
+#   python bench_telemetry.py                                   everything, saved in bench_results/
+#   python bench_telemetry.py --only loopback --rates 100 1000 0 --duration 10
+#   python bench_telemetry.py --compare bench_results/<old>.json        this run against an older one
+#   python bench_telemetry.py --compare <old>.json <new>.json           two saved runs, nothing is run
+#
+# Components (in this process, on Flight4): mock sensor reads, the on-board estimator and event
+# detector, the health instrumentation of one sample (all stages timed), packet encode/decode,
+# the ground station processing per frame (blocks of 5 samples = 100 Hz at 20 FPS, and 500), one
+# dashboard frame (blit and full redraw, on the Agg canvas so no screen is needed; the blit to
+# the screen itself is not included) and the post-flight loading.
+#
+# Loopback: a sender process samples the mock sensors (replaying Flight4) at each rate with the
+# flight computer's scheduler and sends every sample over UDP on 127.0.0.1, a ground station
+# process receives and plots them every 50 ms like receive_live2.py. Latency is from the sensor
+# read to the end of the frame that plotted the sample (both processes use CLOCK_MONOTONIC).
+# Rate 0 sends as fast as possible. Both run in their own process, so CPU and memory (max RSS)
+# are per component. All numbers are saved with the git revision for comparison between versions.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOG = os.path.join(HERE, "..", "data", "Flight4.csv")
+RESULTS_DIR = os.path.join(HERE, "bench_results")
+DEFAULT_RATES = [100, 500, 1000, 5000, 0]
+DEFAULT_DURATION = 5.0  # Seconds of sending per rate
+FRAME_INTERVAL = 0.05  # Like receive_live2.py
+FIGURE_SIZE = (16, 12)
+PORT = 5015
+SEA_LEVEL_PRESSURE = 1023.30  # hPa, as in send_data3.py
+
+# Metrics where a larger value is better; for all others (time, CPU, memory, loss) smaller is better
+HIGHER_IS_BETTER = ("samples_per_s", "fps", "sent_per_s", "plotted_per_s")
+
+
+def max_rss_mb():
+    # Peak resident memory of this process. VmHWM starts over in a new program, ru_maxrss would
+    # include the parent's peak from before the exec of a spawned process
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024  # Bytes on macOS, KB elsewhere
+
+
+def measure(func, n):
+    # func() processes n samples; timed once, then run again under tracemalloc for the memory peak
+    wall, cpu = time.perf_counter(), time.process_time()
+    func()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "samples_per_s": n / wall,
+        "us_per_sample": wall / n * 1e6,
+        "cpu_percent": cpu / wall * 100,
+        "peak_alloc_kb": peak / 1024,
+    }
+
+
+def in_blocks(samples, size):
+    return [samples[i:i + size] for i in range(0, len(samples), size)]
+
+
+def offscreen_dashboard(blit):
+    fig = Figure(figsize=FIGURE_SIZE)
+    FigureCanvasAgg(fig)
+    dashboard, lines = create_dashboard(fig, blit=blit)
+    fig.tight_layout()
+    return dashboard, lines
+
+
+def bench_components():
+    results = {}
+    samples = log_samples(load_flight(LOG))
+    n = len(samples)
+
+    # Flight computer: sensor reads (mocked), on-board estimation, packet encoding
+    mock_sensors.use_log(LOG)
+    i2c = mock_sensors.I2C()
+    baro, imu = mock_sensors.DPS310(i2c), mock_sensors.ICM20948(i2c)
+
+    def read_sensors():
+        for _ in range(n):
+            imu.acceleration, imu.gyro, imu.magnetic, baro.pressure, baro.temperature
+
+    def estimate():
+        estimator, detector = StateEstimator(), FlightEventDetector()
+        for s in samples:
+            altitude, velocity, _, _, _ = estimator.update(
+                s.t, s.altitude, s.accel_x, s.accel_y, s.accel_z, s.gyro_x, s.gyro_y, s.gyro_z)
+            detector.update(s.t, altitude, velocity,
+                            (s.accel_x ** 2 + s.accel_y ** 2 + s.accel_z ** 2) ** 0.5)
+
+    def instrument():
+        # Every timed stage of send_data3.py once per sample, as if all ran at the IMU rate
+        health, clock = HealthMonitor(), time.perf_counter
+        for _ in range(n):
+            for stage in HEALTH_STAGES:
+                start = clock()
+                health.add(stage, clock() - start)
+
+    results["sensor_read"] = measure(read_sensors, n)
+    results["health_instrumentation"] = measure(instrument, n)
+    results["onboard_estimate"] = measure(estimate, n)
+    results["encode"] = measure(lambda: [encode(s) for s in samples], n)
+    results["encode_text"] = measure(lambda: [encode(s, FORMAT_TEXT) for s in samples], n)
+
+    # Ground station: decoding, processing per frame, drawing
+    packets = [encode(s) for s in samples]
+    results["decode"] = measure(lambda: [decode(p) for p in packets], n)
+    for size in (5, 500):
+        blocks = in_blocks(samples, size)
+
+        def process(blocks=blocks):
+            processor = GroundProcessor()
+            for block in blocks:
+                processor.process(block)
+
+        results[f"ground_process_{size}"] = measure(process, n)
+
+    for blit in (True, False):
+        processor = GroundProcessor()
+        dashboard, lines = offscreen_dashboard(blit)
+        # A full window of history, redrawn at the last sample (no rescale in the timed frames);
+        # a frame includes handing the lines to matplotlib (decimated to the axes width)
+        for block in in_blocks(samples * (processor.history.capacity // n + 1), 500):
+            processor.process(block)
+        dashboard.refresh(processor.update_lines(lines))
+        frames = 20
+        start = time.perf_counter()
+        for _ in range(frames):
+            dashboard.refresh(processor.update_lines(lines))
+        elapsed = time.perf_counter() - start
+        results["frame_blit" if blit else "frame_full"] = {
+            "ms_per_frame": elapsed / frames * 1000, "fps": frames / elapsed}
+
+    # Post-flight: parsing the CSV, the cached load and the derived metrics
+    results["load_parse"] = measure(lambda: load_flight(LOG, use_cache=False), n)
+    load_flight(LOG)
+    results["load_cached"] = measure(lambda: load_flight(LOG), n)
+    df = load_flight(LOG)
+    df["Time"] = df["Time (s)"]
+    results["derive"] = measure(lambda: derive(df.copy(), time_column="Time"), n)
+    return results
+
+
+def sender(rate, duration, port, start, conn):
+    # Flight computer side of the loopback run: mock sensors -> Sample -> encode -> UDP
+    mock_sensors.use_log(LOG)
+    i2c = mock_sensors.I2C()
+    baro, imu = mock_sensors.DPS310(i2c), mock_sensors.ICM20948(i2c)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = ("127.0.0.1", port)
+    scheduler = RateScheduler()
+    stats = {"sent": 0, "send_errors": 0}
+
+    end = start + duration
+
+    def sample(now):
+        if now >= end:
+            scheduler.stop()
+            return
+        accel, gyro, mag = imu.acceleration, imu.gyro, imu.magnetic
+        altitude = 44330 * (1.0 - (baro.pressure / SEA_LEVEL_PRESSURE) ** (1.0 / 5.255))
+        s = Sample(stats["sent"] + stats["send_errors"], now - start, baro.temperature, altitude, 0.0,
+                   *accel, *gyro, *mag, 0.0, 0.0)
+        try:
+            sock.sendto(encode(s), address)
+            stats["sent"] += 1
+        except OSError:
+            stats["send_errors"] += 1  # e.g. ENOBUFS when the receiver's buffer is full
+
+    while time.monotonic() < start:
+        time.sleep(0.001)
+    cpu = time.process_time()
+    if rate:
+        scheduler.add("imu", rate, sample)
+        scheduler.run()
+        stats["overruns"] = scheduler.tasks["imu"].overruns
+    else:
+        now = time.monotonic()
+        while now < end:
+            sample(now)
+            now = time.monotonic()
+        stats["overruns"] = 0
+    stats["cpu_percent"] = (time.process_time() - cpu) / duration * 100
+    stats["max_rss_mb"] = max_rss_mb()
+    conn.send(stats)
+
+
+def ground_station(duration, port, start, ready, conn):
+    # Ground station side: receive_live2.py's update loop on an off-screen figure
+    receiver = TelemetryReceiver("127.0.0.1", port)
+    receiver.start()
+    processor = GroundProcessor(on_event=lambda e: dashboard.add_marker(e.t, e.name))
+    dashboard, lines = offscreen_dashboard(blit=True)
+    dashboard.refresh()  # First full draw of the figure, not part of the measurement
+    redraws = dashboard.full_redraws
+    latencies, frames, frame_time = [], 0, 0.0
+    ready.set()
+
+    end = start + duration + 0.5  # Grace period for the last packets
+    next_frame = start
+    cpu = time.process_time()
+    while True:
+        now = time.monotonic()
+        if now < next_frame:
+            time.sleep(next_frame - now)
+        next_frame += FRAME_INTERVAL
+        pending = receiver.drain()
+        if pending:
+            frame_start = time.monotonic()
+            processor.process(pending)
+            dashboard.refresh(processor.update_lines(lines))
+            done = time.monotonic()
+            latencies.append(done - start - np.array([s.t for s in pending]))
+            frames += 1
+            frame_time += done - frame_start
+        if time.monotonic() >= end:
+            break
+    cpu = time.process_time() - cpu
+    receiver.stop()
+
+    latency = np.concatenate(latencies) * 1000 if latencies else np.array([np.nan])
+    conn.send({
+        "received": receiver.received, "lost": receiver.lost, "late": receiver.late,
+        "overflow": receiver.overflow,
+        "latency_p50_ms": float(np.percentile(latency, 50)),
+        "latency_p99_ms": float(np.percentile(latency, 99)),
+        "latency_max_ms": float(np.max(latency)),
+        "ms_per_frame": frame_time / max(frames, 1) * 1000,
+        "full_redraws": dashboard.full_redraws - redraws,
+        "cpu_percent": cpu / (duration + 0.5) * 100,
+        "max_rss_mb": max_rss_mb(),
+    })
+
+
+def bench_loopback(rate, duration, port=PORT):
+    ctx = multiprocessing.get_context("spawn")  # Fresh processes: RSS is only the component's own
+    ready = ctx.Event()
+    ground_recv, ground_send = ctx.Pipe(duplex=False)
+    sender_recv, sender_send = ctx.Pipe(duplex=False)
+
+    start = time.monotonic() + 5.0  # Both processes import matplotlib and pandas first
+    ground = ctx.Process(target=ground_station, args=(duration, port, start, ready, ground_send))
+    ground.start()
+    if not ready.wait(start - time.monotonic()):
+        raise RuntimeError("ground station process did not start in time")
+    send = ctx.Process(target=sender, args=(rate, duration, port, start, sender_send))
+    send.start()
+
+    g, s = ground_recv.recv(), sender_recv.recv()
+    ground.join()
+    send.join()
+
+    loss = (s["sent"] - g["received"]) / max(s["sent"], 1) * 100
+    return {
+        "rate_hz": rate,
+        "sent_per_s": s["sent"] / duration,
+        "plotted_per_s": g["received"] / duration,
+        "loss_percent": max(loss, 0.0),
+        "send_errors": s["send_errors"],
+        "sender_overruns": s["overruns"],
+        "late": g["late"],
+        "latency_p50_ms": g["latency_p50_ms"],
+        "latency_p99_ms": g["latency_p99_ms"],
+        "latency_max_ms": g["latency_max_ms"],
+        "ms_per_frame": g["ms_per_frame"],
+        "full_redraws": g["full_redraws"],
+        "sender_cpu_percent": s["cpu_percent"],
+        "ground_cpu_percent": g["cpu_percent"],
+        "sender_max_rss_mb": s["max_rss_mb"],
+        "ground_max_rss_mb": g["max_rss_mb"],
+    }
+
+
+def revision():
+    try:
+        rev = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=HERE,
+                             capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = "unknown"
+    return rev
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    for name, metrics in rows.items():
+        values = "  ".join(f"{key} {value:.4g}" for key, value in metrics.items())
+        print(f"  {name:<18} {values}")
+
+
+def compare(old, new):
+    # Relative change of every metric in both runs; "+" is better, "-" worse
+    print(f"\n{old['revision']} ({old['time']}) -> {new['revision']} ({new['time']})")
+    for name, metrics in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        for key, value in metrics.items():
+            if key == "rate_hz" or key not in before or not before[key] or not np.isfinite(before[key]):
+                continue
+            change = (value - before[key]) / abs(before[key]) * 100
+            better = change if key in HIGHER_IS_BETTER else -change
+            flag = "⚠️" if better < -10 else "  "
+            print(f"{flag} {name:<18} {key:<20} {before[key]:>10.4g} -> {value:>10.4g}  ({better:+.0f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the telemetry chain")
+    parser.add_argument("--only", choices=("components", "loopback"))
+    parser.add_argument("--rates", type=int, nargs="+", default=DEFAULT_RATES,
+                        help="loopback sample rates (Hz), 0 = as fast as possible")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per rate")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS", help="older results (and newer ones)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 1:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            compare(json.load(f), json.load(g))
+        return 0
+
+    run = {
+        "revision": revision(),
+        "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "results": {},
+    }
+    if args.only != "loopback":
+        components = bench_components()
+        print_table("Components (per sample, or per frame)", components)
+        run["results"].update(components)
+    if args.only != "components":
+        loopback = {}
+        for rate in args.rates:
+            print(f"Loopback at {rate or 'max'} Hz for {args.duration:g} s...")
+            loopback[f"loopback_{rate or 'max'}"] = bench_loopback(rate, args.duration, args.port)
+        print_table("Loopback UDP (sensor read to plotted frame)", loopback)
+        run["results"].update(loopback)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{datetime.datetime.now():%Y-%m-%d_%H-%M-%S}_{run['revision']}.json")
+        with open(path, "w") as f:
+            json.dump(run, f, indent=1)
+        print(f"\n💾 Results saved to {path}")
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            compare(json.load(f), run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,42 +1,98 @@
 from picamera2 import Picamera2
 from picamera2.encoders import H264Encoder
-from picamera2.outputs import FileOutput
+import os
 import time
-import datetime
+import signal
+import socket
+import threading
+from camera_output import SegmentedOutput
+
+# Records the flight video in rotating segments; every segment video_<time>.h264 gets two files
+# next to it, used by video_merge.py to put the segments in order and line them up with the telemetry:
+#   video_<time>.pts    timestamp (ms) of every encoded frame
+#   video_<time>.json   wall clock time of the first frame and the frame rate
+#
+# With PRETRIGGER_SECONDS set, nothing is written on the pad: the last seconds are kept in memory
+# until liftoff (a "liftoff" datagram from send_data3.py on TRIGGER_PORT, or kill -USR1 <pid>),
+# then they are saved and the recording continues. After "landing" it records POST_LANDING_SECONDS
+# more and stops.
+
+FRAME_RATE = 30
+BITRATE = 10000000
+SEGMENT_SECONDS = 60  # Start a new file every minute...
+SEGMENT_BYTES = 200_000_000  # ...or every 200 MB, whichever comes first
+PRETRIGGER_SECONDS = 10  # None records continuously from the start
+TRIGGER_PORT = 5006
+POST_LANDING_SECONDS = 30
 
 # Initialize camera
 picam2 = Picamera2()
 video_config = picam2.create_video_configuration(
     main={"size": (1280, 720)},  # 720p resolution
-    controls={"FrameRate": 30}
+    controls={"FrameRate": FRAME_RATE}
 )
 picam2.configure(video_config)
 
-encoder = H264Encoder(bitrate=10000000)
-picam2.start()
+# A key frame (with repeated SPS/PPS headers) every second: segments can only start on one
+encoder = H264Encoder(bitrate=BITRATE, repeat=True, iperiod=FRAME_RATE)
+output = SegmentedOutput(os.getcwd(), SEGMENT_SECONDS, SEGMENT_BYTES, PRETRIGGER_SECONDS, FRAME_RATE)
+
+
+def note_first_frame(request):
+    # Wall clock time of the first encoded frame; the sensor timestamp is on CLOCK_BOOTTIME, so it
+    # is converted with the current offset between that clock and the wall clock
+    if output.recording and output.start_epoch is None:
+        sensor_ns = request.get_metadata()["SensorTimestamp"]
+        output.start_epoch = time.time() - (time.clock_gettime_ns(time.CLOCK_BOOTTIME) - sensor_ns) / 1e9
+
 
-print("Recording video...")
+def on_trigger():
+    buffered = output.buffered_seconds()  # trigger() empties the buffer
+    if output.trigger():
+        print(f"🚀 Liftoff trigger, saving the last {buffered:.1f} s and recording")
 
-# Start recording into a temporary buffer (not saving yet)
-timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-filename = f"video_{timestamp}.h264"
-output = FileOutput(filename)
+
+# Liftoff/landing messages from send_data3.py
+trigger_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+trigger_sock.bind(("127.0.0.1", TRIGGER_PORT))
+trigger_sock.setblocking(False)
+
+# kill -USR1 only sets this flag for the main loop: the handler runs between any two bytecodes of
+# the main thread, possibly while it holds the output's lock (trigger() would deadlock there).
+# The event is never cleared, so the handler's set() cannot wait on the event's own lock either
+trigger_requested = threading.Event()
+signal.signal(signal.SIGUSR1, lambda *_: trigger_requested.set())
+
+picam2.post_callback = note_first_frame
+picam2.start()
 picam2.start_recording(encoder, output)
-print(f"Recording started: {filename}")
+if PRETRIGGER_SECONDS is None:
+    print("Recording video...")
+else:
+    print(f"Waiting for liftoff, keeping the last {PRETRIGGER_SECONDS} s in memory...")
 
+stop_at = None
 try:
-    while True:
-        # Continue recording until there's a reason to stop, e.g., user interrupt or specific condition
-        time.sleep(1)  # Recording is continuous
-
-        # Here you could periodically check if the file needs to be closed or saved.
-        # For example, flush data or rotate files every 60 seconds, or some other custom interval
-        # without interrupting the video feed. This is for continuous recording.
+    while stop_at is None or time.monotonic() < stop_at:
+        time.sleep(0.1)
+        if trigger_requested.is_set() and not output.triggered:
+            on_trigger()
+        try:
+            message = trigger_sock.recv(64).decode("ascii", "replace").strip()
+        except BlockingIOError:
+            continue
+        if message == "liftoff":
+            on_trigger()
+        elif message == "landing" and stop_at is None:
+            on_trigger()  # In case liftoff was missed
+            stop_at = time.monotonic() + POST_LANDING_SECONDS
+            print(f"🪂 Landing, stopping in {POST_LANDING_SECONDS} s")
 
 except KeyboardInterrupt:
     print("Recording interrupted by user.")
 finally:
-    # Ensure the final file is saved
+    # Ensure the last segment is saved
     picam2.stop_recording()
-    print(f"Final recording saved: {filename}")
+    trigger_sock.close()
+    print(f"Recording saved in {len(output.segments)} segment(s)")
     picam2.close()
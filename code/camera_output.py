@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import datetime
+import threading
+from collections import deque
+from picamera2.outputs import Output
+
+# picamera2 output for camera.py: rotating segments and an optional pre-trigger buffer
+#
+# Every segment is a self-contained .h264 file (it starts on a key frame; the encoder repeats the
+# SPS/PPS headers on every key frame) with its .pts and .json files for video_merge.py. A new
+# segment is started on the first key frame after the segment duration or size is reached, so a
+# power loss only costs the open segment.
+#
+# With pretrigger_seconds set nothing is written until trigger(): the encoded frames are kept in
+# memory, whole groups of pictures at a time, covering at least the last pretrigger_seconds. On the
+# trigger (liftoff) that buffer becomes the start of the first segment, so the seconds before the
+# trigger are in the video without recording the whole wait on the pad.
+
+
+class SegmentedOutput(Output):
+    def __init__(self, directory=".", segment_seconds=60, segment_bytes=200_000_000,
+                 pretrigger_seconds=None, fps=30, prefix="video"):
+        super().__init__()
+        self.directory = directory
+        self.fps = fps
+        self.segment_us = segment_seconds * 1_000_000
+        self.segment_bytes = segment_bytes
+        self.pretrigger_us = None if pretrigger_seconds is None else pretrigger_seconds * 1_000_000
+        self.prefix = prefix
+        self.start_epoch = None  # Wall clock time of encoder timestamp 0, set by camera.py
+        self.triggered = pretrigger_seconds is None
+        self.segments = []  # Paths of the finished and open segments
+
+        self._lock = threading.Lock()
+        self._gops = deque()  # Pre-trigger buffer: lists of (frame, keyframe, timestamp), each from a key frame
+        self._file = None
+        self._pts = None
+        self._segment_start = None
+        self._segment_size = 0
+
+    def _epoch(self, timestamp):
+        if self.start_epoch is None:
+            self.start_epoch = time.time() - timestamp / 1e6  # No sensor time known, close enough
+        return self.start_epoch + timestamp / 1e6
+
+    def _open_segment(self, timestamp):
+        self._close_segment()
+        start = self._epoch(timestamp)
+        name = f"{self.prefix}_{datetime.datetime.fromtimestamp(start):%Y-%m-%d_%H-%M-%S}"
+        base = os.path.join(self.directory, name)
+        self._file = open(base + ".h264", "wb")
+        self._pts = open(base + ".pts", "w")
+        self._pts.write("# timecode format v2\n")
+        with open(base + ".json", "w") as f:
+            json.dump({"start": start, "fps": self.fps}, f)
+        self._segment_start = timestamp
+        self._segment_size = 0
+        self.segments.append(base + ".h264")
+        print(f"🎥 Segment started: {base}.h264")
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        for f in (self._file, self._pts):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        self._file = self._pts = None
+
+    def _write(self, frame, keyframe, timestamp):
+        if keyframe and (self._file is None or timestamp - self._segment_start >= self.segment_us
+                         or self._segment_size >= self.segment_bytes):
+            self._open_segment(timestamp)
+        if self._file is None:
+            return  # Recording starts on a key frame
+        self._file.write(frame)
+        self._pts.write(f"{timestamp / 1000:.3f}\n")
+        self._segment_size += len(frame)
+        if keyframe:
+            self._file.flush()  # Hand the last second to the OS, fsync happens on rotation
+
+    def outputframe(self, frame, keyframe=True, timestamp=None, *args, **kwargs):
+        # Called from the encoder thread for every encoded frame (timestamp in µs)
+        with self._lock:
+            if not self.recording:
+                return
+            if self.triggered:
+                self._write(bytes(frame), keyframe, timestamp)
+                return
+            if keyframe or not self._gops:
+                self._gops.append([])
+            self._gops[-1].append((bytes(frame), keyframe, timestamp))
+            # Drop whole groups of pictures while the rest still covers the pre-trigger time
+            while len(self._gops) > 1 and timestamp - self._gops[1][0][2] >= self.pretrigger_us:
+                self._gops.popleft()
+
+    def trigger(self):
+        # Writes the buffered frames and records from now on; returns False if already recording
+        with self._lock:
+            if self.triggered:
+                return False
+            self.triggered = True
+            while self._gops:
+                for frame in self._gops.popleft():
+                    self._write(*frame)
+            return True
+
+    def buffered_seconds(self):
+        with self._lock:
+            if not self._gops:
+                return 0.0
+            return (self._gops[-1][-1][2] - self._gops[0][0][2]) / 1e6
+
+    def stop(self):
+        super().stop()
+        with self._lock:
+            self._close_segment()
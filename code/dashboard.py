@@ -0,0 +1,166 @@
+import time
+import itertools
+import numpy as np
+
+# Fast incremental rendering for the 3x3 telemetry dashboards (receive_live2.py, post_flight_plot.py)
+#
+# The static part of the figure (axes, ticks, grids, legends) is rendered once and cached as a
+# bitmap. Each frame only the line artists are redrawn on top of it and blitted to the screen.
+# Axis limits are only changed when the data leaves the visible range, which is the only time
+# a full redraw (and a new cached background) is needed.
+#
+# Lines with more points than their axes have pixels are decimated before drawing (decimate(),
+# set_line()): the minimum and maximum of every pixel-wide bucket are kept, so spikes stay
+# visible while Agg draws a few hundred points per line instead of the whole window.
+
+
+def decimate(x, y, width):
+    # (x, y) reduced to the min and max y of about `width` buckets (in x order), unchanged if short
+    n = len(y)
+    size = -(-n // max(int(width), 1))  # Samples per bucket, rounded up
+    if size <= 2:
+        return x, y
+    buckets = n // size
+    full = buckets * size
+    yb = np.asarray(y[:full]).reshape(buckets, size)
+    nan = np.isnan(yb)
+    lo = np.argmin(np.where(nan, np.inf, yb), axis=1)
+    hi = np.argmax(np.where(nan, -np.inf, yb), axis=1)
+    # Both points of every bucket in their original order, plus the partial bucket at the end
+    offsets = np.arange(buckets) * size
+    index = np.column_stack((np.minimum(lo, hi), np.maximum(lo, hi))) + offsets[:, None]
+    index = np.concatenate((index.ravel(), np.arange(full, n)))
+    return np.asarray(x)[index], np.asarray(y)[index]
+
+
+def set_line(line, x, y):
+    # line.set_data with at most two points per pixel of the line's axes
+    line.set_data(*decimate(x, y, line.axes.bbox.width))
+
+
+class Dashboard:
+    def __init__(self, fig, time_axes, artists, window=None, path_axes=(), blit=True, headroom=0.25):
+        # time_axes: axes with time on x; window: visible seconds (None = always from t=0)
+        # path_axes: axes where both limits follow the data (e.g. the GPS path)
+        # headroom: fraction of the window left free ahead of the newest sample after a rescale
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.time_axes = list(time_axes)
+        self.path_axes = list(path_axes)
+        self.window = window
+        self.headroom = headroom
+        self.blit = blit and getattr(self.canvas, "supports_blit", False)
+
+        # Measured performance
+        self.fps = 0.0
+        self.frame_ms = 0.0
+        self.full_redraws = 0
+        self._last_frame = None
+
+        self._xlim = self.time_axes[0].get_xlim() if self.time_axes else None
+        self._bg = None
+        self._timer = None
+
+        self.status = fig.text(0.5, 0.995, "", ha="center", va="top")
+        self.artists = list(artists) + [self.status]
+        if self.blit:
+            for artist in self.artists:
+                artist.set_animated(True)
+            self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # Any full draw (first show, resize, rescale) refreshes the cached background
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def _rescale_time(self, t):
+        lo, hi = self._xlim
+        if lo <= t <= hi:
+            return False
+        if self.window is None:
+            lo, hi = 0, max(10, t * (1 + self.headroom))
+        else:
+            lo = max(0, t - self.window * (1 - self.headroom))
+            hi = lo + self.window
+        self._xlim = (lo, hi)
+        for a in self.time_axes:
+            a.set_xlim(lo, hi)
+        return True
+
+    def _rescale_paths(self):
+        changed = False
+        for a in self.path_axes:
+            data = [line.get_xydata() for line in a.get_lines() if len(line.get_xdata())]
+            if not data:
+                continue
+            xy = np.concatenate(data)
+            xy = xy[np.isfinite(xy).all(axis=1)]  # NaN: no GPS fix
+            if not len(xy):
+                continue
+            xmin, ymin = np.nanmin(xy, axis=0)
+            xmax, ymax = np.nanmax(xy, axis=0)
+            (x0, x1), (y0, y1) = a.get_xlim(), a.get_ylim()
+            if x0 <= xmin and xmax <= x1 and y0 <= ymin and ymax <= y1:
+                continue
+            # Leave some margin so a moving track does not rescale every frame
+            dx = max((xmax - xmin) * 0.25, 5.0)  # At least 5 m (ground track in meters)
+            dy = max((ymax - ymin) * 0.25, 5.0)
+            a.set_xlim(xmin - dx, xmax + dx)
+            a.set_ylim(ymin - dy, ymax + dy)
+            changed = True
+        return changed
+
+    def add_marker(self, t, label):
+        # Vertical line on every time axis (e.g. flight events); static, so the background is redrawn
+        for i, a in enumerate(self.time_axes):
+            a.axvline(t, color="black", linestyle="--", linewidth=0.8)
+            if i == 0:
+                a.text(t, 0.98, f" {label}", transform=a.get_xaxis_transform(), va="top", fontsize=8)
+        self._bg = None
+
+    def refresh(self, t=None, status=""):
+        # Draw the current line data; t is the newest time value shown on the time axes
+        start = time.perf_counter()
+        if self._last_frame is not None:
+            self.fps += 0.1 * (1 / max(start - self._last_frame, 1e-6) - self.fps)
+        self._last_frame = start
+        self.status.set_text(f"{self.fps:.1f} FPS ({self.frame_ms:.1f} ms/frame)  {status}")
+
+        rescaled = t is not None and self._rescale_time(t)
+        rescaled = self._rescale_paths() or rescaled
+
+        if not self.blit:
+            self.canvas.draw_idle()
+        elif rescaled or self._bg is None:
+            self.full_redraws += 1
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._bg)
+            self._draw_artists()
+            self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+        self.frame_ms += 0.1 * ((time.perf_counter() - start) * 1000 - self.frame_ms)
+
+    def start(self, update, interval_ms, frames=None):
+        # Calls update(frame) every interval_ms, like FuncAnimation but without its full redraws
+        frames = itertools.count() if frames is None else iter(frames)
+
+        def tick():
+            try:
+                frame = next(frames)
+            except StopIteration:
+                self._timer.stop()
+                return
+            update(frame)
+
+        self._timer = self.canvas.new_timer(interval=interval_ms)
+        self._timer.add_callback(tick)
+        self._timer.start()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
@@ -0,0 +1,129 @@
+import numpy as np
+from collections import namedtuple
+from state_estimator import StateEstimator
+from geodesy import first_fix, ground_track, valid_fix
+
+# Derived telemetry (total/vertical acceleration, orientation, vertical velocity, drift)
+#
+# All functions work on NumPy arrays (whole logs) as well as on single values, and the same
+# code is used by post_flight_plot.py for complete flights and by receive_live2.py for every
+# block of received packets, so both always show the same numbers. With fused=True vertical
+# velocity and pitch/roll/yaw come from state_estimator.py (Kalman / gyro fusion) instead of the
+# altitude difference and the accelerometer-only angles.
+#
+# Drift and the ground track (GPS_East/GPS_North) are meters from the first GPS fix in the local
+# East/North plane (geodesy.py). Rows without a fix (GPS 0/0, e.g. send_data3.py before the
+# PA1010D has a fix) are NaN, and so is everything before the first fix.
+
+# Values of the first sample that the derived channels are zeroed against (rocket on the pad);
+# origin is the (lat, lon, alt) of the first GPS fix, NaN until there is one
+Calibration = namedtuple("Calibration", ["total_acc", "vert_acc", "roll", "origin"])
+
+
+def total_acceleration(ax, ay, az):
+    return np.sqrt(ax * ax + ay * ay + az * az)
+
+
+def orientation(ax, ay, az):
+    # Pitch, roll and yaw in degrees from the gravity vector (accelerometer only)
+    ax2, ay2, az2 = ax * ax, ay * ay, az * az
+    pitch = np.degrees(np.arctan2(ay, np.sqrt(ax2 + az2)))
+    roll = np.degrees(np.arctan2(ax, np.sqrt(ay2 + az2)))
+    yaw = np.degrees(np.arctan2(az, np.sqrt(ax2 + ay2)))
+    return pitch, roll, yaw
+
+
+def vertical_velocity(t, altitude, prev_t=None, prev_altitude=None):
+    # Altitude change per second; the first sample is 0 unless the previous sample is given
+    t = np.asarray(t, dtype=np.float64)
+    altitude = np.asarray(altitude, dtype=np.float64)
+    if prev_t is None:
+        prev_t, prev_altitude = t[:1], altitude[:1]
+    dt = np.diff(t, prepend=prev_t)
+    dh = np.diff(altitude, prepend=prev_altitude)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dt > 0, dh / dt, 0.0)
+
+
+def drift(east, north):
+    # Horizontal distance from the pad (m)
+    return np.hypot(east, north)
+
+
+def calibration(ax, ay, az, origin):
+    _, roll, _ = orientation(ax, ay, az)
+    return Calibration(float(total_acceleration(ax, ay, az)), float(az), float(roll), tuple(origin))
+
+
+def derive_arrays(cal, t, altitude, ax, ay, az, lat, lon, gps_alt, prev_t=None, prev_altitude=None):
+    pitch, roll, yaw = orientation(ax, ay, az)
+    east, north = ground_track(lat, lon, gps_alt, cal.origin)
+    return {
+        "Total_Acceleration": total_acceleration(ax, ay, az) - cal.total_acc,
+        "Vertical_Acceleration": az - cal.vert_acc,
+        "Vertical_Velocity": vertical_velocity(t, altitude, prev_t, prev_altitude),
+        "Pitch": pitch,
+        "Roll": roll - cal.roll,
+        "Yaw": yaw,
+        "GPS_East": east,
+        "GPS_North": north,
+        "Rocket_Drift": drift(east, north),
+    }
+
+
+def apply_estimates(derived, estimates, cal):
+    # Replaces velocity and orientation with the state estimator output (roll zeroed like above)
+    derived["Vertical_Velocity"] = estimates["Vertical_Velocity"]
+    derived["Pitch"] = estimates["Pitch"]
+    derived["Roll"] = estimates["Roll"] - cal.roll
+    derived["Yaw"] = estimates["Yaw"]
+    derived["Altitude_Estimate"] = estimates["Altitude_Estimate"]
+    return derived
+
+
+def derive(df, time_column="Time", fused=True):
+    # Adds the derived columns used by post_flight_plot.py to a flight log DataFrame
+    cols = [df[c].to_numpy(dtype=np.float64) for c in (
+        "Altitude (m)", "Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)",
+        "GPS_Latitude", "GPS_Longitude", "GPS_Altitude (m)")]
+    altitude, ax, ay, az, lat, lon, gps_alt = cols
+    cal = calibration(ax[0], ay[0], az[0], first_fix(lat, lon, gps_alt))
+    t = df[time_column].to_numpy(dtype=np.float64)
+    derived = derive_arrays(cal, t, altitude, ax, ay, az, lat, lon, gps_alt)
+    if fused:
+        gyro_mag = [df[c].to_numpy(dtype=np.float64) for c in (
+            "Gyro_X (°/s)", "Gyro_Y (°/s)", "Gyro_Z (°/s)", "Mag_X (µT)", "Mag_Y (µT)", "Mag_Z (µT)")]
+        estimates = StateEstimator().process(t, altitude, ax, ay, az, *gyro_mag)
+        apply_estimates(derived, estimates, cal)
+    for name, values in derived.items():
+        df[name] = values
+
+    # Angular rates (swapped to match live telemetry)
+    df["Pitch_Rate"] = df["Gyro_X (°/s)"]
+    df["Roll_Rate"] = df["Gyro_Y (°/s)"]
+    df["Yaw_Rate"] = df["Gyro_Z (°/s)"]
+    return df
+
+
+class StreamDeriver:
+    # Same math for live data arriving in blocks, calibrated on the first sample ever seen
+    # (the GPS origin on the first fix ever seen)
+
+    def __init__(self, fused=True):
+        self.calibration = None
+        self.estimator = StateEstimator() if fused else None
+        self._prev_t = None
+        self._prev_altitude = None
+
+    def process(self, t, altitude, ax, ay, az, gx, gy, gz, mx, my, mz, lat, lon, gps_alt):
+        if self.calibration is None:
+            self.calibration = calibration(ax[0], ay[0], az[0], first_fix(lat, lon, gps_alt))
+        elif not valid_fix(*self.calibration.origin[:2]):
+            self.calibration = self.calibration._replace(origin=first_fix(lat, lon, gps_alt))
+        derived = derive_arrays(self.calibration, t, altitude, ax, ay, az, lat, lon, gps_alt,
+                                self._prev_t, self._prev_altitude)
+        if self.estimator is not None:
+            estimates = self.estimator.process(t, altitude, ax, ay, az, gx, gy, gz, mx, my, mz)
+            apply_estimates(derived, estimates, self.calibration)
+        self._prev_t, self._prev_altitude = t[-1], altitude[-1]
+        return derived
@@ -0,0 +1,185 @@
+import os
+import sys
+from collections import namedtuple
+import numpy as np
+
+# Online flight event detection (liftoff, burnout, apogee, landing)
+#
+# FlightEventDetector is fed one sample at a time (time, altitude, vertical velocity and, when
+# available, the accelerometer magnitude) and walks through the flight phases
+#
+#   pad -> boost -> coast -> descent -> landed
+#
+# Every rule has to hold for a short confirmation time, so a knock on the pad or a noisy
+# barometer reading does not trigger it; the detection latency is that hold time plus one
+# sample. Each event carries both the estimated time it happened and the time it was detected.
+# The same class runs on board (send_data3.py, to switch sampling and radio rates), at the
+# ground station and over recorded logs:
+#
+#   python event_detector.py ../data     event table for every log in the directory
+
+PAD, BOOST, COAST, DESCENT, LANDED = "pad", "boost", "coast", "descent", "landed"
+LIFTOFF, BURNOUT, APOGEE, LANDING = "liftoff", "burnout", "apogee", "landing"
+
+G = 9.80665  # m/s²
+APOGEE_WINDOW = 1.0  # Seconds around the detected apogee searched for the barometer's peak
+
+Event = namedtuple("Event", ["name", "t", "detected_t", "altitude", "velocity"])
+
+
+class FlightEventDetector:
+    def __init__(self, liftoff_g=2.0, liftoff_velocity=2.0, liftoff_altitude=10.0, liftoff_hold=0.05,
+                 burnout_g=1.0, burnout_velocity_drop=0.5, burnout_hold=0.05,
+                 apogee_hold=0.2, apogee_drop=2.0, landing_altitude=15.0, landing_speed=1.5,
+                 landing_hold=2.0, touchdown_altitude=1.0, on_event=None):
+        self.liftoff_g = liftoff_g  # Accelerometer magnitude (g) that means thrust
+        self.liftoff_velocity = liftoff_velocity  # Used instead when there is no accelerometer (m/s)
+        self.liftoff_altitude = liftoff_altitude  # Fallback for low rate logs: height above the pad (m)
+        self.liftoff_hold = liftoff_hold
+        self.burnout_g = burnout_g  # Below this the motor no longer pushes (only drag is measured)
+        self.burnout_velocity_drop = burnout_velocity_drop  # ...or the velocity is this far past its peak (m/s)
+        self.burnout_hold = burnout_hold
+        self.apogee_hold = apogee_hold  # Velocity must stay negative this long (s)
+        self.apogee_drop = apogee_drop  # ...or be <= 0 with the altitude this far below the maximum (m)
+        self.landing_altitude = landing_altitude
+        self.landing_speed = landing_speed
+        self.landing_hold = landing_hold
+        self.touchdown_altitude = touchdown_altitude  # Back at pad height counts as landed at once (m)
+        self.on_event = on_event
+
+        self.phase = PAD
+        self.events = []
+        self.ground = None
+        self._since = None  # Time the current candidate condition became true
+        self._max_alt = (None, -np.inf)  # (t, altitude)
+        self._max_vel = (None, -np.inf)  # (t, velocity)
+
+    def _held(self, condition, t, hold):
+        if not condition:
+            self._since = None
+            return False
+        if self._since is None:
+            self._since = t
+        return t - self._since >= hold
+
+    def _emit(self, name, t, detected_t, altitude, velocity, phase):
+        event = Event(name, t, detected_t, altitude, velocity)
+        self.events.append(event)
+        self.phase = phase
+        self._since = None
+        if self.on_event is not None:
+            self.on_event(event)
+        return event
+
+    def update(self, t, altitude, velocity, accel=None):
+        # Returns the events detected with this sample (usually none)
+        emitted = []
+        if self.ground is None:
+            self.ground = altitude
+        height = altitude - self.ground
+
+        if self.phase == PAD:
+            # Track slow barometer drift while waiting on the pad
+            self.ground += 0.02 * (altitude - self.ground)
+            if accel is not None:
+                thrust = accel > self.liftoff_g * G
+            else:
+                thrust = velocity > self.liftoff_velocity
+            if self._held(thrust, t, self.liftoff_hold) or height > self.liftoff_altitude:
+                start = self._since if self._since is not None else t
+                emitted.append(self._emit(LIFTOFF, start, t, altitude, velocity, BOOST))
+            return emitted
+
+        if self.phase in (BOOST, COAST):
+            if altitude > self._max_alt[1]:
+                self._max_alt = (t, altitude)
+            if velocity > self._max_vel[1]:
+                self._max_vel = (t, velocity)
+
+        if self.phase == BOOST:
+            # Drag can keep the accelerometer near 1 g while coasting, so the velocity peak counts too
+            no_thrust = accel is not None and accel < self.burnout_g * G
+            past_peak = velocity < self._max_vel[1] - self.burnout_velocity_drop
+            if self._held(no_thrust or past_peak, t, self.burnout_hold):
+                start = self._since if no_thrust else self._max_vel[0]
+                emitted.append(self._emit(BURNOUT, start, t, altitude, velocity, COAST))
+
+        if self.phase == COAST:
+            # The altitude drop is for low rate logs, where the hold spans only a sample or two; it
+            # also needs the velocity to have turned, so a barometer dip while climbing is ignored
+            falling = self._held(velocity < 0, t, self.apogee_hold)
+            dropped = velocity <= 0 and altitude < self._max_alt[1] - self.apogee_drop
+            if falling or dropped:
+                t_apogee, alt_apogee = self._max_alt
+                emitted.append(self._emit(APOGEE, t_apogee, t, alt_apogee, velocity, DESCENT))
+        if self.phase in (BOOST, COAST):
+            return emitted
+
+        if self.phase == DESCENT:
+            still = abs(velocity) < self.landing_speed and height < self.landing_altitude
+            if height < self.touchdown_altitude:
+                emitted.append(self._emit(LANDING, t, t, altitude, velocity, LANDED))
+            elif self._held(still, t, self.landing_hold):
+                emitted.append(self._emit(LANDING, self._since, t, altitude, velocity, LANDED))
+        return emitted
+
+
+def detect_events(df, **params):
+    # Event list for a loaded log (flight_log.load_flight); derived columns are added if missing
+    if "Vertical_Velocity" not in df:
+        from derived_metrics import derive
+        derive(df, time_column="Time (s)")
+    t = df["Time (s)"].to_numpy(dtype=np.float64)
+    altitude = df["Altitude_Estimate" if "Altitude_Estimate" in df else "Altitude (m)"].to_numpy(dtype=np.float64)
+    velocity = df["Vertical_Velocity"].to_numpy(dtype=np.float64)
+    if "Accel_X (m/s²)" in df:
+        accel = np.sqrt(sum(df[c].to_numpy(dtype=np.float64) ** 2
+                            for c in ("Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)"))).tolist()
+    else:
+        accel = [None] * len(t)  # Simulation exports have no accelerometer reading
+
+    detector = FlightEventDetector(**params)
+    for row in zip(t.tolist(), altitude.tolist(), velocity.tolist(), accel):
+        detector.update(*row)
+        if detector.phase == LANDED:
+            break
+    return detector.events
+
+
+def apogee_height(df, apogee, window=APOGEE_WINDOW):
+    # Barometric height above the pad at apogee: the highest raw "Altitude (m)" within `window`
+    # seconds of the detected event (the same reading flight_analysis.py reports as max altitude)
+    if apogee is None:
+        return None
+    t = df["Time (s)"].to_numpy(dtype=np.float64)
+    altitude = df["Altitude (m)"].to_numpy(dtype=np.float64)
+    near = np.abs(t - apogee.t) <= window
+    return round(float(np.nanmax(altitude[near]) - altitude[0]), 1) if near.any() else None
+
+
+def event_table(directory):
+    # One row per log: event times relative to liftoff, detection latency and the barometric
+    # apogee height
+    # (pandas/flight_log are only imported here, the detector itself needs only NumPy on board)
+    import pandas as pd
+    from flight_log import load_flight, find_logs
+
+    rows = []
+    for flight, logs in find_logs(directory).items():
+        for kind, path in logs.items():
+            df = load_flight(path)
+            events = {e.name: e for e in detect_events(df)}
+            row = {"Flight": flight, "Log": kind}
+            t0 = events[LIFTOFF].t if LIFTOFF in events else 0.0
+            for name in (LIFTOFF, BURNOUT, APOGEE, LANDING):
+                event = events.get(name)
+                row[f"{name} (s)"] = round(event.t - t0, 2) if event else None
+                row[f"{name} latency (s)"] = round(event.detected_t - event.t, 2) if event else None
+            row["apogee height, baro (m)"] = apogee_height(df, events.get(APOGEE))
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+    print(event_table(directory).to_string(index=False))
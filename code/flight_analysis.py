@@ -0,0 +1,222 @@
+import os
+import sys
+import pickle
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Headless: only PNG files are written
+import matplotlib.pyplot as plt
+from flight_log import load_flight, find_logs, CACHE_DIR, KIND_TELEMETRY
+from derived_metrics import derive
+from event_detector import detect_events, LIFTOFF, BURNOUT, APOGEE, LANDING
+
+# Batch post-flight analysis of a whole data directory
+#
+#   python flight_analysis.py ../data                   summary table + plots into ../analysis
+#   python flight_analysis.py ../data -o out -j 4       other output directory, 4 worker processes
+#
+# Every log is loaded, derived (derived_metrics.py), run through the event detector and drawn as
+# a 3x3 telemetry figure in its own process. The results are cached by the SHA-1 of the log
+# contents, so a re-run only recomputes the flights whose files changed. The summary table
+# (flight_summary.csv) and the "... for All Flights" overlay plots are then built from the
+# cached results.
+
+ANALYSIS_VERSION = 2
+ANALYSIS_CACHE_DIR = os.path.join(CACHE_DIR, "analysis")
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis")
+
+# Overlay plot -> (result series, y label)
+OVERLAYS = {
+    "Altitude vs Time for All Flights": ("Altitude", "Altitude (m)"),
+    "Vertical Velocity vs Time for All Flights": ("Vertical_Velocity", "Vertical Velocity (m/s)"),
+    "Total Acceleration vs Time for All Flights": ("Total_Acceleration", "Total Acceleration (m/s²)"),
+    "Temperature vs Time for All Flights": ("Temperature (°C)", "Temperature (°C)"),
+}
+FLIGHT_COLORS = ["gold", "red", "blue", "green", "purple", "orange", "brown", "black"]
+
+
+def file_hash(path):
+    digest = hashlib.sha1(str(ANALYSIS_VERSION).encode("ascii"))
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def plot_flight(df, title, path):
+    # Static version of the post_flight_plot.py dashboard
+    t = df["Time (s)"]
+    fig, ax = plt.subplots(3, 3, figsize=(18, 10))
+    ax = ax.flatten()
+    panels = [
+        ("Temperature vs Time", [("Temperature (°C)", "Temperature (°C)", "tomato")]),
+        ("Altitude vs Time", [("Altitude (m)", "Barometric Altitude (m)", "blue"),
+                              ("Altitude_Estimate", "Estimated Altitude (m)", "black")]),
+        ("Vertical Velocity vs Time", [("Vertical_Velocity", "Vertical Velocity (m/s)", "green")]),
+        ("Total Acceleration vs Time", [("Total_Acceleration", "Total Acceleration (m/s²)", "purple")]),
+        ("Vertical Acceleration vs Time", [("Vertical_Acceleration", "Vertical Acceleration (m/s²)", "orange")]),
+        ("Orientation (Pitch, Roll, Yaw) vs Time", [("Pitch", "Pitch (°)", "blue"), ("Roll", "Roll (°)", "red"),
+                                                    ("Yaw", "Yaw (°)", "green")]),
+        ("Angular Rates (Pitch, Roll, Yaw) vs Time", [("Pitch_Rate", "Pitch Rate (°/s)", "blue"),
+                                                      ("Roll_Rate", "Roll Rate (°/s)", "red"),
+                                                      ("Yaw_Rate", "Yaw Rate (°/s)", "green")]),
+        ("Rocket Drift vs Time", [("Rocket_Drift", "Rocket Drift (m)", "brown")]),
+    ]
+    for a, (panel_title, series) in zip(ax, panels):
+        a.set_title(panel_title)
+        a.set_xlabel("Time (s)")
+        for column, label, color in series:
+            if column in df:
+                a.plot(t, df[column], label=label, color=color)
+        if a.get_lines():
+            a.legend()
+        a.grid(True, linestyle="--", alpha=0.6)
+
+    ax[8].set_title("GPS Ground Track")
+    ax[8].set_xlabel("East (m)")
+    ax[8].set_ylabel("North (m)")
+    if "GPS_East" in df and df["GPS_East"].notna().any():
+        ax[8].plot(df["GPS_East"], df["GPS_North"], label="Path", color="gray")
+        ax[8].plot(0, 0, "^", color="black", label="Pad")
+        ax[8].set_aspect("equal", adjustable="datalim")
+        ax[8].legend()
+    ax[8].grid(True, linestyle="--", alpha=0.6)
+
+    fig.suptitle(title)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+
+
+def analyze(flight, kind, path, output_dir):
+    # Runs in a worker process; returns everything the summary and overlays need
+    df = load_flight(path)
+    if "Accel_X (m/s²)" in df:
+        derive(df, time_column="Time (s)")
+    events = {e.name: e for e in detect_events(df)}
+
+    t = df["Time (s)"].to_numpy(dtype=np.float64)
+    altitude = df["Altitude (m)"].to_numpy(dtype=np.float64)
+    ground = altitude[0]
+    t0 = events[LIFTOFF].t if LIFTOFF in events else t[0]
+    t_end = events[LANDING].t if LANDING in events else t[-1]
+
+    def peak(column):
+        # None if the column is missing or has no values (e.g. drift without a GPS fix)
+        if column not in df or not df[column].notna().any():
+            return None
+        return round(float(np.nanmax(df[column])), 1)
+
+    summary = {
+        "Flight": flight,
+        "Log": kind,
+        "Max altitude (m)": round(float(np.nanmax(altitude) - ground), 1),
+        "Max velocity (m/s)": peak("Vertical_Velocity"),
+        "Max acceleration (m/s²)": peak("Total_Acceleration"),
+        "Flight time (s)": round(float(t_end - t0), 1),
+        "Drift (m)": peak("Rocket_Drift"),
+    }
+    for name in (BURNOUT, APOGEE):
+        summary[f"{name.capitalize()} (s)"] = round(events[name].t - t0, 2) if name in events else None
+
+    # Overlay series: time from liftoff, altitude above the pad
+    series = {"Time": t - t0, "Altitude": altitude - ground}
+    for column, _ in OVERLAYS.values():
+        if column in df and column not in series:
+            series[column] = df[column].to_numpy(dtype=np.float64)
+
+    title = f"Flight {flight} - {'Telemetry' if kind == KIND_TELEMETRY else 'Simulation'}"
+    plot_flight(df, title, os.path.join(output_dir, f"{title}.png"))
+    return {"summary": summary, "series": series, "title": title}
+
+
+def _cached(key):
+    try:
+        with open(os.path.join(ANALYSIS_CACHE_DIR, f"{key}.pkl"), "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def _store(key, result):
+    try:
+        os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(ANALYSIS_CACHE_DIR, f"{key}.pkl"), "wb") as f:
+            pickle.dump(result, f)
+    except OSError:
+        pass  # Read-only home, everything is recomputed next time
+
+
+def analyze_all(directory, output_dir, workers=None, use_cache=True):
+    # {(flight, kind): result} for every log in the directory, changed logs processed in parallel
+    os.makedirs(output_dir, exist_ok=True)
+    results, todo = {}, {}
+    for flight, logs in find_logs(directory).items():
+        for kind, path in logs.items():
+            key = file_hash(path)
+            result = _cached(key) if use_cache else None
+            if result is not None and os.path.exists(os.path.join(output_dir, f"{result['title']}.png")):
+                results[flight, kind] = result
+            else:
+                todo[flight, kind] = (key, path)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {job: pool.submit(analyze, job[0], job[1], path, output_dir)
+                       for job, (key, path) in todo.items()}
+            for job, future in futures.items():
+                results[job] = future.result()
+                _store(todo[job][0], results[job])
+    print(f"{len(todo)} log(s) analyzed, {len(results) - len(todo)} from cache")
+    return dict(sorted(results.items()))
+
+
+def plot_overlays(results, output_dir, kind=KIND_TELEMETRY):
+    flights = [(flight, r["series"]) for (flight, k), r in results.items() if k == kind]
+    for title, (column, ylabel) in OVERLAYS.items():
+        fig, ax = plt.subplots(figsize=(12, 6))
+        for i, (flight, series) in enumerate(flights):
+            if column not in series:
+                continue
+            after_liftoff = series["Time"] >= 0
+            ax.plot(series["Time"][after_liftoff], series[column][after_liftoff],
+                    label=f"Flight {flight}", color=FLIGHT_COLORS[i % len(FLIGHT_COLORS)], linewidth=2)
+        ax.set_title(title)
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, linestyle="--", alpha=0.6)
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_dir, f"{title}.png"), dpi=150)
+        plt.close(fig)
+
+
+def summary_table(results):
+    import pandas as pd
+    return pd.DataFrame([r["summary"] for r in results.values()])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze every flight log in a directory")
+    parser.add_argument("directory", nargs="?", default=DEFAULT_DATA_DIR, help="directory with the flight logs")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_DIR, help="directory for the table and plots")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every flight")
+    args = parser.parse_args(argv)
+
+    results = analyze_all(args.directory, args.output, args.jobs, use_cache=not args.no_cache)
+    if not results:
+        print(f"⚠️ No flight logs found in {args.directory}")
+        return 1
+    plot_overlays(results, args.output)
+    table = summary_table(results)
+    table.to_csv(os.path.join(args.output, "flight_summary.csv"), index=False)
+    print(table.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import os
+import re
+import time
+import csv
+import hashlib
+import numpy as np
+import pandas as pd
+from onboard_log import is_binary_log, open_binary_log
+
+# Loader for every flight log layout in data/
+#
+#   Flight1.csv                       comma separated, no time column (only the 1 s wall clock Timestamp)
+#   Flight2-4.csv                     semicolon separated with "Time (s)"
+#   Flight N - Simulation_Data.csv    simulation exports, "#"-prefixed header, "," or ";", own column names
+#   <log directory>/meta.json         binary logs from onboard_log.py (memory-mapped, not cached)
+#
+# Columns are renamed to the names send_data3.py writes (simulation channels get the derived
+# names used by derived_metrics.py), units are converted, "Time (s)" always exists and starts
+# at 0, and parsed logs are cached on disk keyed by file path, size and modification time.
+
+LOADER_VERSION = 1
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hermes", "flight_logs")
+
+KIND_TELEMETRY = "telemetry"
+KIND_SIMULATION = "simulation"
+
+# Source column -> (normalized column, scale factor to the normalized unit)
+COLUMN_MAP = {
+    "Time (s)": ("Time (s)", 1.0),
+    "Altitude (m)": ("Altitude (m)", 1.0),
+    "Altitude (ft)": ("Altitude (m)", 0.3048),
+    "Vertical velocity (m/s)": ("Vertical_Velocity", 1.0),
+    "Vertical acceleration (m/s²)": ("Vertical_Acceleration", 1.0),
+    "Total acceleration (m/s²)": ("Total_Acceleration", 1.0),
+    "Roll rate (°/s)": ("Roll_Rate", 1.0),
+    "Pitch rate (°/s)": ("Pitch_Rate", 1.0),
+    "Yaw rate (°/s)": ("Yaw_Rate", 1.0),
+    "Air pressure (mbar)": ("Pressure (hPa)", 1.0),
+    "Air pressure (Pa)": ("Pressure (hPa)", 0.01),
+}
+
+# Channels that need more than float32 precision
+FLOAT64_COLUMNS = {"Time (s)", "GPS_Latitude", "GPS_Longitude"}
+
+_memory_cache = {}
+
+
+def sniff_layout(path):
+    # (delimiter, header names) from the first line of a log
+    with open(path, encoding="utf-8-sig") as f:
+        header = f.readline().strip()
+    header = header.lstrip("#").strip()
+    delimiter = csv.Sniffer().sniff(header, delimiters=",;").delimiter
+    return delimiter, [name.strip() for name in header.split(delimiter)]
+
+
+def _schema(columns):
+    if any(name in columns for name in ("Vertical velocity (m/s)", "Air pressure (mbar)", "Air pressure (Pa)")):
+        return KIND_SIMULATION
+    return KIND_TELEMETRY
+
+
+def _parse(path):
+    delimiter, columns = sniff_layout(path)
+    dtypes = {name: (np.float64 if COLUMN_MAP.get(name, (name,))[0] in FLOAT64_COLUMNS else np.float32)
+              for name in columns if name != "Timestamp"}
+    df = pd.read_csv(path, sep=delimiter, skiprows=1, names=columns, dtype=dtypes,
+                     na_values=["NaN"], engine="c")
+    df.attrs["kind"] = _schema(columns)
+    df.attrs["source"] = os.path.abspath(path)
+
+    # Normalize names and units
+    for name in columns:
+        target, scale = COLUMN_MAP.get(name, (name, 1.0))
+        if scale != 1.0:
+            df[name] = df[name] * df[name].dtype.type(scale)
+    df = df.rename(columns={name: COLUMN_MAP[name][0] for name in columns if name in COLUMN_MAP})
+
+    # Real timestamps: logged time, else the wall clock timestamp, else one sample per second
+    if "Timestamp" in df:
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], format="%Y-%m-%d %H:%M:%S")
+    if "Time (s)" not in df:
+        if "Timestamp" in df:
+            df["Time (s)"] = (df["Timestamp"] - df["Timestamp"].iloc[0]).dt.total_seconds()
+        else:
+            df["Time (s)"] = np.arange(len(df), dtype=np.float64)
+    df["Time (s)"] = df["Time (s)"] - df["Time (s)"].iloc[0]
+    df = df[["Time (s)"] + [c for c in df.columns if c != "Time (s)"]]
+    return df
+
+
+def _cache_key(path):
+    st = os.stat(path)
+    raw = f"{LOADER_VERSION}|{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _local_time(unix):
+    # Naive local wall clock time, like the "Timestamp" text of the CSV logs (datetime.now())
+    unix = np.asarray(unix, dtype=np.float64)
+    if not len(unix):
+        return pd.to_datetime(unix, unit="s")
+    offsets = {time.localtime(t).tm_gmtoff for t in (unix[0], unix[-1])}
+    if len(offsets) == 1:
+        offset = offsets.pop()
+    else:  # Daylight saving time changed during the log
+        offset = np.array([time.localtime(t).tm_gmtoff for t in unix.tolist()])
+    return pd.to_datetime(unix + offset, unit="s")
+
+
+def _load_binary(path):
+    log = open_binary_log(path)
+    df = pd.DataFrame({name: values for name, values in log.items() if name != "Unix Time (s)"}, copy=False)
+    df.insert(1, "Timestamp", _local_time(log["Unix Time (s)"]))
+    df["Time (s)"] = df["Time (s)"] - (df["Time (s)"].iloc[0] if len(df) else 0)
+    df.attrs["kind"] = KIND_TELEMETRY
+    df.attrs["source"] = os.path.abspath(path)
+    if len(df):
+        df.attrs["start_epoch"] = float(log["Unix Time (s)"][0])  # "Time (s)" starts at 0 here too
+    return df
+
+
+def load_flight(path, use_cache=True):
+    # Normalized DataFrame of one log; df.attrs["kind"] is "telemetry" or "simulation"
+    if is_binary_log(path):
+        return _load_binary(path)
+    if not use_cache:
+        return _parse(path)
+
+    key = _cache_key(path)
+    if key in _memory_cache:
+        return _memory_cache[key].copy()
+
+    cache_file = os.path.join(CACHE_DIR, f"{key}.pkl")
+    try:
+        df = pd.read_pickle(cache_file)
+    except Exception:
+        # Missing, truncated or written by another pandas version (UnpicklingError,
+        # AttributeError, ImportError, ...): a cache miss, parse again and rewrite it
+        df = _parse(path)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_pickle(cache_file)
+        except OSError:
+            pass  # Read-only home, just skip the disk cache
+    _memory_cache[key] = df
+    return df.copy()
+
+
+def start_epoch(df):
+    # Unix time of "Time (s)" = 0, None for logs without a wall clock (simulations)
+    if "start_epoch" in df.attrs:
+        return df.attrs["start_epoch"]
+    if "Timestamp" not in df or not len(df):
+        return None
+    # CSV timestamps are local time truncated to whole seconds, i.e. 0.5 s early on average; the
+    # median over all samples is robust against the logging clock drifting from the wall clock
+    ts = df["Timestamp"]
+    first = time.mktime(ts.iloc[0].timetuple())
+    offsets = (ts - ts.iloc[0]).dt.total_seconds().to_numpy() - df["Time (s)"].to_numpy()
+    return first + float(np.median(offsets)) + 0.5
+
+
+def find_logs(directory):
+    # {flight number: {"telemetry": path, "simulation": path}} for the files in a data directory
+    flights = {}
+    for name in sorted(os.listdir(directory)):
+        match = re.match(r"Flight\s*(\d+)", name)
+        if not match or not name.lower().endswith(".csv"):
+            continue
+        kind = KIND_SIMULATION if "simulation" in name.lower() else KIND_TELEMETRY
+        flights.setdefault(int(match.group(1)), {})[kind] = os.path.join(directory, name)
+    return dict(sorted(flights.items()))
@@ -0,0 +1,113 @@
+import numpy as np
+
+# GPS positions in meters: WGS84 geodetic <-> ECEF <-> local East/North/Up around the pad
+#
+# Everything works on whole NumPy arrays (a complete track in one call) as well as on single
+# values. East/North is the ground track, its length the drift from the pad. This replaces the
+# old sqrt(dlat² + dlon²) * 111139, which treats a degree of longitude as long as a degree of
+# latitude (only true at the equator; at 47° N it is off by a third).
+#
+# Latitude and longitude exactly 0 are the "no fix" values of send_data3.py and mean no position.
+
+WGS84_A = 6378137.0  # Semi-major axis (m)
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)  # First eccentricity squared
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_EP2 = WGS84_E2 / (1 - WGS84_E2)  # Second eccentricity squared
+
+DESCENT_MIN_RATE = 1.0  # m/s, slower than this is not descending (no landing prediction)
+LANDING_WINDOW = 5.0  # Seconds of track used for the drift velocity and descent rate
+
+
+def valid_fix(lat, lon):
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    return np.isfinite(lat) & np.isfinite(lon) & ~((lat == 0) & (lon == 0))
+
+
+def first_fix(lat, lon, alt):
+    # (lat, lon, alt) of the first valid fix, NaNs if there is none
+    i = np.flatnonzero(valid_fix(lat, lon))
+    if not len(i):
+        return np.nan, np.nan, np.nan
+    i = i[0]
+    return float(np.asarray(lat)[i]), float(np.asarray(lon)[i]), float(np.asarray(alt)[i])
+
+
+def geodetic_to_ecef(lat, lon, alt):
+    lat, lon = np.radians(lat), np.radians(lon)
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)  # Prime vertical radius
+    return ((n + alt) * cos_lat * np.cos(lon),
+            (n + alt) * cos_lat * np.sin(lon),
+            (n * (1 - WGS84_E2) + alt) * sin_lat)
+
+
+def ecef_to_geodetic(x, y, z):
+    # Bowring's method, sub-millimeter near the Earth's surface
+    p = np.hypot(x, y)
+    theta = np.arctan2(z * WGS84_A, p * WGS84_B)
+    sin_t, cos_t = np.sin(theta), np.cos(theta)
+    lat = np.arctan2(z + WGS84_EP2 * WGS84_B * sin_t ** 3, p - WGS84_E2 * WGS84_A * cos_t ** 3)
+    sin_lat = np.sin(lat)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+    alt = p / np.cos(lat) - n
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), alt
+
+
+def _rotation(lat0, lon0):
+    lat0, lon0 = np.radians(lat0), np.radians(lon0)
+    return np.sin(lat0), np.cos(lat0), np.sin(lon0), np.cos(lon0)
+
+
+def geodetic_to_enu(lat, lon, alt, lat0, lon0, alt0):
+    # East, North, Up (m) of the points relative to the origin
+    x, y, z = geodetic_to_ecef(lat, lon, alt)
+    x0, y0, z0 = geodetic_to_ecef(lat0, lon0, alt0)
+    dx, dy, dz = x - x0, y - y0, z - z0
+    sin_lat, cos_lat, sin_lon, cos_lon = _rotation(lat0, lon0)
+    east = -sin_lon * dx + cos_lon * dy
+    north = -sin_lat * cos_lon * dx - sin_lat * sin_lon * dy + cos_lat * dz
+    up = cos_lat * cos_lon * dx + cos_lat * sin_lon * dy + sin_lat * dz
+    return east, north, up
+
+
+def enu_to_geodetic(east, north, up, lat0, lon0, alt0):
+    sin_lat, cos_lat, sin_lon, cos_lon = _rotation(lat0, lon0)
+    x0, y0, z0 = geodetic_to_ecef(lat0, lon0, alt0)
+    x = x0 - sin_lon * east - sin_lat * cos_lon * north + cos_lat * cos_lon * up
+    y = y0 + cos_lon * east - sin_lat * sin_lon * north + cos_lat * sin_lon * up
+    z = z0 + cos_lat * north + sin_lat * up
+    return ecef_to_geodetic(x, y, z)
+
+
+def ground_track(lat, lon, alt, origin):
+    # East and North (m) from origin = (lat, lon, alt) of the pad; NaN where there is no fix
+    lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+    alt = np.broadcast_to(np.asarray(alt, dtype=np.float64), lat.shape)
+    east, north, _ = geodetic_to_enu(lat, lon, alt, *origin)
+    fix = valid_fix(lat, lon)
+    return np.where(fix, east, np.nan), np.where(fix, north, np.nan)
+
+
+def _slope(t, values):
+    # Least squares slope of values over t (per second)
+    t = t - t.mean()
+    return float(np.dot(t, values - values.mean()) / np.dot(t, t))
+
+
+def predict_landing(t, east, north, height, window=LANDING_WINDOW):
+    # Where the rocket comes down if it keeps drifting and descending like in the last `window`
+    # seconds (wind drift under the parachute). height: altitude above the pad.
+    # Returns (east, north, seconds to landing) or None while not descending or without GPS
+    t, east, north, height = (np.asarray(a, dtype=np.float64) for a in (t, east, north, height))
+    use = (t >= t[-1] - window) & np.isfinite(east) & np.isfinite(north) if len(t) else []
+    if np.count_nonzero(use) < 3:
+        return None
+    t, east, north, height = t[use], east[use], north[use], height[use]
+    if t[-1] - t[0] <= 0:
+        return None
+    descent = -_slope(t, height)
+    if descent < DESCENT_MIN_RATE or height[-1] <= 0:
+        return None
+    seconds = height[-1] / descent
+    return (east[-1] + _slope(t, east) * seconds, north[-1] + _slope(t, north) * seconds, seconds)
@@ -0,0 +1,131 @@
+from collections import namedtuple
+
+# Non-blocking NMEA reader for the PA1010D GPS on the flight computer's I2C bus
+#
+# The PA1010D keeps its NMEA output in a buffer that is read over I2C (unread bytes read as "\n").
+# poll() reads one small chunk and returns at once: no waiting for a complete sentence, and the
+# poll is skipped when another thread holds the bus. Partial sentences are kept until the rest
+# arrives, sentences with a bad checksum are counted and dropped. The module is configured to
+# send only GGA (position, altitude, satellites) at rate_hz, so a poll rate of a few times the fix
+# rate keeps up with the output:
+#
+#   gps = GpsReader(i2c, rate_hz=5)
+#   fix = gps.poll()   # Fix of a sentence completed by this poll, or None
+
+PA1010D_ADDRESS = 0x10
+CHUNK_SIZE = 32  # Bytes per poll, ~1 ms on a 400 kHz bus
+MAX_LINE = 120  # NMEA sentences are at most 82 characters; longer means garbage, start over
+
+Fix = namedtuple("Fix", ["lat", "lon", "alt", "satellites", "hdop", "utc"])  # utc: seconds of the day
+
+
+class NmeaError(ValueError):
+    pass
+
+
+def checksum(body):
+    value = 0
+    for char in body.encode("ascii"):
+        value ^= char
+    return value
+
+
+def command(body):
+    # Full NMEA/PMTK sentence with checksum, e.g. command("PMTK220,200")
+    return f"${body}*{checksum(body):02X}\r\n".encode("ascii")
+
+
+def _coordinate(value, hemisphere):
+    # NMEA ddmm.mmmm / dddmm.mmmm -> signed degrees
+    degrees, minutes = divmod(float(value), 100.0)
+    result = degrees + minutes / 60.0
+    return -result if hemisphere in ("S", "W") else result
+
+
+def parse_gga(line):
+    # Fix of a "$..GGA" sentence; None for other sentences (e.g. PMTK acknowledgements) and while
+    # the receiver has no fix. Raises NmeaError for corrupted sentences
+    if not line.startswith("$") or "*" not in line:
+        raise NmeaError(f"not an NMEA sentence: {line!r}")
+    body, _, received = line[1:].partition("*")
+    try:
+        if int(received[:2], 16) != checksum(body):
+            raise NmeaError(f"checksum mismatch: {line!r}")
+    except ValueError:
+        raise NmeaError(f"bad checksum field: {line!r}") from None
+    fields = body.split(",")
+    if not fields[0].endswith("GGA"):
+        return None
+    if len(fields) < 10:
+        raise NmeaError(f"short GGA sentence: {line!r}")
+    if not fields[6] or fields[6] == "0" or not fields[2] or not fields[4]:
+        return None  # Fix quality 0: no position yet
+    try:
+        utc = fields[1]
+        return Fix(
+            _coordinate(fields[2], fields[3]), _coordinate(fields[4], fields[5]),
+            float(fields[9] or "nan"), int(fields[7] or 0), float(fields[8] or "nan"),
+            int(utc[0:2]) * 3600 + int(utc[2:4]) * 60 + float(utc[4:]) if utc else float("nan"),
+        )
+    except ValueError:
+        raise NmeaError(f"bad GGA field: {line!r}") from None
+
+
+class GpsReader:
+    def __init__(self, i2c, rate_hz=1, address=PA1010D_ADDRESS, chunk_size=CHUNK_SIZE):
+        self.i2c = i2c
+        self.address = address
+        self.fix = None  # Latest valid fix
+        self.sentences = 0
+        self.errors = 0
+        self.busy = 0  # Polls skipped because the bus was in use
+        self._chunk = bytearray(chunk_size)
+        self._line = bytearray()
+
+        # GGA only (the other sentences would fill the buffer with nothing we use), at rate_hz
+        self._send(command("PMTK314,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0"))
+        self._send(command(f"PMTK220,{round(1000 / rate_hz)}"))
+
+    def _send(self, data):
+        # Only during setup, so waiting for the bus is fine here
+        while not self.i2c.try_lock():
+            pass
+        try:
+            self.i2c.writeto(self.address, data)
+        finally:
+            self.i2c.unlock()
+
+    def poll(self):
+        if not self.i2c.try_lock():
+            self.busy += 1
+            return None
+        try:
+            self.i2c.readfrom_into(self.address, self._chunk)
+        finally:
+            self.i2c.unlock()
+
+        new_fix = None
+        for byte in self._chunk:
+            if byte == 0x0A:  # End of a sentence, or the padding of an empty buffer
+                if self._line:
+                    new_fix = self._sentence(self._line.decode("ascii", "replace").strip()) or new_fix
+                    self._line.clear()
+            elif len(self._line) < MAX_LINE:
+                self._line.append(byte)
+            else:
+                self.errors += 1
+                self._line.clear()
+        return new_fix
+
+    def _sentence(self, line):
+        if not line:
+            return None
+        try:
+            fix = parse_gga(line)
+        except NmeaError:
+            self.errors += 1
+            return None
+        self.sentences += 1
+        if fix is not None:
+            self.fix = fix
+        return fix
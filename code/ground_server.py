@@ -0,0 +1,272 @@
+import os
+import sys
+import json
+import time
+import math
+import socket
+import asyncio
+import argparse
+import datetime
+from collections import deque
+from telemetry_packet import decode_packet, Health, Sample, PacketError
+from telemetry_receiver import LinkStats, FRAME_HEADER, FRAME_PACKET, FRAME_STATUS
+from onboard_log import BinaryLogWriter, CsvLogWriter
+from pipeline import StageQueue, Worker, BLOCK
+
+# Ground station server: receives the telemetry of every rocket, saves it and serves it to viewers
+#
+#   python ground_server.py                                  UDP 5005 in, viewers on 127.0.0.1:5010
+#   python receive_live2.py --server 127.0.0.1:5010 --vehicle 1 --rate 20
+#
+# Senders are told apart by the vehicle id in their packets (send_data3.py VEHICLE_ID). Every
+# vehicle gets its own link statistics and its own binary log in ground_data/<date>/vehicle_<id>
+# (same format as the on-board log: load it with flight_log.py or convert it with onboard_log.py)
+# plus a health.csv. The logs are written by a worker thread, so disk writes never hold up
+# receiving.
+#
+# Viewers connect over TCP and send one JSON line: {"vehicle": 1 or null for all, "rate": Hz or
+# null for every sample}. They get the accepted UDP packets unchanged (health packets always, samples
+# thinned out to the rate by sample time) and a status frame with the link statistics every second,
+# see telemetry_receiver.py for the framing. Every viewer has a bounded queue of its own: a viewer
+# that does not keep up loses its oldest packets, it never slows down the UDP side or the others.
+# The port only listens on 127.0.0.1 by default; use --host 0.0.0.0 to serve other laptops.
+
+UDP_PORT = 5005
+VIEWER_PORT = 5010
+DATA_DIR = "ground_data"
+VIEWER_QUEUE = 2000  # Packets waiting per viewer before the oldest are dropped
+LOG_QUEUE_SIZE = 100000  # Rows waiting for the disk
+STATUS_INTERVAL = 1.0  # Status frames to the viewers (s)
+REPORT_INTERVAL = 10.0  # Terminal printout (s)
+HANDSHAKE_TIMEOUT = 5.0
+
+
+class Vehicle(LinkStats):
+    def __init__(self, vehicle_id, directory):
+        super().__init__()
+        self.id = vehicle_id
+        self.address = None
+        self.log = BinaryLogWriter(os.path.join(directory, f"vehicle_{vehicle_id}"))
+        self.health_log = CsvLogWriter(os.path.join(directory, f"vehicle_{vehicle_id}", "health.csv"),
+                                       columns=Health._fields, fsync_interval=10.0)
+
+    def counters(self):
+        counters = super().counters()
+        counters["address"] = None if self.address is None else f"{self.address[0]}:{self.address[1]}"
+        return counters
+
+
+class Viewer:
+    def __init__(self, writer, vehicle=None, rate=None, max_pending=VIEWER_QUEUE):
+        self.writer = writer
+        self.vehicle = vehicle
+        self.rate = rate
+        self.min_interval = 1.0 / rate - 1e-6 if rate else 0.0  # Slack for float sample times
+        self.pending = deque(maxlen=max_pending)
+        self.skipped = 0  # Samples left out to keep to the rate
+        self.dropped = 0  # Packets lost because the viewer was too slow
+        self.status = None
+        self._last_t = {}  # Sample time of the last sample sent, per vehicle
+        self._wakeup = asyncio.Event()
+
+    def offer(self, vehicle, packet, data):
+        # Called for every accepted packet; never waits
+        if self.vehicle is not None and vehicle != self.vehicle:
+            return
+        if isinstance(packet, Sample) and self.min_interval:
+            last = self._last_t.get(vehicle)
+            if last is not None and 0 <= packet.t - last < self.min_interval:
+                self.skipped += 1
+                return
+            self._last_t[vehicle] = packet.t
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(FRAME_HEADER.pack(FRAME_PACKET, len(data)) + data)
+        self._wakeup.set()
+
+    def offer_status(self, status):
+        # Only the latest status is kept
+        status = json.dumps(dict(status, skipped=self.skipped, dropped=self.dropped))
+        payload = status.encode("utf-8")
+        self.status = FRAME_HEADER.pack(FRAME_STATUS, len(payload)) + payload
+        self._wakeup.set()
+
+    async def send(self):
+        # Writes whatever is pending, waiting for the socket only between batches
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            frames = []
+            if self.status is not None:
+                frames.append(self.status)
+                self.status = None
+            while self.pending:
+                frames.append(self.pending.popleft())
+            try:
+                self.writer.write(b"".join(frames))
+                await self.writer.drain()
+            except ConnectionError:
+                return  # Gone, serve_viewer cleans up
+
+
+class GroundServer(asyncio.DatagramProtocol):
+    def __init__(self, directory, max_pending=VIEWER_QUEUE):
+        self.directory = directory
+        self.max_pending = max_pending
+        self.vehicles = {}
+        self.viewers = set()
+        self.bad = 0
+        self.last_error = None
+
+        # Disk writes on their own thread; BLOCK would only wait if the disk falls far behind
+        self.log_queue = StageQueue("ground-log", LOG_QUEUE_SIZE, BLOCK)
+        self.logger = Worker(self.log_queue, self._write)
+        self.logger.start()
+
+    # UDP side
+
+    def datagram_received(self, data, address):
+        try:
+            vehicle_id, packet = decode_packet(data)
+        except PacketError as e:
+            self.bad += 1
+            self.last_error = str(e)
+            return
+
+        vehicle = self.vehicles.get(vehicle_id)
+        if vehicle is None:
+            vehicle = self.vehicles[vehicle_id] = Vehicle(vehicle_id, self.directory)
+            print(f"🚀 New vehicle {vehicle_id} from {address[0]}:{address[1]}")
+        vehicle.address = address
+
+        if not vehicle.accept(packet) and not isinstance(packet, Health):
+            return  # Late sample
+        self.log_queue.put((vehicle, packet, time.time()))
+        for viewer in self.viewers:
+            viewer.offer(vehicle_id, packet, data)
+
+    def _write(self, item):
+        # Logger thread
+        vehicle, packet, arrival = item
+        if isinstance(packet, Health):
+            vehicle.health_log.append(packet)
+            return
+        s = packet
+        vehicle.log.append((
+            s.t, arrival, math.nan, s.temperature, s.altitude,
+            s.accel_x, s.accel_y, s.accel_z, s.gyro_x, s.gyro_y, s.gyro_z,
+            s.mag_x, s.mag_y, s.mag_z, s.lat, s.lon, s.gps_alt,
+        ))
+
+    # Viewer side
+
+    async def serve_viewer(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        try:
+            request = json.loads(await asyncio.wait_for(reader.readline(), HANDSHAKE_TIMEOUT))
+            vehicle, rate = request.get("vehicle"), request.get("rate")
+            viewer = Viewer(writer, None if vehicle is None else int(vehicle),
+                            None if rate is None else float(rate), self.max_pending)
+        except (asyncio.TimeoutError, ValueError, TypeError, AttributeError):
+            writer.close()
+            return
+
+        print(f"👀 Viewer {peer[0]}:{peer[1]} connected (vehicle {'all' if viewer.vehicle is None else viewer.vehicle}, "
+              f"{f'{viewer.rate:g} Hz' if viewer.rate else 'every sample'})")
+        self.viewers.add(viewer)
+        viewer.offer_status(self.status())
+        sender = asyncio.ensure_future(viewer.send())
+        try:
+            # The viewer sends nothing else; reading notices when it disconnects
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass  # Disconnected; cancellation (server shutting down) propagates after the cleanup
+        finally:
+            self.viewers.discard(viewer)
+            sender.cancel()
+            writer.close()
+            print(f"👋 Viewer {peer[0]}:{peer[1]} disconnected ({viewer.dropped} packets dropped)")
+
+    def status(self):
+        # Bad packets cannot be assigned to a vehicle, they are counted for the whole server
+        return {
+            "vehicles": {str(vehicle_id): vehicle.counters() for vehicle_id, vehicle in self.vehicles.items()},
+            "bad": self.bad,
+        }
+
+    async def publish_status(self):
+        while True:
+            await asyncio.sleep(STATUS_INTERVAL)
+            status = self.status()
+            for viewer in self.viewers:
+                viewer.offer_status(status)
+
+    async def report(self):
+        last = {}
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            for vehicle_id, vehicle in sorted(self.vehicles.items()):
+                rate = (vehicle.received - last.get(vehicle_id, 0)) / REPORT_INTERVAL
+                last[vehicle_id] = vehicle.received
+                print(f"📡 Vehicle {vehicle_id}: {rate:.0f} samples/s, received {vehicle.received}  "
+                      f"lost {vehicle.lost}  late {vehicle.late}  logged {vehicle.log.rows}")
+            if self.viewers:
+                print(f"   {len(self.viewers)} viewer(s), dropped "
+                      f"{', '.join(str(viewer.dropped) for viewer in self.viewers)}")
+            if self.bad:
+                print(f"   {self.bad} bad packets, last error: {self.last_error}")
+
+    def close(self):
+        self.log_queue.close()
+        self.logger.join()
+        for vehicle in self.vehicles.values():
+            vehicle.log.close()
+            vehicle.health_log.close()
+        if self.logger.errors:
+            print(f"⚠️ {self.logger.errors} rows could not be saved, last error: {self.logger.last_error}")
+
+
+async def serve(server, udp_host, udp_port, host, port):
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)  # Like TelemetryReceiver
+    sock.bind((udp_host, udp_port))
+    transport, _ = await loop.create_datagram_endpoint(lambda: server, sock=sock)
+    viewers = await asyncio.start_server(server.serve_viewer, host, port)
+    print(f"📡 Receiving telemetry on UDP {udp_host}:{udp_port}, viewers on {host}:{port}, "
+          f"saving to {server.directory}")
+    try:
+        await asyncio.gather(server.publish_status(), server.report())
+    finally:
+        transport.close()
+        viewers.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Receive, save and serve the telemetry of several rockets")
+    parser.add_argument("--udp-host", default="0.0.0.0")
+    parser.add_argument("--udp-port", type=int, default=UDP_PORT)
+    parser.add_argument("--host", default="127.0.0.1", help="address the viewers connect to")
+    parser.add_argument("--port", type=int, default=VIEWER_PORT)
+    parser.add_argument("--data", default=DATA_DIR, help="directory for the received logs")
+    parser.add_argument("--max-pending", type=int, default=VIEWER_QUEUE,
+                        help="packets queued per viewer before the oldest are dropped")
+    args = parser.parse_args(argv)
+
+    directory = os.path.join(args.data, datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+    os.makedirs(directory, exist_ok=True)
+    server = GroundServer(directory, args.max_pending)
+    try:
+        asyncio.run(serve(server, args.udp_host, args.udp_port, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Ground server stopped")
+    finally:
+        server.close()
+        for vehicle_id, vehicle in sorted(server.vehicles.items()):
+            print(f"💾 Vehicle {vehicle_id}: {vehicle.log.rows} samples saved to {vehicle.log.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import math
+import numpy as np
+from ring_buffer import RingBuffer
+from derived_metrics import StreamDeriver
+from geodesy import predict_landing, LANDING_WINDOW
+from event_detector import FlightEventDetector
+from dashboard import Dashboard, set_line
+
+# Live telemetry processing and dashboard of the ground station (receive_live2.py)
+#
+# GroundProcessor turns blocks of received samples into the plotted channels (derived metrics and
+# flight events) and keeps the visible history; create_dashboard() builds the 3x3 live figure on any
+# matplotlib figure, so the same code runs on screen and off screen (bench_telemetry.py).
+# health_status() is the one line summary of the flight computer's health reports.
+#
+# The GPS plot is the ground track in meters East/North of the first fix, with the landing point
+# predicted from the last LANDING_WINDOW seconds of drift and descent (updated every block).
+
+HISTORY_SECONDS = 100  # Visible time window
+HISTORY_SAMPLES = 10000  # Enough for the window at 100 Hz
+CHANNELS = [
+    "time", "temperature", "alt_baro", "alt_gps", "vertical_velocity",
+    "total_acc", "vert_acc", "pitch", "roll", "yaw",
+    "pitch_rate", "roll_rate", "yaw_rate", "drift", "east", "north",
+]
+
+TITLES = [
+    "Temperature vs Time", "Altitude (Barometric & GPS) vs Time", "Vertical Velocity vs Time",
+    "Total Acceleration vs Time", "Vertical Acceleration vs Time", "Orientation (Pitch, Roll, Yaw)",
+    "Angular Rates (Pitch, Roll, Yaw)", "Rocket Drift vs Time", "GPS Ground Track (m)"
+]
+YLIMS = [
+    (0, 50), (0, 250), (-12.5, 60),
+    (0, 90), (0, 90), (-180, 180),
+    (-25, 40), (0, 500), None
+]
+
+HEALTH_TIMEOUT = 5.0  # Seconds without a health report before it is shown as missing
+CPU_TEMPERATURE_WARNING = 80.0  # °C, the Raspberry Pi starts throttling soon after
+
+# Line definitions: channel -> (axes index, label, color)
+LINES = {
+    "temperature": (0, "Temp (°C)", "red"),
+    "alt_baro": (1, "Baro (m)", "blue"),
+    "alt_gps": (1, "GPS (m)", "red"),
+    "vertical_velocity": (2, "Vert Vel (m/s)", "green"),
+    "total_acc": (3, "Total Acc (m/s²)", "purple"),
+    "vert_acc": (4, "Vert Acc (m/s²)", "orange"),
+    "pitch": (5, "Pitch (°)", "blue"),
+    "roll": (5, "Roll (°)", "red"),
+    "yaw": (5, "Yaw (°)", "green"),
+    "pitch_rate": (6, "Pitch Rate (°/s)", "blue"),
+    "roll_rate": (6, "Roll Rate (°/s)", "red"),
+    "yaw_rate": (6, "Yaw Rate (°/s)", "green"),
+    "drift": (7, "Drift (m)", "brown"),
+    "gps_path": (8, "GPS Path", None),
+    "landing": (8, "Predicted landing", "red"),
+}
+COMPASS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+
+
+class GroundProcessor:
+    def __init__(self, capacity=HISTORY_SAMPLES, spill_path=None, on_event=None):
+        self.history = RingBuffer(CHANNELS, capacity, spill_path=spill_path)
+        self.deriver = StreamDeriver()  # Calibrated on the first received sample
+        self.detector = FlightEventDetector(on_event=on_event)
+        self.start_t = None
+        self.pad_altitude = None
+        self.landing = None  # (east, north, seconds) of the predicted landing, None if not descending
+
+    def process(self, samples):
+        # Adds a block of received samples to the history; returns the flight events it contained
+        block = np.array([sample[1:] for sample in samples], dtype=np.float64)
+        t, temperature, altitude, gps_alt = block[:, 0], block[:, 1], block[:, 2], block[:, 3]
+        ax_, ay_, az_ = block[:, 4], block[:, 5], block[:, 6]
+        gx_, gy_, gz_ = block[:, 7], block[:, 8], block[:, 9]
+        mx_, my_, mz_ = block[:, 10], block[:, 11], block[:, 12]
+        lat, lon = block[:, 13], block[:, 14]
+
+        # Time since first packet, from the sender's clock
+        if self.start_t is None:
+            self.start_t, self.pad_altitude = t[0], altitude[0]
+        t = t - self.start_t
+
+        d = self.deriver.process(t, altitude, ax_, ay_, az_, gx_, gy_, gz_, mx_, my_, mz_, lat, lon, gps_alt)
+
+        events = []
+        accel = np.sqrt(ax_ * ax_ + ay_ * ay_ + az_ * az_)
+        for row in zip(t.tolist(), d["Altitude_Estimate"].tolist(), d["Vertical_Velocity"].tolist(), accel.tolist()):
+            events.extend(self.detector.update(*row))
+
+        # Angular rates are the raw gyro values
+        self.history.extend(np.column_stack((
+            t, temperature, altitude, gps_alt, d["Vertical_Velocity"],
+            d["Total_Acceleration"], d["Vertical_Acceleration"], d["Pitch"], d["Roll"], d["Yaw"],
+            gx_, gy_, gz_, d["Rocket_Drift"], d["GPS_East"], d["GPS_North"],
+        )))
+
+        # Landing prediction from the newest samples only (a few hundred at most)
+        history = self.history
+        time_view = history.view("time")
+        recent = slice(np.searchsorted(time_view, time_view[-1] - LANDING_WINDOW), None)
+        self.landing = predict_landing(time_view[recent], history.view("east")[recent],
+                                       history.view("north")[recent],
+                                       history.view("alt_baro")[recent] - self.pad_altitude)
+        return events
+
+    def update_lines(self, lines):
+        # Points the plot lines at the visible window (decimated to the axes width); returns the newest time
+        history = self.history
+        time_view = history.view("time")
+        for name, line in lines.items():
+            if name == "gps_path":
+                set_line(line, history.view("east"), history.view("north"))
+            elif name == "landing":
+                line.set_data(*(([self.landing[0]], [self.landing[1]]) if self.landing else ([], [])))
+            else:
+                set_line(line, time_view, history.view(name))
+        return history.latest("time")
+
+    def close(self):
+        self.history.close()
+
+
+def health_status(health, age):
+    # health: latest Health report, age: seconds since it arrived
+    if health is None:
+        return "Flight computer: no health report"
+    if age > HEALTH_TIMEOUT:
+        return f"Flight computer: no health report for {age:.0f} s"
+
+    temperature = "" if math.isnan(health.cpu_temp) else f"{health.cpu_temp:.0f}°C "
+    if health.cpu_temp >= CPU_TEMPERATURE_WARNING:
+        temperature = "⚠️ " + temperature
+    stages = "  ".join(f"{name} {getattr(health, name + '_ms'):.2f}/{getattr(health, name + '_max_ms'):.1f}"
+                       for name in ("imu", "baro", "mag", "sample", "log", "send"))
+    return (f"Flight computer: {temperature}load {health.load:.2f} CPU {health.cpu_percent:.0f}%  "
+            f"| ms mean/max: {stages}  "
+            f"| overruns {health.overruns}  send errors {health.send_failures}  "
+            f"radio dropped {health.radio_dropped}  log waits {health.log_blocked}")
+
+
+def landing_status(landing):
+    # landing: GroundProcessor.landing
+    if landing is None:
+        return ""
+    east, north, seconds = landing
+    bearing = COMPASS[round(math.degrees(math.atan2(east, north)) / 45) % 8]
+    return f"Landing in {seconds:.0f} s, {math.hypot(east, north):.0f} m {bearing} of the pad"
+
+
+def create_dashboard(fig, blit=True, window=HISTORY_SECONDS):
+    # The 3x3 live plots on fig; returns (dashboard, lines)
+    ax = fig.subplots(3, 3).flatten()
+    for i in range(9):
+        ax[i].set_title(TITLES[i])
+        if YLIMS[i]: ax[i].set_ylim(*YLIMS[i])
+        ax[i].grid(True)
+
+    lines = {name: ax[i].plot([], [], label=label, color=color)[0]
+             for name, (i, label, color) in LINES.items()}
+    lines["landing"].set(marker="x", markersize=10, linestyle="none")
+    ax[8].plot(0, 0, "^", color="black", label="Pad")
+    ax[8].set_aspect("equal", adjustable="datalim")
+    for a in ax: a.legend()
+
+    dashboard = Dashboard(fig, ax[:8], lines.values(), window=window, path_axes=[ax[8]], blit=blit)
+    return dashboard, lines
@@ -0,0 +1,69 @@
+import os
+import math
+import time
+from telemetry_packet import Health, HEALTH_STAGES
+
+# Runtime instrumentation of the flight computer (send_data3.py)
+#
+# Every stage of the acquisition loop reports its duration with add(stage, seconds). Per stage only
+# count, sum and maximum of the current interval are kept, so a measurement costs two perf_counter()
+# calls and a few additions. report() turns the interval since the previous report into a Health
+# packet (mean and max per stage, CPU temperature, load average, CPU use of this process and the
+# counters passed in) and starts the next interval.
+#
+# Stages are timed on different threads (sampling, logger, transmitter) without locks: every stage
+# has one writer, and report() swaps in a fresh interval, so a measurement taken exactly during a
+# report may be counted in either interval or, rarely, not at all.
+
+CPU_TEMPERATURE_FILE = "/sys/class/thermal/thermal_zone0/temp"  # Raspberry Pi SoC, in m°C
+
+
+class _Interval:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+def cpu_temperature():
+    # °C, NaN where the temperature is not available (e.g. a laptop running --mock)
+    try:
+        with open(CPU_TEMPERATURE_FILE) as f:
+            return int(f.read()) / 1000
+    except (OSError, ValueError):
+        return math.nan
+
+
+class HealthMonitor:
+    def __init__(self, stages=HEALTH_STAGES, clock=time.monotonic):
+        self.clock = clock
+        self.seq = 0
+        self._stages = {name: _Interval() for name in stages}
+        self._last = clock()
+        self._cpu = time.process_time()
+
+    def add(self, stage, seconds):
+        interval = self._stages[stage]
+        interval.count += 1
+        interval.total += seconds
+        if seconds > interval.max:
+            interval.max = seconds
+
+    def report(self, t, overruns=0, send_failures=0, radio_dropped=0, log_blocked=0, log_depth=0):
+        # Health packet for the interval since the previous report (t = sender time, like Sample.t)
+        now, cpu = self.clock(), time.process_time()
+        cpu_percent = (cpu - self._cpu) / max(now - self._last, 1e-9) * 100
+        self._last, self._cpu = now, cpu
+
+        timings = []
+        for name in self._stages:
+            interval, self._stages[name] = self._stages[name], _Interval()
+            mean = interval.total / interval.count if interval.count else 0.0
+            timings += [mean * 1000, interval.max * 1000]
+
+        health = Health(self.seq, t, cpu_temperature(), os.getloadavg()[0], cpu_percent, *timings,
+                        overruns, send_failures, radio_dropped, log_blocked, log_depth)
+        self.seq += 1
+        return health
@@ -0,0 +1,172 @@
+import time
+import random
+import datetime
+import numpy as np
+from types import SimpleNamespace
+from geodesy import valid_fix, enu_to_geodetic
+from gps_reader import PA1010D_ADDRESS, checksum
+
+# Stand-ins for the sensor libraries of send_data3.py, so the flight script runs on any Linux box:
+#
+#   python send_data3.py --mock                          rocket resting on the pad (with sensor noise)
+#   python send_data3.py --mock ../data/Flight4.csv      the sensors replay a recorded flight
+#
+# Like the real chips, each read returns the latest sample at the time of the read (time since
+# the sensors were created), so send_data3.py samples a replayed flight at its own rates. Only
+# the attributes send_data3.py uses are provided.
+#
+# The PA1010D GPS answers on the I2C bus with GGA sentences at the configured rate. The recorded
+# logs have no GPS fix (all 0), so a replayed flight gets one: the pad at MOCK_PAD and a constant
+# wind drift while the rocket is in the air.
+
+MOCK_PAD = (47.3977, 8.5456, 420.0)  # lat, lon, alt (m)
+MOCK_WIND = (3.0, 1.5)  # East, North drift (m/s) while airborne
+AIRBORNE_HEIGHT = 5.0  # m above the first altitude of the log
+
+_source = {"channels": None, "start": None}
+
+
+def use_log(path):
+    # Replay this log instead of the pad values (call before creating the sensors)
+    from flight_log import load_flight
+    from telemetry_replay import sensor_channels
+    channels = sensor_channels(load_flight(path))
+    if not valid_fix(channels["lat"], channels["lon"]).any():
+        _add_gps(channels)
+    _source["channels"] = channels
+
+
+def _add_gps(channels):
+    t, altitude = channels["t"], channels["altitude"]
+    height = altitude - altitude[0]
+    airborne = np.diff(t, prepend=t[0]) * (height > AIRBORNE_HEIGHT)
+    east, north = np.cumsum(airborne) * MOCK_WIND[0], np.cumsum(airborne) * MOCK_WIND[1]
+    lat, lon, gps_alt = enu_to_geodetic(east, north, height, *MOCK_PAD)
+    channels.update(lat=lat, lon=lon, gps_alt=gps_alt)
+
+
+def _now():
+    if _source["start"] is None:
+        _source["start"] = time.monotonic()
+    return time.monotonic() - _source["start"]
+
+
+def _read(*names):
+    channels = _source["channels"]
+    i = max(np.searchsorted(channels["t"], _now(), side="right") - 1, 0)
+    return tuple(float(channels[name][i]) for name in names)
+
+
+def _noise(value, sigma):
+    return value + random.gauss(0.0, sigma)
+
+
+class PA1010D:
+    # The GPS side of the bus: NMEA output buffer, unread bytes read as "\n"
+
+    def __init__(self):
+        self.interval = 1.0
+        self.next_fix = _now()
+        self.output = bytearray()
+
+    def write(self, data):
+        # Only the update rate command matters here
+        text = bytes(data).decode("ascii", "replace")
+        if text.startswith("$PMTK220,"):
+            self.interval = int(text[9:].partition("*")[0]) / 1000.0
+
+    def read(self, buffer):
+        now = _now()
+        if now >= self.next_fix:
+            self.output += self._gga()
+            self.next_fix = max(self.next_fix + self.interval, now)
+        n = min(len(buffer), len(self.output))
+        buffer[:n] = self.output[:n]
+        buffer[n:] = b"\n" * (len(buffer) - n)
+        del self.output[:n]
+
+    def _gga(self):
+        if _source["channels"] is None:
+            lat, lon, alt = _noise(MOCK_PAD[0], 1e-5), _noise(MOCK_PAD[1], 1e-5), _noise(MOCK_PAD[2], 1.0)
+        else:
+            lat, lon, alt = _read("lat", "lon", "gps_alt")
+        utc = datetime.datetime.now(datetime.timezone.utc).strftime("%H%M%S.%f")[:9]
+        if valid_fix(lat, lon):
+            lat_deg, lon_deg = int(abs(lat)), int(abs(lon))
+            position = (f"{lat_deg:02d}{(abs(lat) - lat_deg) * 60:07.4f},{'N' if lat >= 0 else 'S'},"
+                        f"{lon_deg:03d}{(abs(lon) - lon_deg) * 60:07.4f},{'E' if lon >= 0 else 'W'},1,09,0.9,"
+                        f"{alt:.1f},M,47.0,M,,")
+        else:
+            position = ",,,,0,00,99.9,,M,,M,,"
+        body = f"GPGGA,{utc},{position}"
+        return f"${body}*{checksum(body):02X}\r\n".encode("ascii")
+
+
+class I2C:
+    def __init__(self, scl=None, sda=None):
+        self._locked = False
+        self._devices = {PA1010D_ADDRESS: PA1010D()}
+
+    def try_lock(self):
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self):
+        self._locked = False
+
+    def writeto(self, address, buffer):
+        self._devices[address].write(buffer)
+
+    def readfrom_into(self, address, buffer):
+        self._devices[address].read(buffer)
+
+
+class DPS310:
+    def __init__(self, i2c):
+        _now()
+
+    @property
+    def pressure(self):
+        if _source["channels"] is None:
+            return _noise(1013.25, 0.01)
+        return _read("pressure")[0]
+
+    @property
+    def temperature(self):
+        if _source["channels"] is None:
+            return _noise(20.0, 0.01)
+        return _read("temperature")[0]
+
+
+class ICM20948:
+    def __init__(self, i2c):
+        self.accelerometer_data_rate = None
+        self.gyro_data_rate = None
+        _now()
+
+    @property
+    def acceleration(self):
+        if _source["channels"] is None:
+            return _noise(9.81, 0.05), _noise(0.0, 0.05), _noise(0.0, 0.05)  # Long axis (x) up
+        return _read("accel_x", "accel_y", "accel_z")
+
+    @property
+    def gyro(self):
+        if _source["channels"] is None:
+            return _noise(0.0, 0.002), _noise(0.0, 0.002), _noise(0.0, 0.002)
+        return _read("gyro_x", "gyro_y", "gyro_z")
+
+    @property
+    def magnetic(self):
+        if _source["channels"] is None:
+            return _noise(-40.0, 0.3), _noise(10.0, 0.3), _noise(-30.0, 0.3)
+        return _read("mag_x", "mag_y", "mag_z")
+
+
+# Module-like namespaces, used as `board`, `busio`, `adafruit_dps310` and `adafruit_icm20x`
+board = SimpleNamespace(SCL=None, SDA=None)
+busio = SimpleNamespace(I2C=I2C)
+adafruit_dps310 = SimpleNamespace(DPS310=DPS310)
+adafruit_icm20x = SimpleNamespace(ICM20948=ICM20948)
@@ -0,0 +1,165 @@
+import os
+import sys
+import csv
+import json
+import time
+import datetime
+import numpy as np
+
+# On-board flight logging for send_data3.py
+#
+# A binary log is a directory with a meta.json and preallocated, append-only column chunks
+# (seg_00000.npy, seg_00001.npy, ...). Every segment is a float64 .npy array of shape
+# (columns, chunk_rows), so each channel is one contiguous row that analysis tools can
+# memory-map directly. The time column is prefilled with NaN, which marks the end of the
+# data if the Pi loses power before the log is closed. Segments are flushed to the SD card
+# every fsync_interval seconds instead of after every sample.
+#
+#   python onboard_log.py <log directory> [output.csv]   converts a binary log to CSV
+
+LOG_COLUMNS = [
+    "Time (s)", "Unix Time (s)", "Pressure (hPa)", "Temperature (°C)", "Altitude (m)",
+    "Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)",
+    "Gyro_X (°/s)", "Gyro_Y (°/s)", "Gyro_Z (°/s)",
+    "Mag_X (µT)", "Mag_Y (µT)", "Mag_Z (µT)", "GPS_Latitude", "GPS_Longitude", "GPS_Altitude (m)",
+]
+
+# Same layout as the logs in data/ (send_data.py)
+CSV_COLUMNS = ["Time (s)", "Timestamp"] + LOG_COLUMNS[2:]
+
+META_FILE = "meta.json"
+LOG_VERSION = 1
+
+
+class BinaryLogWriter:
+    def __init__(self, directory, columns=LOG_COLUMNS, chunk_rows=65536, fsync_interval=1.0):
+        self.directory = directory
+        self.columns = list(columns)
+        self.chunk_rows = chunk_rows
+        self.fsync_interval = fsync_interval
+        self.rows = 0
+        self._segment = None
+        self._segment_index = -1
+        self._row = chunk_rows
+        self._last_sync = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        self._write_meta(closed=False)
+
+    def _write_meta(self, closed):
+        meta = {
+            "version": LOG_VERSION,
+            "columns": self.columns,
+            "dtype": "<f8",
+            "chunk_rows": self.chunk_rows,
+            "rows": self.rows,
+            "closed": closed,
+        }
+        tmp = os.path.join(self.directory, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp, os.path.join(self.directory, META_FILE))
+
+    def _next_segment(self):
+        self._sync()
+        self._segment_index += 1
+        path = os.path.join(self.directory, f"seg_{self._segment_index:05d}.npy")
+        self._segment = np.lib.format.open_memmap(
+            path, mode="w+", dtype="<f8", shape=(len(self.columns), self.chunk_rows))
+        self._segment[0] = np.nan  # Unwritten rows
+        self._row = 0
+
+    def append(self, values):
+        # One sample, values in column order
+        if self._row == self.chunk_rows:
+            self._next_segment()
+        self._segment[:, self._row] = values
+        self._row += 1
+        self.rows += 1
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        if self._segment is not None:
+            self._segment.flush()
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        self._sync()
+        self._segment = None
+        self._write_meta(closed=True)
+
+
+class CsvLogWriter:
+    # Fallback that writes the CSV directly, keeping the file open and flushing periodically
+
+    def __init__(self, path, columns=CSV_COLUMNS, fsync_interval=1.0):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.rows = 0
+        self._file = open(path, mode="w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+        self._last_sync = time.monotonic()
+
+    def append(self, values):
+        self._writer.writerow(values)
+        self.rows += 1
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def is_binary_log(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def open_binary_log(directory):
+    # {column: array} memory-mapped read only; zero-copy when the log fits in one segment
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    segments = sorted(name for name in os.listdir(directory) if name.startswith("seg_") and name.endswith(".npy"))
+    parts = [np.load(os.path.join(directory, name), mmap_mode="r") for name in segments]
+
+    if not parts:
+        return {name: np.empty(0) for name in meta["columns"]}
+
+    # The last segment is only partly filled (NaN time); an unclosed log may not have its final row count
+    last = parts[-1]
+    nan_rows = np.flatnonzero(np.isnan(last[0]))
+    parts[-1] = last[:, :nan_rows[0]] if len(nan_rows) else last
+
+    data = parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+    return {name: data[i] for i, name in enumerate(meta["columns"])}
+
+
+def export_csv(directory, csv_path):
+    log = open_binary_log(directory)
+    n = len(log[LOG_COLUMNS[0]])
+    timestamps = [datetime.datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S")
+                  for t in log["Unix Time (s)"].tolist()]
+    with open(csv_path, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        columns = [log[name].tolist() for name in CSV_COLUMNS if name != "Timestamp"]
+        for i in range(n):
+            row = [col[i] for col in columns]
+            row.insert(1, timestamps[i])
+            writer.writerow(row)
+    return n
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python onboard_log.py <log directory> [output.csv]")
+        sys.exit(1)
+    log_dir = sys.argv[1].rstrip("/")
+    out = sys.argv[2] if len(sys.argv) > 2 else f"{log_dir}.csv"
+    rows = export_csv(log_dir, out)
+    print(f"✅ Wrote {rows} rows to {out}")
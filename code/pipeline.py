@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+
+# Producer/consumer stages for the flight computer
+#
+# The sampling loop only puts samples into bounded queues; logging and radio run on their own
+# worker threads so a slow SD card write or a blocking socket never delays the next sensor
+# read. Each queue has a backpressure policy:
+#   DROP_OLDEST  full queue discards its oldest item (radio: only fresh data is worth sending)
+#   BLOCK        full queue makes the producer wait (log: nothing may be lost)
+
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+
+class StageQueue:
+    def __init__(self, name, maxsize, policy=BLOCK):
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self.closed = False
+
+        # Counters
+        self.put_count = 0
+        self.dropped = 0
+        self.blocked = 0  # Times the producer had to wait
+        self.max_depth = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    self.blocked += 1
+                    while len(self._items) >= self.maxsize and not self.closed:
+                        self._not_full.wait()
+            self._items.append(item)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._not_empty.notify()
+
+    def get_batch(self, max_items=64, timeout=0.5):
+        # Up to max_items oldest items; an empty list on timeout or when closed and drained
+        with self._lock:
+            if not self._items and not self.closed:
+                self._not_empty.wait(timeout)
+            batch = []
+            while self._items and len(batch) < max_items:
+                batch.append(self._items.popleft())
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def stats(self):
+        return (f"{self.name}: depth {len(self._items)}/{self.maxsize} (max {self.max_depth}), "
+                f"{self.put_count} in, {self.dropped} dropped, {self.blocked} waits")
+
+
+class Worker(threading.Thread):
+    # Calls handler(item) for every item of a queue until it is closed and drained
+
+    def __init__(self, queue, handler):
+        super().__init__(name=f"{queue.name}-worker", daemon=True)
+        self.queue = queue
+        self.handler = handler
+        self.processed = 0
+        self.errors = 0
+        self.last_error = None
+
+    def run(self):
+        while True:
+            batch = self.queue.get_batch()
+            if not batch:
+                if self.queue.closed and not len(self.queue):
+                    return
+                continue
+            for item in batch:
+                try:
+                    self.handler(item)
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = e
+                self.processed += 1
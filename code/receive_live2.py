@@ -1,173 +1,68 @@
+import time
+import argparse
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-import socket
-from math import sqrt, atan2, degrees
+from telemetry_receiver import TelemetryReceiver, RemoteReceiver
+from ground_station import GroundProcessor, create_dashboard, health_status, landing_status
 
-# Set up UDP
+#   python receive_live2.py                                            receives the UDP telemetry itself
+#   python receive_live2.py --server 127.0.0.1:5010 --vehicle 1 --rate 20   watches through ground_server.py
+
+parser = argparse.ArgumentParser(description="Live telemetry dashboard")
+parser.add_argument("--server", help="host:port of a ground_server.py instead of receiving UDP directly")
+parser.add_argument("--vehicle", type=int, help="only show this vehicle id (needed when several fly)")
+parser.add_argument("--rate", type=float, help="with --server: at most this many samples per second")
+args = parser.parse_args()
+
+# Set up UDP (packets are received on a background thread)
 HOST = '0.0.0.0'
 PORT = 5005
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-sock.bind((HOST, PORT))
-sock.settimeout(2)
+FRAME_INTERVAL_MS = 50  # Plot refresh; every packet received in between is used
+FAST_RENDERING = True  # Blit only the lines; False redraws the whole figure every frame
+if args.server:
+    server_host, server_port = args.server.rsplit(":", 1)
+    receiver = RemoteReceiver(server_host, int(server_port), vehicle=args.vehicle, rate=args.rate)
+else:
+    receiver = TelemetryReceiver(HOST, PORT, vehicle=args.vehicle)
+receiver.start()
 
-# Data storage
-time_data = []
-temperature_data = []
-altitude_barometric_data = []
-altitude_gps_data = []
-vertical_velocity_data = []
-total_acceleration_data = []
-vertical_acceleration_data = []
-pitch_data = []
-roll_data = []
-yaw_data = []
-pitch_rate_data = []
-roll_rate_data = []
-yaw_rate_data = []
-drift_data = []
-latitude_data = []
-longitude_data = []
+# Data storage: only the last samples of the visible window are kept in memory
+SPILL_FILE = None  # e.g. "ground_history.f64" to also keep the whole flight on disk
 
-# Calibration references
-prev_altitude = None
-initial_lat = None
-initial_lon = None
-initial_total_acc = None
-initial_vert_acc = None
-initial_roll = None
 
-# Plot setup
-fig, ax = plt.subplots(3, 3, figsize=(16, 12))
-ax = ax.flatten()
+# Flight events (liftoff, burnout, apogee, landing), marked on the plots
+def on_event(event):
+    print(f"🚀 {event.name} at {event.t:.2f} s ({event.altitude:.1f} m)")
+    dashboard.add_marker(event.t, event.name)
 
-titles = [
-    "Temperature vs Time", "Altitude (Barometric & GPS) vs Time", "Vertical Velocity vs Time",
-    "Total Acceleration vs Time", "Vertical Acceleration vs Time", "Orientation (Pitch, Roll, Yaw)",
-    "Angular Rates (Pitch, Roll, Yaw)", "Rocket Drift vs Time", "GPS 2D Path"
-]
-ylims = [
-    (0, 50), (0, 250), (-12.5, 60),
-    (0, 90), (0, 90), (-180, 180),
-    (-25, 40), (0, 500), None
-]
 
-for i in range(9):
-    ax[i].set_title(titles[i])
-    if ylims[i]: ax[i].set_ylim(*ylims[i])
-    ax[i].grid(True)
+# Derived telemetry, calibrated on the first received sample
+processor = GroundProcessor(spill_path=SPILL_FILE, on_event=on_event)
 
-# Line definitions
-lines = {
-    "temperature": ax[0].plot([], [], label="Temp (°C)", color='red')[0],
-    "alt_baro": ax[1].plot([], [], label="Baro (m)", color='blue')[0],
-    "alt_gps": ax[1].plot([], [], label="GPS (m)", color='red')[0],
-    "vertical_velocity": ax[2].plot([], [], label="Vert Vel (m/s)", color='green')[0],
-    "total_acc": ax[3].plot([], [], label="Total Acc (m/s²)", color='purple')[0],
-    "vert_acc": ax[4].plot([], [], label="Vert Acc (m/s²)", color='orange')[0],
-    "pitch": ax[5].plot([], [], label="Pitch (°)", color='blue')[0],
-    "roll": ax[5].plot([], [], label="Roll (°)", color='red')[0],
-    "yaw": ax[5].plot([], [], label="Yaw (°)", color='green')[0],
-    "pitch_rate": ax[6].plot([], [], label="Pitch Rate (°/s)", color='blue')[0],
-    "roll_rate": ax[6].plot([], [], label="Roll Rate (°/s)", color='red')[0],
-    "yaw_rate": ax[6].plot([], [], label="Yaw Rate (°/s)", color='green')[0],
-    "drift": ax[7].plot([], [], label="Drift (m)", color='brown')[0],
-    "gps_path": ax[8].plot([], [], label="GPS Path")[0],
-}
+# Plot setup
+fig = plt.figure(figsize=(16, 12))
+dashboard, lines = create_dashboard(fig, blit=FAST_RENDERING)
 
-for a in ax: a.legend()
 
-# Update function
+# Update function, consumes every sample received since the previous frame; the status and health
+# lines are refreshed on every frame, also while no packets arrive (e.g. the link is down)
 def update_plot(frame):
-    global prev_altitude, initial_lat, initial_lon
-    global initial_total_acc, initial_vert_acc, initial_roll
-
-    try:
-        data, _ = sock.recvfrom(1024)
-        fields = data.decode("utf-8").strip().split(",")
-
-        if len(fields) >= 15:
-            temperature = float(fields[1])
-            altitude = float(fields[2])
-            gps_alt = float(fields[3])
-            ax_, ay_, az_ = float(fields[4]), float(fields[5]), float(fields[6])
-            gx_, gy_, gz_ = float(fields[7]), float(fields[8]), float(fields[9])
-            lat, lon = float(fields[13]), float(fields[14])
-
-            # Time
-            t = time_data[-1] + 1 if time_data else 0
-            time_data.append(t)
-
-            # Base telemetry
-            temperature_data.append(temperature)
-            altitude_barometric_data.append(altitude)
-            altitude_gps_data.append(gps_alt)
-            latitude_data.append(lat)
-            longitude_data.append(lon)
-
-            # Vertical Velocity
-            if prev_altitude is not None:
-                vertical_velocity_data.append(altitude - prev_altitude)
-            else:
-                vertical_velocity_data.append(0)
-            prev_altitude = altitude
-
-            # Total acceleration (calibrated)
-            total_acc = sqrt(ax_**2 + ay_**2 + az_**2)
-            if initial_total_acc is None:
-                initial_total_acc = total_acc
-            total_acceleration_data.append(total_acc - initial_total_acc)
-
-            # Vertical acceleration
-            if initial_vert_acc is None:
-                initial_vert_acc = az_
-            vertical_acceleration_data.append(az_ - initial_vert_acc)
-
-            # Orientation
-            pitch = degrees(atan2(ay_, sqrt(ax_**2 + az_**2)))
-            roll = degrees(atan2(ax_, sqrt(ay_**2 + az_**2)))
-            yaw = degrees(atan2(az_, sqrt(ax_**2 + ay_**2)))
-            if initial_roll is None:
-                initial_roll = roll
-            roll -= initial_roll
-            pitch_data.append(pitch)
-            roll_data.append(roll)
-            yaw_data.append(yaw)
-
-            # Angular Rates
-            pitch_rate_data.append(gx_)
-            roll_rate_data.append(gy_)
-            yaw_rate_data.append(gz_)
-
-            # Rocket Drift
-            if initial_lat is None:
-                initial_lat = lat
-                initial_lon = lon
-            drift = sqrt((lat - initial_lat)**2 + (lon - initial_lon)**2) * 111139
-            drift_data.append(drift)
-
-            # Update plots
-            lines["temperature"].set_data(time_data, temperature_data)
-            lines["alt_baro"].set_data(time_data, altitude_barometric_data)
-            lines["alt_gps"].set_data(time_data, altitude_gps_data)
-            lines["vertical_velocity"].set_data(time_data, vertical_velocity_data)
-            lines["total_acc"].set_data(time_data, total_acceleration_data)
-            lines["vert_acc"].set_data(time_data, vertical_acceleration_data)
-            lines["pitch"].set_data(time_data, pitch_data)
-            lines["roll"].set_data(time_data, roll_data)
-            lines["yaw"].set_data(time_data, yaw_data)
-            lines["pitch_rate"].set_data(time_data, pitch_rate_data)
-            lines["roll_rate"].set_data(time_data, roll_rate_data)
-            lines["yaw_rate"].set_data(time_data, yaw_rate_data)
-            lines["drift"].set_data(time_data, drift_data)
-            lines["gps_path"].set_data(latitude_data, longitude_data)
-
-            # X-axis limits
-            for a in ax[:8]:
-                a.set_xlim(max(0, t - 100), t + 10)
-
-    except socket.timeout:
-        print("No data received (timeout)")
-
-ani = animation.FuncAnimation(fig, update_plot, interval=1000, blit=False)
-plt.tight_layout()
+    t = None
+    pending = receiver.drain()
+    if pending:
+        processor.process(pending)
+
+        # Update plots with views of the visible window
+        t = processor.update_lines(lines)
+
+    # Axes are only rescaled when the data leaves the visible window
+    health_age = None if receiver.health is None else time.monotonic() - receiver.health_time
+    dashboard.refresh(t, f"Phase: {processor.detector.phase}  {landing_status(processor.landing)}  "
+                         f"Packets received: {receiver.received}  lost: {receiver.lost}  late: {receiver.late}  bad: {receiver.bad}"
+                         f"{f'  skipped: {receiver.skipped}  dropped: {receiver.dropped}' if args.server else ''}\n"
+                         f"{health_status(receiver.health, health_age)}")
+
+plt.tight_layout(rect=(0, 0, 1, 0.97))  # Room for the two status lines
+dashboard.start(update_plot, FRAME_INTERVAL_MS)
 plt.show()
+receiver.stop()
+processor.close()
@@ -0,0 +1,93 @@
+import json
+import numpy as np
+
+# Fixed size columnar ring buffer for live telemetry
+#
+# Every channel is a preallocated float array of twice the capacity and each value is written
+# at i and i + capacity. The newest `capacity` values are then always one contiguous slice, so
+# the plot gets plain views without copying or np.roll. Optionally every row is also appended
+# to a raw float64 file on disk so the whole flight can be kept even though only a window is
+# held in memory; its channel names are in a .json file next to it.
+
+
+class RingBuffer:
+    def __init__(self, channels, capacity, dtype=np.float64, spill_path=None):
+        self.channels = list(channels)
+        self.capacity = int(capacity)
+        self._index = {name: i for i, name in enumerate(self.channels)}
+        self._data = np.zeros((len(self.channels), 2 * self.capacity), dtype=dtype)
+        self._total = 0
+
+        self._spill = None
+        if spill_path is not None:
+            # An existing spill with the same channels is continued (e.g. after a restart of the
+            # ground station), anything else is replaced so the metadata always describes the file
+            meta = {"channels": self.channels, "dtype": "<f8"}
+            if _spill_meta(spill_path) == meta:
+                self._spill = open(spill_path, "ab")
+                row = 8 * len(self.channels)
+                self._spill.truncate(self._spill.seek(0, 2) // row * row)  # Drop a row cut short by a crash
+            else:
+                with open(f"{spill_path}.json", "w") as f:
+                    json.dump(meta, f)
+                self._spill = open(spill_path, "wb")
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    @property
+    def total(self):
+        # Number of rows ever appended, including the ones that fell out of the window
+        return self._total
+
+    def append(self, row):
+        self.extend([row])
+
+    def extend(self, rows):
+        # rows: sequence of rows (one value per channel, in channel order)
+        block = np.asarray(rows, dtype=self._data.dtype)
+        if block.ndim != 2 or block.shape[1] != len(self.channels):
+            raise ValueError(f"expected rows of {len(self.channels)} values, got shape {block.shape}")
+        if self._spill is not None:
+            block.astype("<f8", copy=False).tofile(self._spill)
+
+        n = len(block)
+        if n > self.capacity:
+            block = block[-self.capacity:]
+        idx = (self._total + np.arange(n - len(block), n)) % self.capacity
+        self._data[:, idx] = block.T
+        self._data[:, idx + self.capacity] = block.T
+        self._total += n
+
+    def view(self, channel):
+        # Newest values of one channel, oldest first (a view, valid until the next write)
+        end = self._total % self.capacity + self.capacity
+        return self._data[self._index[channel], end - len(self):end]
+
+    def latest(self, channel):
+        return self.view(channel)[-1]
+
+    def flush(self):
+        if self._spill is not None:
+            self._spill.flush()
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+def _spill_meta(spill_path):
+    try:
+        with open(f"{spill_path}.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_spill(spill_path):
+    # Full history written by a RingBuffer, as {channel: array}
+    with open(f"{spill_path}.json") as f:
+        meta = json.load(f)
+    rows = np.fromfile(spill_path, dtype=meta["dtype"]).reshape(-1, len(meta["channels"]))
+    return {name: rows[:, i] for i, name in enumerate(meta["channels"])}
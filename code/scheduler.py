@@ -0,0 +1,90 @@
+import time
+import math
+
+# Fixed-rate task scheduler for the flight computer
+#
+# Each task has its own rate. Deadlines are absolute (start + n * period on the monotonic
+# clock), so time spent reading sensors, sending or logging does not add up as drift the way
+# sleep() after the work does. If a task falls behind by whole periods the missed runs are
+# skipped and counted as overruns instead of being run back to back.
+
+
+class Task:
+    def __init__(self, name, rate_hz, callback):
+        self.name = name
+        self.callback = callback
+        self.period = 1.0 / rate_hz
+        self.next_run = None
+        self.runs = 0
+        self.overruns = 0
+        self.max_late = 0.0  # Worst start delay after a deadline (s)
+
+    @property
+    def rate_hz(self):
+        return 1.0 / self.period
+
+
+class RateScheduler:
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.tasks = {}
+        self._running = False
+        self._current = None  # Task whose callback is running
+
+    def add(self, name, rate_hz, callback):
+        # callback(t) is called at rate_hz with t = monotonic time of the call
+        task = Task(name, rate_hz, callback)
+        self.tasks[name] = task
+        return task
+
+    def set_rate(self, name, rate_hz):
+        # Called from the task's own callback, the next deadline is the one just served plus the
+        # new period (run_pending adds it); otherwise one new period from now
+        task = self.tasks[name]
+        task.period = 1.0 / rate_hz
+        if task.next_run is not None and task is not self._current:
+            task.next_run = self.clock() + task.period
+
+    def run_pending(self):
+        # Runs every task that is due and returns the time of the next deadline
+        now = self.clock()
+        for task in self.tasks.values():
+            if task.next_run is None:
+                task.next_run = now
+            if now < task.next_run:
+                continue
+
+            task.max_late = max(task.max_late, now - task.next_run)
+            self._current = task
+            try:
+                task.callback(now)
+            finally:
+                self._current = None
+            task.runs += 1
+            task.next_run += task.period
+
+            now = self.clock()
+            if now >= task.next_run + task.period:
+                # Behind by at least a whole period, skip the missed runs
+                missed = math.floor((now - task.next_run) / task.period)
+                task.overruns += missed
+                task.next_run += missed * task.period
+        return min(task.next_run for task in self.tasks.values())
+
+    def run(self):
+        self._running = True
+        while self._running:
+            delay = self.run_pending() - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+    def stop(self):
+        self._running = False
+
+    def report(self):
+        lines = []
+        for task in self.tasks.values():
+            lines.append(f"{task.name}: {task.rate_hz:.0f} Hz, {task.runs} runs, "
+                         f"{task.overruns} overruns, max late {task.max_late * 1000:.1f} ms")
+        return "\n".join(lines)
@@ -1,11 +1,29 @@
+import sys
 import time
-import csv
+import math
 import socket
 import datetime
-import adafruit_dps310
-import adafruit_icm20x
-import board
-import busio
+from telemetry_packet import Sample, Health, encode, FORMAT_BINARY
+from onboard_log import BinaryLogWriter, CsvLogWriter
+from scheduler import RateScheduler
+from pipeline import StageQueue, Worker, DROP_OLDEST, BLOCK
+from state_estimator import StateEstimator
+from event_detector import FlightEventDetector, PAD, BOOST, COAST, DESCENT, LANDED
+from health import HealthMonitor
+from gps_reader import GpsReader
+
+# python send_data3.py --mock [log] runs without the sensors, see mock_sensors.py
+MOCK = len(sys.argv) > 1 and sys.argv[1] == "--mock"
+if MOCK:
+    import mock_sensors
+    from mock_sensors import adafruit_dps310, adafruit_icm20x, board, busio
+    if len(sys.argv) > 2:
+        mock_sensors.use_log(sys.argv[2])
+else:
+    import adafruit_dps310
+    import adafruit_icm20x
+    import board
+    import busio
 
 # Initialize I2C bus for sensors
 i2c = busio.I2C(board.SCL, board.SDA)
@@ -16,79 +34,249 @@ dps310 = adafruit_dps310.DPS310(i2c)
 # Initialize ICM-20948 (IMU sensor)
 imu = adafruit_icm20x.ICM20948(i2c)
 
+# Sampling rates (Hz); every IMU sample is logged and sent with the latest baro/mag/GPS values
+IMU_RATE_HZ = 100
+BARO_RATE_HZ = 32
+MAG_RATE_HZ = 20
+GPS_RATE_HZ = 5  # PA1010D fix rate (GGA sentences)
+GPS_POLL_HZ = 20  # I2C reads of its output buffer, a few per fix so it never backs up
+STATUS_RATE_HZ = 1  # Terminal printout
+HEALTH_RATE_HZ = 1  # Health report (stage timings, CPU temperature/load) to the ground station and health log
+imu.accelerometer_data_rate = IMU_RATE_HZ
+imu.gyro_data_rate = IMU_RATE_HZ
+
+# Initialize PA1010D (GPS), read without blocking by the scheduler
+gps = GpsReader(i2c, rate_hz=GPS_RATE_HZ)
+
+# IMU sampling and radio packet rates (Hz) per flight phase: full rate from liftoff to apogee,
+# lower on the pad and under the parachute, minimal after landing to save CPU and bandwidth
+PHASE_RATES = {
+    PAD: (50, 5),
+    BOOST: (IMU_RATE_HZ, 50),
+    COAST: (IMU_RATE_HZ, 50),
+    DESCENT: (50, 20),
+    LANDED: (10, 1),
+}
+
 # UDP setup
-UDP_IP = "192.168.1.4"  # Replace with your Mac's IP
+UDP_IP = "127.0.0.1" if MOCK else "192.168.1.4"  # Replace with your Mac's IP
 UDP_PORT = 5005
+VEHICLE_ID = 1  # Tells the rockets apart at the ground station (1-255, one per flight computer)
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+PACKET_FORMAT = FORMAT_BINARY  # FORMAT_TEXT sends the old comma separated datagrams
+CAMERA_PORT = 5006  # camera.py listens here for the liftoff/landing triggers
 
 # Reference pressure at sea level (adjust as per your location)
 SEA_LEVEL_PRESSURE = 1023.30  # hPa
 
-# Generate a filename with date and time
+# Generate a log name with date and time
 start_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-csv_filename = f"sensor_data_{start_time}.csv"
+LOG_FORMAT = "binary"  # "csv" writes the CSV directly; binary logs are converted with onboard_log.py
 
-# CSV file setup
-with open(csv_filename, mode="w", newline="") as csv_file:
-    writer = csv.writer(csv_file)
-    writer.writerow([
-        "Timestamp", "Pressure (hPa)", "Temperature (°C)", "Altitude (m)",
-        "Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)",
-        "Gyro_X (°/s)", "Gyro_Y (°/s)", "Gyro_Z (°/s)",
-        "Mag_X (µT)", "Mag_Y (µT)", "Mag_Z (µT)", "GPS_Latitude", "GPS_Longitude", "GPS_Altitude (m)"
-    ])  # Write headers
+# Log setup (binary: preallocated column chunks, synced to the SD card once per second)
+if LOG_FORMAT == "binary":
+    log_name = f"sensor_data_{start_time}"
+    log = BinaryLogWriter(log_name)
+else:
+    log_name = f"sensor_data_{start_time}.csv"
+    log = CsvLogWriter(log_name)
 
-print(f"Saving sensor data to {csv_filename}...")
+# Health log: one row per health report, to find out afterwards why the log has gaps
+health_log = CsvLogWriter(f"health_{start_time}.csv", columns=Health._fields, fsync_interval=10.0)
 
-try:
-    while True:
-        # Get current timestamp
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Read DPS310 sensor data
-        pressure = dps310.pressure  # Pressure in hPa
-        temperature = dps310.temperature  # Temperature in °C
-        altitude = 44330 * (1.0 - (pressure / SEA_LEVEL_PRESSURE) ** (1.0 / 5.255))  # Altitude in meters
-
-        # Read IMU sensor data
-        accel_x, accel_y, accel_z = imu.acceleration
-        gyro_x, gyro_y, gyro_z = imu.gyro
-        mag_x, mag_y, mag_z = imu.magnetic
-
-        # Dummy values for GPS
-        gps_lat = 0.0
-        gps_lon = 0.0
-        gps_alt = 0.0
-
-        # Prepare data string for UDP transmission
-        data = f"{timestamp},{temperature:.2f},{altitude:.2f},{gps_alt:.2f}," \
-               f"{accel_x:.2f},{accel_y:.2f},{accel_z:.2f}," \
-               f"{gyro_x:.2f},{gyro_y:.2f},{gyro_z:.2f}," \
-               f"{mag_x:.2f},{mag_y:.2f},{mag_z:.2f}," \
-               f"{gps_lat:.6f},{gps_lon:.6f}"
-
-        # Send UDP packet
-        try:
-            sock.sendto(data.encode('utf-8'), (UDP_IP, UDP_PORT))
-            print(f"🔹 Sent: {data}")
-            print(f"   ✅ Pressure: {pressure:.2f} hPa")
-        except Exception as e:
+print(f"Saving sensor data to {log_name}...")
+
+# Sampling feeds two bounded queues, consumed by the transmitter and logger threads
+RADIO_QUEUE_SIZE = 50  # Drop oldest: a late packet is worth less than a fresh one
+LOG_QUEUE_SIZE = 5000  # Never drop: sampling waits if the SD card falls this far behind
+radio_queue = StageQueue("radio", RADIO_QUEUE_SIZE, DROP_OLDEST)
+log_queue = StageQueue("log", LOG_QUEUE_SIZE, BLOCK)
+
+# Sample counter, radio packet sequence number and monotonic start time for sample timestamps
+seq = 0
+radio_seq = 0
+start_monotonic = time.monotonic()
+send_failures = 0
+health = HealthMonitor()
+
+# On-board flight phase tracking
+estimator = StateEstimator()
+radio_interval = 1.0 / PHASE_RATES[PAD][1]
+last_radio_t = -math.inf
+
+
+def on_flight_event(event):
+    global radio_interval
+    imu_rate, radio_rate = PHASE_RATES[detector.phase]
+    print(f"🚀 {event.name} at {event.t:.2f} s (altitude {event.altitude:.1f} m), "
+          f"now {detector.phase}: IMU {imu_rate} Hz, radio {radio_rate} Hz")
+    scheduler.set_rate("imu", imu_rate)
+    radio_interval = 1.0 / radio_rate
+    try:
+        sock.sendto(event.name.encode("ascii"), ("127.0.0.1", CAMERA_PORT))
+    except OSError:
+        pass  # Camera not running
+
+
+detector = FlightEventDetector(on_event=on_flight_event)
+
+# Latest reading of the slower sensors
+latest = {
+    "pressure": 0.0, "temperature": 0.0, "altitude": 0.0,
+    "mag": (0.0, 0.0, 0.0),
+    "gps": (0.0, 0.0, 0.0),  # GPS (lat, lon, alt) of the latest fix, 0 until the first fix
+}
+
+
+def read_baro(t):
+    # Read DPS310 sensor data
+    read_start = time.perf_counter()
+    pressure = dps310.pressure  # Pressure in hPa
+    latest["pressure"] = pressure
+    latest["temperature"] = dps310.temperature  # Temperature in °C
+    health.add("baro", time.perf_counter() - read_start)
+    latest["altitude"] = 44330 * (1.0 - (pressure / SEA_LEVEL_PRESSURE) ** (1.0 / 5.255))  # Altitude in meters
+
+
+def read_mag(t):
+    read_start = time.perf_counter()
+    latest["mag"] = imu.magnetic
+    health.add("mag", time.perf_counter() - read_start)
+
+
+def read_gps(t):
+    read_start = time.perf_counter()
+    fix = gps.poll()
+    if fix is not None:
+        latest["gps"] = (fix.lat, fix.lon, fix.alt)
+    health.add("gps", time.perf_counter() - read_start)
+
+
+def read_imu(t):
+    # Read IMU sensor data and emit one sample with the latest values of the other sensors
+    global seq, radio_seq, last_radio_t
+    read_start = time.perf_counter()
+    accel_x, accel_y, accel_z = imu.acceleration
+    gyro_x, gyro_y, gyro_z = imu.gyro
+    health.add("imu", time.perf_counter() - read_start)
+    mag_x, mag_y, mag_z = latest["mag"]
+    gps_lat, gps_lon, gps_alt = latest["gps"]
+
+    # Prepare packet for UDP transmission
+    sample = Sample(
+        seq, t - start_monotonic, latest["temperature"], latest["altitude"], gps_alt,
+        accel_x, accel_y, accel_z,
+        gyro_x, gyro_y, gyro_z,
+        mag_x, mag_y, mag_z,
+        gps_lat, gps_lon,
+    )
+    seq += 1
+
+    # Flight phase (switches the IMU and radio rates on events)
+    altitude_est, velocity_est, _, _, _ = estimator.update(
+        sample.t, latest["altitude"], accel_x, accel_y, accel_z, gyro_x, gyro_y, gyro_z)
+    detector.update(sample.t, altitude_est, velocity_est,
+                    math.sqrt(accel_x * accel_x + accel_y * accel_y + accel_z * accel_z))
+
+    # Every sample is logged, the radio only gets them at the phase's radio rate
+    # (with their own sequence numbers, so the ground station can still count lost packets)
+    if sample.t - last_radio_t >= radio_interval:
+        last_radio_t = sample.t
+        radio_queue.put(sample._replace(seq=radio_seq))
+        radio_seq += 1
+
+    # Row for the log (converted to the CSV timestamp text in the logger thread)
+    log_queue.put((
+        sample.t, time.time(),
+        latest["pressure"], latest["temperature"], latest["altitude"],
+        accel_x, accel_y, accel_z,
+        gyro_x, gyro_y, gyro_z,
+        mag_x, mag_y, mag_z, gps_lat, gps_lon, gps_alt
+    ))
+    health.add("sample", time.perf_counter() - read_start)
+
+
+def send_sample(sample):
+    # Transmitter thread: encode and send one UDP packet (sample or health report)
+    global send_failures
+    send_start = time.perf_counter()
+    try:
+        sock.sendto(encode(sample, PACKET_FORMAT, VEHICLE_ID), (UDP_IP, UDP_PORT))
+    except Exception as e:
+        send_failures += 1
+        if send_failures == 1 or send_failures % 100 == 0:
             print(f"⚠️ Warning: Failed to send telemetry, but data is still logged. Error: {e}")
+    health.add("send", time.perf_counter() - send_start)
 
-        # Append data to CSV
-        with open(csv_filename, mode="a", newline="") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow([
-                timestamp, pressure, temperature, altitude,
-                accel_x, accel_y, accel_z,
-                gyro_x, gyro_y, gyro_z,
-                mag_x, mag_y, mag_z, gps_lat, gps_lon, gps_alt
-            ])
-            csv_file.flush()
 
-        time.sleep(1)
+def write_row(row):
+    # Logger thread: append one row to the log (or a health report to the health log)
+    if isinstance(row, Health):
+        health_log.append(row)
+        return
+    write_start = time.perf_counter()
+    if LOG_FORMAT != "binary":
+        row = list(row)
+        row[1] = datetime.datetime.fromtimestamp(row[1]).strftime("%Y-%m-%d %H:%M:%S")
+    log.append(row)
+    health.add("log", time.perf_counter() - write_start)
+
+
+def report_health(t):
+    # Stage timings since the last report, logged and sent (health packets are binary only)
+    report = health.report(
+        t - start_monotonic,
+        overruns=sum(task.overruns for task in scheduler.tasks.values()),
+        send_failures=send_failures, radio_dropped=radio_queue.dropped,
+        log_blocked=log_queue.blocked, log_depth=len(log_queue),
+    )
+    log_queue.put(report)
+    if PACKET_FORMAT == FORMAT_BINARY:
+        radio_queue.put(report)
+
+
+def print_status(t):
+    print(f"🔹 [{detector.phase}] Sampled {seq}, sent {transmitter.processed} ({send_failures} failed)  "
+          f"✅ Pressure: {latest['pressure']:.2f} hPa  Altitude: {latest['altitude']:.2f} m  "
+          f"GPS: {f'{gps.fix.satellites} satellites' if gps.fix else 'no fix'}")
+    overruns = sum(task.overruns for task in scheduler.tasks.values())
+    if overruns:
+        print(f"   ⏱️ {overruns} missed deadlines so far")
+    if radio_queue.dropped or log_queue.blocked:
+        print(f"   📦 {radio_queue.stats()}\n   📦 {log_queue.stats()}")
+
+
+# Deadline based sampling, each sensor at its own rate
+scheduler = RateScheduler()
+scheduler.add("baro", BARO_RATE_HZ, read_baro)
+scheduler.add("mag", MAG_RATE_HZ, read_mag)
+scheduler.add("gps", GPS_POLL_HZ, read_gps)
+scheduler.add("imu", PHASE_RATES[PAD][0], read_imu)
+scheduler.add("status", STATUS_RATE_HZ, print_status)
+scheduler.add("health", HEALTH_RATE_HZ, report_health)
+
+transmitter = Worker(radio_queue, send_sample)
+logger = Worker(log_queue, write_row)
+transmitter.start()
+logger.start()
+
+try:
+    scheduler.run()
 
 except KeyboardInterrupt:
     print("\n🛑 Data collection stopped by user.")
 except Exception as e:
     print(f"❌ An error occurred: {e}")
+finally:
+    # Let the logger write everything that was sampled before closing the log
+    radio_queue.close()
+    log_queue.close()
+    logger.join()
+    log.close()
+    health_log.close()
+    print(scheduler.report())
+    print(radio_queue.stats())
+    print(log_queue.stats())
+    if logger.errors:
+        print(f"⚠️ {logger.errors} rows could not be logged, last error: {logger.last_error}")
+    print(f"💾 {log.rows} samples saved to {log_name}, {health_log.rows} health reports to {health_log.path}")
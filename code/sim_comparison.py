@@ -0,0 +1,149 @@
+import os
+import sys
+import argparse
+import numpy as np
+from flight_log import load_flight, find_logs, KIND_TELEMETRY, KIND_SIMULATION
+from derived_metrics import derive
+from event_detector import detect_events, LIFTOFF, G
+
+# Simulation vs flight comparison for the paired logs in data/
+#
+#   python sim_comparison.py ../data                  error table for every flight with a simulation
+#   python sim_comparison.py ../data --plot out       plus one altitude/velocity overlay per flight
+#
+# Every log is aligned at its liftoff (the event detector for flight logs, the same 2 g rule
+# evaluated with NumPy for the simulations), heights are taken above the pad, and all flights are
+# resampled with np.interp onto one common time base. The result is a (flights x samples) array
+# per channel, so the errors of all flights are computed in single NumPy reductions; the
+# 0.01 s simulation exports are never walked sample by sample.
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+
+def simulation_liftoff(t, vertical_acc=None, velocity=None, liftoff_g=2.0, liftoff_velocity=2.0):
+    # Simulations log kinematic acceleration (without gravity), so thrust above liftoff_g means
+    # more than (liftoff_g - 1) g here; exports without acceleration use the velocity rule
+    if vertical_acc is not None:
+        above = vertical_acc > (liftoff_g - 1) * G
+    else:
+        above = velocity > liftoff_velocity
+    return float(t[np.argmax(above)]) if above.any() else float(t[0])
+
+
+def aligned(df):
+    # (time since liftoff, height above the pad, vertical velocity) of one log as float64 arrays
+    t = df["Time (s)"].to_numpy(dtype=np.float64)
+    altitude = df["Altitude (m)"].to_numpy(dtype=np.float64)
+    if df.attrs.get("kind") == KIND_SIMULATION:
+        vertical_acc = df["Vertical_Acceleration"].to_numpy(dtype=np.float64) if "Vertical_Acceleration" in df else None
+        velocity = df["Vertical_Velocity"].to_numpy(dtype=np.float64)
+        t0 = simulation_liftoff(t, vertical_acc, velocity)
+    else:
+        if "Vertical_Velocity" not in df:
+            derive(df, time_column="Time (s)")
+        velocity = df["Vertical_Velocity"].to_numpy(dtype=np.float64)
+        events = {e.name: e for e in detect_events(df)}
+        t0 = events[LIFTOFF].t if LIFTOFF in events else t[0]
+    on_pad = altitude[t <= t0]
+    ground = np.median(on_pad) if len(on_pad) else altitude[0]
+    return t - t0, altitude - ground, velocity
+
+
+def resample(logs, dt=0.01):
+    # Common time base from liftoff to the end of the longest log; samples outside a log are NaN
+    end = max(t[-1] for t, _, _ in logs)
+    base = np.arange(0.0, end + dt / 2, dt)
+    height = np.array([np.interp(base, t, h, left=np.nan, right=np.nan) for t, h, _ in logs])
+    velocity = np.array([np.interp(base, t, v, left=np.nan, right=np.nan) for t, _, v in logs])
+    return base, height, velocity
+
+
+def compare(pairs, dt=0.01):
+    # pairs: {flight: (flight df, simulation df)} -> (DataFrame with one row per flight, resampled data)
+    import pandas as pd
+
+    flights = list(pairs)
+    logs = [aligned(pairs[f][0]) for f in flights] + [aligned(pairs[f][1]) for f in flights]
+    base, height, velocity = resample(logs, dt)
+    n = len(flights)
+    h_flight, h_sim = height[:n], height[n:]
+    v_flight, v_sim = velocity[:n], velocity[n:]
+
+    # Errors only where both logs have data (flight logs often stop before landing)
+    with np.errstate(invalid="ignore"):
+        both = ~np.isnan(h_flight) & ~np.isnan(h_sim)
+        overlap = both.sum(axis=1) * dt
+        alt_rmse = np.sqrt(np.nanmean(np.where(both, (h_flight - h_sim) ** 2, np.nan), axis=1))
+        vel_rmse = np.sqrt(np.nanmean(np.where(both, (v_flight - v_sim) ** 2, np.nan), axis=1))
+
+    # Apogee and maximum velocity from the original samples, so 1 Hz logs are not smoothed away
+    apogee = np.array([np.nanmax(h) for _, h, _ in logs])
+    t_apogee = np.array([t[np.nanargmax(h)] for t, h, _ in logs])
+    max_vel = np.array([np.nanmax(v) for _, _, v in logs])
+    t_max_vel = np.array([t[np.nanargmax(v)] for t, _, v in logs])
+
+    table = pd.DataFrame({
+        "Flight": flights,
+        "Compared (s)": np.round(overlap, 1),
+        "Altitude RMSE (m)": np.round(alt_rmse, 1),
+        "Velocity RMSE (m/s)": np.round(vel_rmse, 1),
+        "Apogee flight (m)": np.round(apogee[:n], 1),
+        "Apogee sim (m)": np.round(apogee[n:], 1),
+        "Apogee delta (m)": np.round(apogee[:n] - apogee[n:], 1),
+        "Apogee time delta (s)": np.round(t_apogee[:n] - t_apogee[n:], 2),
+        "Max velocity delta (m/s)": np.round(max_vel[:n] - max_vel[n:], 1),
+        "Max velocity time delta (s)": np.round(t_max_vel[:n] - t_max_vel[n:], 2),
+    })
+    return table, {"Time": base, "Flights": flights, "Height": height, "Velocity": velocity}
+
+
+def plot_comparison(resampled, output_dir):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(output_dir, exist_ok=True)
+    base, flights = resampled["Time"], resampled["Flights"]
+    n = len(flights)
+    for i, flight in enumerate(flights):
+        fig, (ax_h, ax_v) = plt.subplots(1, 2, figsize=(16, 6))
+        for a, key, ylabel in ((ax_h, "Height", "Altitude above pad (m)"), (ax_v, "Velocity", "Vertical Velocity (m/s)")):
+            a.plot(base, resampled[key][i], label="Flight", color="blue")
+            a.plot(base, resampled[key][n + i], label="Simulation", color="red", linestyle="--")
+            a.set_xlabel("Time since liftoff (s)")
+            a.set_ylabel(ylabel)
+            a.grid(True, linestyle="--", alpha=0.6)
+            a.legend()
+        title = f"Flight {flight} - Simulation vs Flight"
+        fig.suptitle(title)
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_dir, f"{title}.png"), dpi=150)
+        plt.close(fig)
+
+
+def load_pairs(directory):
+    return {flight: (load_flight(logs[KIND_TELEMETRY]), load_flight(logs[KIND_SIMULATION]))
+            for flight, logs in find_logs(directory).items()
+            if KIND_TELEMETRY in logs and KIND_SIMULATION in logs}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare every flight log with its simulation")
+    parser.add_argument("directory", nargs="?", default=DEFAULT_DATA_DIR, help="directory with the flight logs")
+    parser.add_argument("--dt", type=float, default=0.01, help="common time step (s)")
+    parser.add_argument("--plot", metavar="DIR", help="write an overlay plot per flight into DIR")
+    args = parser.parse_args(argv)
+
+    pairs = load_pairs(args.directory)
+    if not pairs:
+        print(f"⚠️ No flight/simulation pairs found in {args.directory}")
+        return 1
+    table, resampled = compare(pairs, args.dt)
+    print(table.to_string(index=False))
+    if args.plot:
+        plot_comparison(resampled, args.plot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
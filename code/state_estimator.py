@@ -0,0 +1,281 @@
+import math
+import numpy as np
+
+# Streaming state estimation, shared by the flight computer, the ground station and post-flight tools
+#
+#   AltitudeKalman   2-state (altitude, vertical velocity) Kalman filter at its steady-state gain:
+#                    vertical acceleration drives the prediction, barometric altitude corrects it
+#   AttitudeFilter   complementary filter on the gravity direction: the gyro rotates it, the
+#                    accelerometer pulls it back while it reads about 1 g (not under thrust)
+#
+# update() is plain float math, O(1) per sample (a few microseconds), so it runs on the Pi Zero
+# at 100 Hz. Both filters are linear in their state (x[k] = M[k] x[k-1] + c[k]), so process()
+# runs the same math vectorized over whole logs: the per-sample matrices are built with NumPy and
+# the recursion is solved chunk-parallel (linear_recursion). Live blocks of a few samples use
+# the per-sample code, which gives the same numbers.
+#
+# Pitch, roll and yaw are tilt angles of the gravity direction (same definitions as
+# derived_metrics.orientation), so the heading and with it the magnetometer do not enter the
+# outputs; the mag arguments are accepted for the callers' convenience only.
+#
+# Note: adafruit_icm20x reports the gyro in rad/s (the "°/s" in the log headers is a label only;
+# the 8.73 plateaus in the logs are the 500 °/s full scale), so gyro input here is rad/s.
+
+VECTORIZE_MIN = 64  # Smaller blocks are stepped sample by sample
+
+
+def linear_recursion(m, c, x0):
+    # Solves x[k] = m[k] @ x[k-1] + c[k] for every k with x[-1] = x0; components first:
+    # m: (d, d, n), c: (d, n), returns x: (d, n).
+    # The samples are cut into about sqrt(n) chunks that are all stepped together (one vectorized
+    # step per position in the chunk), each from a zero state while also multiplying up its
+    # matrices; the chunks are then chained from x0 and the start states added back in
+    d, n = c.shape
+    length = max(int(math.sqrt(n)), 16)  # Samples per chunk
+    pad = -n % length
+    if pad:
+        m = np.concatenate((m, np.broadcast_to(np.eye(d)[:, :, None], (d, d, pad))), axis=2)
+        c = np.concatenate((c, np.zeros((d, pad))), axis=1)
+    chunks = c.shape[1] // length
+    m = np.ascontiguousarray(m.reshape(d, d, chunks, length).transpose(3, 0, 1, 2))  # (length, d, d, chunks)
+    c = np.ascontiguousarray(c.reshape(d, chunks, length).transpose(2, 0, 1))  # (length, d, chunks)
+
+    y = np.zeros((d, chunks))  # State within every chunk, started from 0
+    p = np.broadcast_to(np.eye(d)[:, :, None], (d, d, chunks))  # Product of the chunk's matrices so far
+    ys, ps = np.empty_like(c), np.empty_like(m)
+    for i in range(length):
+        y = np.einsum("ijb,jb->ib", m[i], y) + c[i]
+        p = np.einsum("ijb,jkb->ikb", m[i], p)
+        ys[i], ps[i] = y, p
+
+    # Chain the chunks: the state entering chunk b is the last state of chunk b - 1
+    starts = np.empty((d, chunks))
+    start = np.asarray(x0, dtype=np.float64)
+    p_last, y_last = ps[-1].transpose(2, 0, 1), ys[-1].T
+    for b in range(chunks):
+        starts[:, b] = start
+        start = p_last[b] @ start + y_last[b]
+    x = ys + np.einsum("lijb,jb->lib", ps, starts)  # (length, d, chunks)
+    return x.transpose(1, 2, 0).reshape(d, -1)[:, :n]
+
+
+def kalman_gains(interval, accel_var, baro_var):
+    # Steady-state gains (altitude, velocity) for a barometer update every `interval` seconds with
+    # white acceleration noise (Kalata's tracking index); floats or arrays
+    lam = (accel_var / baro_var) ** 0.5 * interval * interval
+    root = (lam * lam + 8 * lam) ** 0.5
+    alpha = ((lam + 4) * root - lam * lam - 8 * lam) / 8
+    beta = (lam * lam + 4 * lam - lam * root) / 4
+    return alpha, beta / interval
+
+
+def tilt_angles(vx, vy, vz):
+    # Pitch, roll, yaw (degrees) of the up vector in the body frame; floats or arrays
+    pitch = np.degrees(np.arctan2(vy, np.sqrt(vx * vx + vz * vz)))
+    roll = np.degrees(np.arctan2(vx, np.sqrt(vy * vy + vz * vz)))
+    yaw = np.degrees(np.arctan2(vz, np.sqrt(vx * vx + vy * vy)))
+    return pitch, roll, yaw
+
+
+def rotations(gx, gy, gz, dt):
+    # Matrices that carry a world-fixed vector in the body frame over dt while the body turns at
+    # (gx, gy, gz) rad/s (Rodrigues, exact for a constant rate); arrays (n,) -> (3, 3, n)
+    wx, wy, wz = gx * dt, gy * dt, gz * dt
+    angle = np.sqrt(wx * wx + wy * wy + wz * wz)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ux, uy, uz = (np.where(angle > 0, w / angle, 0.0) for w in (wx, wy, wz))
+    s, c = np.sin(angle), np.cos(angle)
+    k = 1 - c
+    return np.array([
+        [c + k * ux * ux, k * ux * uy + s * uz, k * ux * uz - s * uy],
+        [k * uy * ux - s * uz, c + k * uy * uy, k * uy * uz + s * ux],
+        [k * uz * ux + s * uy, k * uz * uy - s * ux, c + k * uz * uz],
+    ])
+
+
+class AltitudeKalman:
+    def __init__(self, accel_sigma=1.45, baro_sigma=0.3):
+        self.accel_var = accel_sigma ** 2  # Process noise: unmodelled acceleration (m/s²)²
+        self.baro_var = baro_sigma ** 2  # Barometer noise (m)²
+        self.h = 0.0
+        self.v = 0.0
+
+    def reset(self, altitude, velocity=0.0):
+        self.h = altitude
+        self.v = velocity
+
+    def predict(self, dt, accel):
+        # accel: vertical acceleration without gravity (m/s², up positive)
+        self.h += self.v * dt + 0.5 * accel * dt * dt
+        self.v += accel * dt
+
+    def update(self, altitude, interval):
+        # Barometer measurement, `interval` seconds after the previous one
+        if interval <= 0:
+            return
+        k0, k1 = kalman_gains(interval, self.accel_var, self.baro_var)
+        residual = altitude - self.h
+        self.h += k0 * residual
+        self.v += k1 * residual
+
+
+class AttitudeFilter:
+    def __init__(self, gain=0.5, accel_gate=0.15):
+        self.gain = gain  # Pull towards the accelerometer (1/s), a time constant of 1/gain
+        self.accel_gate = accel_gate  # Accelerometer only trusted within ±15 % of 1 g (not under thrust)
+        self.x, self.y, self.z = 0.0, 0.0, 1.0  # Up (gravity reaction) in the body frame
+        self.g = None
+
+    def reset(self, ax, ay, az):
+        # Start with the measured "up" direction (gravity reaction at rest)
+        norm = math.sqrt(ax * ax + ay * ay + az * az)
+        self.g = norm
+        self.x, self.y, self.z = ax / norm, ay / norm, az / norm
+
+    def up(self):
+        # World "up" expressed in the body frame (unit vector)
+        x, y, z = self.x, self.y, self.z
+        n = math.sqrt(x * x + y * y + z * z)
+        return x / n, y / n, z / n
+
+    def weight(self, dt, a_norm):
+        # Accelerometer weight of one step
+        if a_norm > 0 and abs(a_norm - self.g) < self.accel_gate * self.g:
+            return min(self.gain * dt, 1.0)
+        return 0.0
+
+    def update(self, dt, gx, gy, gz, ax, ay, az):
+        # Rotate by the gyro (v' = v + v x w dt, Rodrigues), then blend towards the accelerometer
+        x, y, z = self.x, self.y, self.z
+        wx, wy, wz = gx * dt, gy * dt, gz * dt
+        angle = math.sqrt(wx * wx + wy * wy + wz * wz)
+        if angle > 0:
+            ux, uy, uz = wx / angle, wy / angle, wz / angle
+            s, c = math.sin(angle), math.cos(angle)
+            dot = (ux * x + uy * y + uz * z) * (1 - c)
+            x, y, z = (c * x + s * (y * uz - z * uy) + dot * ux,
+                       c * y + s * (z * ux - x * uz) + dot * uy,
+                       c * z + s * (x * uy - y * ux) + dot * uz)
+
+        a_norm = math.sqrt(ax * ax + ay * ay + az * az)
+        w = self.weight(dt, a_norm)
+        if w > 0:
+            x = (1 - w) * x + w * ax / a_norm
+            y = (1 - w) * y + w * ay / a_norm
+            z = (1 - w) * z + w * az / a_norm
+        self.x, self.y, self.z = x, y, z
+
+    def angles(self):
+        return tuple(float(a) for a in tilt_angles(*self.up()))
+
+
+class StateEstimator:
+    # Altitude/velocity and attitude from one stream of samples
+
+    MAX_DT = 1.0  # Longer gaps (e.g. dropped samples) are not integrated over
+
+    # Noise defaults tuned on Flight2-4.csv: the estimated apogee stays within a few meters and
+    # half a second of the barometer's, and barometer dips under thrust stay below the event
+    # detector's 2 m apogee drop
+
+    def __init__(self, accel_sigma=1.45, baro_sigma=0.3, gain=0.5, skip_repeated_baro=True):
+        self.altitude = AltitudeKalman(accel_sigma, baro_sigma)
+        self.attitude = AttitudeFilter(gain)
+        self.skip_repeated_baro = skip_repeated_baro  # Baro is slower than the IMU, repeated values are stale
+        self._t = None
+        self._last_baro = None
+        self._last_baro_t = None
+
+    def update(self, t, altitude, ax, ay, az, gx, gy, gz, mx=0.0, my=0.0, mz=0.0):
+        # Returns (altitude, vertical velocity, pitch, roll, yaw)
+        if self._t is None:
+            self.altitude.reset(altitude)
+            self.attitude.reset(ax, ay, az)
+            self._t = self._last_baro_t = t
+            self._last_baro = altitude
+            return (altitude, 0.0) + self.attitude.angles()
+
+        dt = t - self._t
+        self._t = t
+        if 0 < dt <= self.MAX_DT:
+            att = self.attitude
+            att.update(dt, gx, gy, gz, ax, ay, az)
+            vx, vy, vz = att.up()
+            self.altitude.predict(dt, ax * vx + ay * vy + az * vz - att.g)
+
+        if not (self.skip_repeated_baro and altitude == self._last_baro):
+            self.altitude.update(altitude, t - self._last_baro_t)
+            self._last_baro_t = t
+        self._last_baro = altitude
+        return (self.altitude.h, self.altitude.v) + self.attitude.angles()
+
+    def process(self, t, altitude, ax, ay, az, gx, gy, gz, mx, my, mz):
+        # A block of samples (arrays); the filter state carries over between blocks
+        columns = [np.asarray(c, dtype=np.float64) for c in (t, altitude, ax, ay, az, gx, gy, gz)]
+        first = []
+        if self._t is None and len(columns[0]):
+            first = [self.update(*(float(c[0]) for c in columns))]
+            columns = [c[1:] for c in columns]
+
+        if len(columns[0]) < VECTORIZE_MIN:
+            rows = first + [self.update(*row) for row in zip(*(c.tolist() for c in columns))]
+            out = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        else:
+            out = np.vstack([np.array(first, dtype=np.float64).reshape(-1, 5), self._process_arrays(*columns)])
+        return {
+            "Altitude_Estimate": out[:, 0],
+            "Vertical_Velocity": out[:, 1],
+            "Pitch": out[:, 2],
+            "Roll": out[:, 3],
+            "Yaw": out[:, 4],
+        }
+
+    def _process_arrays(self, t, altitude, ax, ay, az, gx, gy, gz):
+        # Vectorized update() over a block (the filters are initialized); returns (n, 5)
+        n = len(t)
+        att, kalman = self.attitude, self.altitude
+        dt = np.diff(t, prepend=self._t)
+        step = (dt > 0) & (dt <= self.MAX_DT)
+        dt = np.where(step, dt, 0.0)
+
+        # Attitude: up[k] = (1 - w) R up[k-1] + w a/|a|
+        a_norm = np.sqrt(ax * ax + ay * ay + az * az)
+        trusted = step & (a_norm > 0) & (np.abs(a_norm - att.g) < att.accel_gate * att.g)
+        w = np.where(trusted, np.minimum(att.gain * dt, 1.0), 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pull = np.where(trusted, w / a_norm, 0.0)
+        ux, uy, uz = linear_recursion(rotations(gx, gy, gz, dt) * (1 - w), np.array([pull * ax, pull * ay, pull * az]),
+                                      (att.x, att.y, att.z))
+        att.x, att.y, att.z = ux[-1], uy[-1], uz[-1]
+        norm = np.sqrt(ux * ux + uy * uy + uz * uz)
+        ux, uy, uz = ux / norm, uy / norm, uz / norm
+        accel = np.where(step, ax * ux + ay * uy + az * uz - att.g, 0.0)
+
+        # Altitude: predict by dt (0 across gaps), then correct where there is a new baro value
+        previous = np.concatenate(([self._last_baro], altitude[:-1]))
+        fresh = ~(self.skip_repeated_baro & (altitude == previous))
+        last = np.maximum.accumulate(np.where(fresh, np.arange(n), -1))  # Latest update up to k
+        before = np.concatenate(([-1], last[:-1]))  # Latest update before k
+        interval = t - np.where(before >= 0, t[np.maximum(before, 0)], self._last_baro_t)
+        valid = fresh & (interval > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            k0, k1 = kalman_gains(np.where(valid, interval, 1.0), kalman.accel_var, kalman.baro_var)
+        k0, k1 = np.where(valid, k0, 0.0), np.where(valid, k1, 0.0)
+        m = np.array([[1 - k0, (1 - k0) * dt], [-k1, 1 - k1 * dt]])
+        dh, dv = 0.5 * accel * dt * dt, accel * dt
+        c = np.array([(1 - k0) * dh + k0 * altitude, dv - k1 * dh + k1 * altitude])
+        h, v = linear_recursion(m, c, (kalman.h, kalman.v))
+
+        kalman.h, kalman.v = h[-1], v[-1]
+        self._t = t[-1]
+        self._last_baro = altitude[-1]
+        if last[-1] >= 0:
+            self._last_baro_t = t[last[-1]]
+        return np.column_stack((h, v, *tilt_angles(ux, uy, uz)))
+
+
+def estimate(t, altitude, ax, ay, az, gx, gy, gz, mx=None, my=None, mz=None, **params):
+    # Batch mode over whole logs (arrays), returns the same channels as StateEstimator.process
+    if mx is None:
+        mx = my = mz = np.zeros(len(t))
+    return StateEstimator(**params).process(t, altitude, ax, ay, az, gx, gy, gz, mx, my, mz)
@@ -0,0 +1,173 @@
+import struct
+import binascii
+import datetime
+from collections import namedtuple
+
+# Binary telemetry packet shared by send_data3.py (flight computer) and receive_live2.py (ground station)
+#
+# Layout, little endian, 71 bytes per sample:
+#   magic "HR" | version u8 | kind u8 | vehicle u8 | seq u32 | time u32 (ms since sender start)
+#   temperature, altitude, gps altitude, accel xyz, gyro xyz, mag xyz   (12 x float32)
+#   latitude, longitude                                                 (2 x int32, 1e-7 degrees)
+#   crc16 (CCITT, over everything before it)
+#
+# Health packets (kind 2, 103 bytes, about once per second) share the header and CRC:
+#   CPU temperature (°C, NaN if unknown), 1 min load average, CPU use of the flight script (%)
+#   mean and max duration (ms) of every stage in HEALTH_STAGES since the previous report  (17 x float32)
+#   loop overruns, send failures, radio packets dropped, log queue waits, log queue depth (5 x u32)
+# The counters are totals since start, so a lost health packet loses nothing. They have their own
+# sequence numbers.
+#
+# The vehicle id (version 2) tells the rockets apart when several send to one ground station
+# (ground_server.py). Version 1 packets have no vehicle byte and are decoded as vehicle 0, like
+# the old comma separated text datagram (~130 bytes) that is still supported as a fallback mode.
+
+MAGIC = b"HR"
+VERSION = 2
+KIND_SAMPLE = 1
+KIND_HEALTH = 2
+
+FORMAT_BINARY = "binary"
+FORMAT_TEXT = "text"
+
+GEO_SCALE = 1e7  # int32 lat/lon units per degree (~1 cm resolution)
+
+_HEADERS = {
+    1: struct.Struct("<2sBBII"),
+    2: struct.Struct("<2sBBBII"),
+}
+_HEADER = _HEADERS[VERSION]
+_BODIES = {
+    KIND_SAMPLE: struct.Struct("<12f2i"),
+    KIND_HEALTH: struct.Struct("<17f5I"),
+}
+_CRC = struct.Struct("<H")
+
+PACKET_SIZE = _HEADER.size + _BODIES[KIND_SAMPLE].size + _CRC.size
+HEALTH_PACKET_SIZE = _HEADER.size + _BODIES[KIND_HEALTH].size + _CRC.size
+
+TEXT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+Sample = namedtuple("Sample", [
+    "seq", "t", "temperature", "altitude", "gps_alt",
+    "accel_x", "accel_y", "accel_z",
+    "gyro_x", "gyro_y", "gyro_z",
+    "mag_x", "mag_y", "mag_z",
+    "lat", "lon",
+])
+
+# Timed stages of the flight computer: sensor reads per device, the whole IMU sample (reads,
+# estimation and queueing), the log write and the UDP send
+HEALTH_STAGES = ("imu", "baro", "mag", "gps", "sample", "log", "send")
+
+Health = namedtuple("Health", [
+    "seq", "t", "cpu_temp", "load", "cpu_percent",
+    *(f"{stage}{suffix}" for stage in HEALTH_STAGES for suffix in ("_ms", "_max_ms")),
+    "overruns", "send_failures", "radio_dropped", "log_blocked", "log_depth",
+])
+
+
+class PacketError(ValueError):
+    pass
+
+
+def _crc(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def _pack(kind, vehicle, seq, t, *values):
+    # seq and time wrap instead of overflowing (time wraps after ~49 days)
+    body = (_HEADER.pack(MAGIC, VERSION, kind, vehicle, seq & 0xFFFFFFFF, int(t * 1000) & 0xFFFFFFFF)
+            + _BODIES[kind].pack(*values))
+    return body + _CRC.pack(_crc(body))
+
+
+def encode_sample(sample, vehicle=0):
+    return _pack(KIND_SAMPLE, vehicle, sample.seq, sample.t, *sample[2:14],
+                 round(sample.lat * GEO_SCALE), round(sample.lon * GEO_SCALE))
+
+
+def encode_health(health, vehicle=0):
+    return _pack(KIND_HEALTH, vehicle, health.seq, health.t, *health[2:-5],
+                 *(min(int(value), 0xFFFFFFFF) for value in health[-5:]))
+
+
+def encode_text(sample, timestamp=None):
+    # Legacy datagram: wall clock timestamp followed by 14 values, no sequence number
+    if timestamp is None:
+        timestamp = datetime.datetime.now().strftime(TEXT_TIMESTAMP_FORMAT)
+    s = sample
+    return (f"{timestamp},{s.temperature:.2f},{s.altitude:.2f},{s.gps_alt:.2f},"
+            f"{s.accel_x:.2f},{s.accel_y:.2f},{s.accel_z:.2f},"
+            f"{s.gyro_x:.2f},{s.gyro_y:.2f},{s.gyro_z:.2f},"
+            f"{s.mag_x:.2f},{s.mag_y:.2f},{s.mag_z:.2f},"
+            f"{s.lat:.6f},{s.lon:.6f}").encode("utf-8")
+
+
+def encode(sample, packet_format=FORMAT_BINARY, vehicle=0):
+    # vehicle is only sent in the binary format
+    if isinstance(sample, Health):
+        if packet_format != FORMAT_BINARY:
+            raise ValueError("health packets only exist in the binary format")
+        return encode_health(sample, vehicle)
+    if packet_format == FORMAT_BINARY:
+        return encode_sample(sample, vehicle)
+    if packet_format == FORMAT_TEXT:
+        return encode_text(sample)
+    raise ValueError(f"unknown packet format: {packet_format}")
+
+
+def _decode_binary(data):
+    if len(data) < 3:
+        raise PacketError(f"packet too short ({len(data)} bytes)")
+    header = _HEADERS.get(data[2])
+    if header is None:
+        raise PacketError(f"unsupported packet version {data[2]}")
+    if len(data) < header.size + _CRC.size:
+        raise PacketError(f"packet too short ({len(data)} bytes)")
+    (crc,) = _CRC.unpack_from(data, len(data) - _CRC.size)
+    if crc != _crc(data[:-_CRC.size]):
+        raise PacketError("CRC mismatch")
+
+    if header is _HEADER:
+        _, _, kind, vehicle, seq, t = header.unpack_from(data)
+    else:
+        (_, _, kind, seq, t), vehicle = header.unpack_from(data), 0
+    body = _BODIES.get(kind)
+    if body is None:
+        raise PacketError(f"unknown packet kind {kind}")
+    if len(data) != header.size + body.size + _CRC.size:
+        raise PacketError(f"bad packet length ({len(data)} bytes) for kind {kind}")
+
+    fields = body.unpack_from(data, header.size)
+    if kind == KIND_HEALTH:
+        return vehicle, Health(seq, t / 1000.0, *fields)
+    return vehicle, Sample(seq, t / 1000.0, *fields[:12], fields[12] / GEO_SCALE, fields[13] / GEO_SCALE)
+
+
+def _decode_text(data):
+    fields = data.decode("utf-8").strip().split(",")
+    if len(fields) < 15:
+        raise PacketError(f"text packet has {len(fields)} fields, expected 15")
+    try:
+        t = datetime.datetime.strptime(fields[0], TEXT_TIMESTAMP_FORMAT).timestamp()
+        values = [float(f) for f in fields[1:15]]
+    except ValueError as e:
+        raise PacketError(f"malformed text packet: {e}") from None
+    return Sample(None, t, *values)
+
+
+def decode_packet(data):
+    # (vehicle, Sample or Health); accepts both wire formats so old and new senders can share a
+    # ground station (text and version 1 packets are vehicle 0)
+    if data[:2] == MAGIC:
+        return _decode_binary(data)
+    try:
+        return 0, _decode_text(data)
+    except UnicodeDecodeError:
+        raise PacketError("unrecognised packet") from None
+
+
+def decode(data):
+    # Sample, or Health for health packets
+    return decode_packet(data)[1]
@@ -0,0 +1,196 @@
+import json
+import time
+import socket
+import struct
+import threading
+from collections import deque
+from telemetry_packet import decode, decode_packet, Health, PacketError
+
+# Background UDP receiver for the ground station
+#
+# The thread drains the socket as fast as packets arrive and keeps the decoded samples in a
+# bounded deque (appends and pops are thread safe), so the plot can consume everything that
+# arrived since the last frame without ever blocking on the network. Health packets of the flight
+# computer are not samples: only the latest one is kept (health, received at health_time).
+#
+# RemoteReceiver has the same interface but gets the telemetry of one vehicle from ground_server.py
+# over TCP, so any number of viewers can watch the same rockets.
+
+RESTART_GAP = 1000  # A sequence number this far back means the sender restarted
+
+# ground_server.py stream: frames of kind u8 | length u16 | payload
+FRAME_HEADER = struct.Struct("<BH")
+FRAME_PACKET = 1  # A telemetry packet exactly as it was received over UDP
+FRAME_STATUS = 2  # JSON: link statistics of every vehicle, bad packets and this viewer's drop counters
+
+
+class LinkStats:
+    # Packet statistics of one telemetry link (one vehicle)
+
+    def __init__(self):
+        self.received = 0
+        self.lost = 0
+        self.bad = 0
+        self.overflow = 0
+        self.late = 0
+        self.last_error = None
+        self._last_seq = None
+
+        # Latest health report of the flight computer (time.monotonic() of its arrival)
+        self.health = None
+        self.health_time = None
+
+    def accept(self, packet):
+        # Counts a decoded packet; True if it is a sample to use
+        if isinstance(packet, Health):
+            self.health = packet
+            self.health_time = time.monotonic()
+            return False
+
+        # Packet loss (text packets carry no sequence number)
+        if packet.seq is not None:
+            last = self._last_seq
+            if last is None or packet.seq > last or last - packet.seq > RESTART_GAP:
+                if last is not None and packet.seq > last + 1:
+                    self.lost += packet.seq - last - 1
+                self._last_seq = packet.seq
+            else:
+                # Arrived after a newer packet: it was counted as lost then (unless it repeats the
+                # newest one), and is too old to plot now (the live plots and filters expect time
+                # to go forward)
+                self.late += 1
+                if packet.seq != last:
+                    self.lost = max(self.lost - 1, 0)
+                return False
+
+        self.received += 1
+        return True
+
+    def counters(self):
+        return {"received": self.received, "lost": self.lost, "late": self.late}
+
+
+class TelemetryReceiver(threading.Thread, LinkStats):
+    def __init__(self, host="0.0.0.0", port=5005, buffer_size=10000, sock=None, vehicle=None):
+        # vehicle: only use the packets of this vehicle id (None = all)
+        threading.Thread.__init__(self, name="telemetry-receiver", daemon=True)
+        LinkStats.__init__(self)
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Large kernel buffer so bursts survive while Python is busy elsewhere
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            sock.bind((host, port))
+        sock.settimeout(0.5)  # Only used to notice stop() requests
+        self.sock = sock
+        self.vehicle = vehicle
+        self.samples = deque(maxlen=buffer_size)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                data, _ = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Socket closed by stop()
+
+            try:
+                vehicle, sample = decode_packet(data)
+            except PacketError as e:
+                self.bad += 1
+                self.last_error = str(e)
+                continue
+
+            if self.vehicle is not None and vehicle != self.vehicle:
+                continue
+            if not self.accept(sample):
+                continue
+
+            if len(self.samples) == self.samples.maxlen:
+                self.overflow += 1  # Oldest sample gets pushed out
+            self.samples.append(sample)
+
+    def drain(self):
+        # All samples received since the last call, oldest first
+        pending = []
+        pop = self.samples.popleft
+        try:
+            while True:
+                pending.append(pop())
+        except IndexError:
+            pass
+        return pending
+
+    def stop(self):
+        self._stop_event.set()
+        self.sock.close()
+
+
+class RemoteReceiver(TelemetryReceiver):
+    # Telemetry of one vehicle from ground_server.py. The server already counted loss and dropped
+    # late packets; its link statistics arrive in status frames. rate (Hz) asks the server for at
+    # most that many samples per second, skipped counts what it left out for this viewer and
+    # dropped what it had to throw away because this viewer did not keep up.
+
+    def __init__(self, host="127.0.0.1", port=5010, vehicle=None, rate=None, buffer_size=10000):
+        sock = socket.create_connection((host, port), timeout=5)
+        sock.sendall(json.dumps({"vehicle": vehicle, "rate": rate}).encode("utf-8") + b"\n")
+        super().__init__(buffer_size=buffer_size, sock=sock, vehicle=vehicle)
+        self.name = "remote-receiver"
+        self.skipped = 0
+        self.dropped = 0
+        self.vehicles = {}  # Link statistics of every vehicle the server knows, from status frames
+
+    def _read_exactly(self, n):
+        data = b""
+        while len(data) < n:
+            try:
+                chunk = self.sock.recv(n - len(data))
+            except socket.timeout:
+                if self._stop_event.is_set():
+                    return None
+                continue
+            if not chunk:
+                return None  # Server closed the connection
+            data += chunk
+        return data
+
+    def _status(self, status):
+        self.vehicles = status["vehicles"]
+        self.skipped, self.dropped = status["skipped"], status["dropped"]
+        links = [link for vehicle, link in self.vehicles.items()
+                 if self.vehicle is None or vehicle == str(self.vehicle)]
+        for name in ("received", "lost", "late"):
+            setattr(self, name, sum(link[name] for link in links))
+        self.bad = status["bad"]
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                header = self._read_exactly(FRAME_HEADER.size)
+                payload = header and self._read_exactly(FRAME_HEADER.unpack(header)[1])
+            except OSError:
+                break  # Socket closed by stop()
+            if payload is None:
+                break
+            kind = header[0]
+
+            if kind == FRAME_STATUS:
+                self._status(json.loads(payload))
+                continue
+            if kind != FRAME_PACKET:
+                continue
+            try:
+                packet = decode(payload)
+            except PacketError as e:
+                self.last_error = str(e)
+                continue
+
+            if isinstance(packet, Health):
+                self.health = packet
+                self.health_time = time.monotonic()
+                continue
+            if len(self.samples) == self.samples.maxlen:
+                self.overflow += 1
+            self.samples.append(packet)
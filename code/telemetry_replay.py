@@ -0,0 +1,161 @@
+import sys
+import time
+import heapq
+import random
+import socket
+import argparse
+import datetime
+import numpy as np
+from flight_log import load_flight, start_epoch, KIND_SIMULATION
+from event_detector import G
+from telemetry_packet import Sample, encode, encode_text, FORMAT_BINARY, FORMAT_TEXT, TEXT_TIMESTAMP_FORMAT
+
+# Replays a recorded flight to the ground station as live telemetry
+#
+#   python telemetry_replay.py ../data/Flight4.csv                    real time to 127.0.0.1:5005
+#   python telemetry_replay.py ../data/Flight4.csv --speed 10         10x faster
+#   python telemetry_replay.py ../data/Flight4.csv --speed 0 --loop 20 as fast as possible, 20 times
+#   python telemetry_replay.py "../data/Flight 3 - Simulation Data.csv" --loss 0.05 --jitter 0.05 --reorder 0.01
+#   python telemetry_replay.py ../data/Flight3.csv --vehicle 2      a second rocket for ground_server.py
+#
+# Packets are in the exact wire format of send_data3.py (telemetry_packet.py). Network faults are
+# injected on the way: lost packets are never sent (the ground station sees the sequence gap),
+# jitter delays each packet by a random 0..jitter seconds of flight time, and a reordered packet is
+# held back by reorder_delay. Sending happens in order of the resulting times, so jitter larger
+# than the sample interval also reorders packets, like on a real link.
+# sensor_channels() is also what mock_sensors.py replays to send_data3.py.
+
+
+def sensor_channels(df):
+    # Raw sensor channels of any log as float64 arrays, named like the Sample fields (plus pressure).
+    # Simulation exports have no raw IMU data: the accelerometer is rebuilt along the rocket's long
+    # axis (x) from the vertical acceleration plus gravity, the gyro from the angular rates (rad/s)
+    n = len(df)
+
+    def column(name, default=0.0):
+        return df[name].to_numpy(dtype=np.float64) if name in df else np.full(n, default)
+
+    channels = {
+        "t": column("Time (s)"),
+        "pressure": column("Pressure (hPa)", 1013.25),
+        "temperature": column("Temperature (°C)", 15.0),
+        "altitude": column("Altitude (m)"),
+        "gps_alt": column("GPS_Altitude (m)"),
+        "accel_x": column("Accel_X (m/s²)"),
+        "accel_y": column("Accel_Y (m/s²)"),
+        "accel_z": column("Accel_Z (m/s²)"),
+        "gyro_x": column("Gyro_X (°/s)"),
+        "gyro_y": column("Gyro_Y (°/s)"),
+        "gyro_z": column("Gyro_Z (°/s)"),
+        "mag_x": column("Mag_X (µT)"),
+        "mag_y": column("Mag_Y (µT)"),
+        "mag_z": column("Mag_Z (µT)"),
+        "lat": column("GPS_Latitude"),
+        "lon": column("GPS_Longitude"),
+    }
+    if df.attrs.get("kind") == KIND_SIMULATION:
+        channels["accel_x"] = column("Vertical_Acceleration") + G
+        channels["gyro_x"] = np.radians(column("Roll_Rate"))
+        channels["gyro_y"] = np.radians(column("Pitch_Rate"))
+        channels["gyro_z"] = np.radians(column("Yaw_Rate"))
+    return channels
+
+
+def log_samples(df):
+    # One Sample per log row (seq = row index)
+    channels = sensor_channels(df)
+    fields = [channels[name] for name in Sample._fields[1:]]
+    return [Sample(i, *row) for i, row in enumerate(zip(*(f.tolist() for f in fields)))]
+
+
+def schedule(samples, loss=0.0, jitter=0.0, reorder=0.0, reorder_delay=0.5, rng=random):
+    # (send time in flight seconds, sample) in sending order, with the network faults applied
+    heap = []
+    for sample in samples:
+        if loss and rng.random() < loss:
+            continue
+        t = sample.t
+        if jitter:
+            t += rng.uniform(0, jitter)
+        if reorder and rng.random() < reorder:
+            t += reorder_delay
+        heapq.heappush(heap, (t, sample.seq, sample))
+    while heap:
+        t, _, sample = heapq.heappop(heap)
+        yield t, sample
+
+
+def replay(samples, send, speed=1.0, clock=time.monotonic, sleep=time.sleep, **faults):
+    # Calls send(sample) for every scheduled sample, speed x faster than the flight (0 = no waiting).
+    # Deadlines are absolute, so sending time does not add up. Returns the number of samples sent
+    sent = 0
+    start = None
+    for t, sample in schedule(samples, **faults):
+        if start is None:
+            start = clock() - (t / speed if speed else 0)
+        if speed:
+            delay = start + t / speed - clock()
+            if delay > 0:
+                sleep(delay)
+        send(sample)
+        sent += 1
+    return sent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a flight log as live UDP telemetry")
+    parser.add_argument("log", help="flight log (any layout in data/, or a binary log directory)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, 0 = as fast as possible")
+    parser.add_argument("--loop", type=int, default=1, help="number of times to send the flight")
+    parser.add_argument("--format", choices=(FORMAT_BINARY, FORMAT_TEXT), default=FORMAT_BINARY)
+    parser.add_argument("--vehicle", type=int, default=1, help="vehicle id in the binary packets")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of packets dropped")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum extra delay per packet (s)")
+    parser.add_argument("--reorder", type=float, default=0.0, help="fraction of packets held back")
+    parser.add_argument("--reorder-delay", type=float, default=0.5, help="how long they are held back (s)")
+    parser.add_argument("--seed", type=int, help="random seed for repeatable faults")
+    args = parser.parse_args(argv)
+
+    df = load_flight(args.log)
+    samples = log_samples(df)
+    duration = samples[-1].t if samples else 0.0
+    epoch = start_epoch(df) or time.time()
+    rng = random.Random(args.seed)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = (args.host, args.port)
+    failures = 0
+
+    def send(sample):
+        nonlocal failures
+        try:
+            if args.format == FORMAT_TEXT:
+                # Text packets carry the wall clock time, as the original sender wrote it
+                timestamp = datetime.datetime.fromtimestamp(epoch + sample.t).strftime(TEXT_TIMESTAMP_FORMAT)
+                sock.sendto(encode_text(sample, timestamp), address)
+            else:
+                sock.sendto(encode(sample, vehicle=args.vehicle), address)
+        except OSError:
+            failures += 1
+
+    print(f"📡 Replaying {len(samples)} samples ({duration:.1f} s) to {args.host}:{args.port} "
+          f"at {'max' if not args.speed else f'{args.speed:g}x'} speed")
+    total, started = 0, time.perf_counter()
+    try:
+        for lap in range(args.loop):
+            # Later laps continue the sequence numbers and time, like one long flight
+            offset_seq, offset_t = lap * len(samples), lap * (duration + 1.0)
+            lap_samples = [s._replace(seq=s.seq + offset_seq, t=s.t + offset_t) for s in samples] if lap else samples
+            total += replay(lap_samples, send, args.speed, loss=args.loss, jitter=args.jitter,
+                            reorder=args.reorder, reorder_delay=args.reorder_delay, rng=rng)
+    except KeyboardInterrupt:
+        print("\n🛑 Replay stopped")
+    elapsed = time.perf_counter() - started
+    print(f"✅ {total} packets sent in {elapsed:.2f} s ({total / max(elapsed, 1e-9):.0f} packets/s), "
+          f"{failures} send errors")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from flight_log import load_flight
+from derived_metrics import derive
+
+# Telemetry dashboard figure and offline video export
+#
+#   python telemetry_video.py ../data/Flight4.csv flight4.mp4 [fps] [processes]
+#
+# TelemetryFigure is the 3x3 post-flight dashboard (also used by post_flight_plot.py). For video
+# the figure is drawn off screen with the Agg canvas: the axes, grids and legends are rendered
+# once, and every frame only restores that background, redraws the line artists (same objects,
+# new data) and pipes the raw RGBA pixels to ffmpeg. Frames follow the real sample times at the
+# camera frame rate, so the video has the flight's duration and can be laid next to the camera
+# footage. With more than one process the frames are split into chunks that are encoded in
+# parallel and joined without re-encoding.
+
+FFMPEG = "ffmpeg"
+DEFAULT_FPS = 30  # camera.py records at 30 fps
+VIDEO_SIZE = (12.8, 7.2)  # inches at VIDEO_DPI -> 1280x720 like the camera
+VIDEO_DPI = 100
+
+TITLES = [
+    "Temperature vs Time", "Altitude (Barometric & GPS) vs Time", "Vertical Velocity vs Time",
+    "Total Acceleration vs Time", "Vertical Acceleration vs Time", "Orientation (Pitch, Roll, Yaw) vs Time",
+    "Angular Rates (°/s) vs Time", "Rocket Drift vs Time", "GPS Ground Track (m)"
+]
+
+YLIMS = [
+    (0, 50), (0, 250), (-12.5, 60),
+    (0, 90), (-15, 90), (-180, 180),
+    (-25, 40), (0, 500), None
+]
+
+# Line -> (axes index, x column, y column, label, color)
+LINES = {
+    "temperature": (0, "Time", "Temperature (°C)", "Temperature (°C)", "red"),
+    "alt_baro": (1, "Time", "Altitude (m)", "Barometric Altitude (m)", "blue"),
+    "alt_gps": (1, "Time", "GPS_Altitude (m)", "GPS Altitude (m)", "red"),
+    "velocity": (2, "Time", "Vertical_Velocity", "Vertical Velocity (m/s)", "green"),
+    "total_acc": (3, "Time", "Total_Acceleration", "Total Acceleration (m/s²)", "purple"),
+    "vertical_acc": (4, "Time", "Vertical_Acceleration", "Vertical Acceleration (m/s²)", "orange"),
+    "pitch": (5, "Time", "Pitch", "Pitch (°)", "blue"),
+    "roll": (5, "Time", "Roll", "Roll (°)", "red"),
+    "yaw": (5, "Time", "Yaw", "Yaw (°)", "green"),
+    "pitch_rate": (6, "Time", "Pitch_Rate", "Pitch Rate (°/s)", "blue"),
+    "roll_rate": (6, "Time", "Roll_Rate", "Roll Rate (°/s)", "red"),
+    "yaw_rate": (6, "Time", "Yaw_Rate", "Yaw Rate (°/s)", "green"),
+    "drift": (7, "Time", "Rocket_Drift", "Rocket Drift (m)", "brown"),
+    "gps_path": (8, "GPS_East", "GPS_North", "Path", None),
+}
+
+
+class TelemetryFigure:
+    # The dashboard axes and lines on a given figure; show(n) displays the first n samples
+
+    def __init__(self, df, fig, time_limits=None):
+        # df: loaded and derived log with a "Time" column; time_limits: fixed x range of the time axes.
+        # Only lines whose columns exist are drawn (simulation exports have no IMU, GPS or temperature)
+        self.fig = fig
+        self.ax = fig.subplots(3, 3).flatten()
+        self.plotted = {name: spec for name, spec in LINES.items() if spec[1] in df and spec[2] in df}
+        names = {c for _, x, y, _, _ in self.plotted.values() for c in (x, y)}
+        self.columns = {c: df[c].to_numpy(dtype=np.float64) for c in names}
+        self.time = self.columns["Time"]
+
+        for i, a in enumerate(self.ax):
+            a.set_title(TITLES[i])
+            if YLIMS[i]:
+                a.set_ylim(*YLIMS[i])
+            if time_limits and i < 8:
+                a.set_xlim(*time_limits)
+            a.grid(True)
+
+        # Ground track limits: the whole track (meters from the pad), at least 10 m around the pad
+        east, north = (df[c] if c in df else [] for c in ("GPS_East", "GPS_North"))
+        reach = max(10.0, float(np.nanmax(np.abs(np.r_[east, north, 0.0]))) * 1.05)
+        self.ax[8].set_xlim(-reach, reach)
+        self.ax[8].set_ylim(-reach, reach)
+        self.ax[8].set_aspect("equal")
+
+        self.lines = {}
+        for name, (i, x, y, label, color) in self.plotted.items():
+            self.lines[name] = self.ax[i].plot([], [], label=label, color=color)[0]
+        for a in self.ax:
+            if a.get_lines():
+                a.legend(loc="upper right")
+
+    def show(self, n):
+        # Display the first n samples (array views, nothing is copied)
+        for name, (_, x, y, _, _) in self.plotted.items():
+            self.lines[name].set_data(self.columns[x][:n], self.columns[y][:n])
+
+
+def load_for_video(log_path):
+    df = load_flight(log_path)
+    df["Time"] = df["Time (s)"]
+    if "Accel_X (m/s²)" in df:
+        derive(df, time_column="Time")
+    return df
+
+
+def frame_count(df, fps):
+    return int(df["Time"].iloc[-1] * fps) + 1
+
+
+def _encoder(path, width, height, fps):
+    return subprocess.Popen(
+        [FFMPEG, "-loglevel", "error", "-y",
+         "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+         "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", path],
+        stdin=subprocess.PIPE)
+
+
+class FrameRenderer:
+    # Off-screen dashboard frames: render(t) returns the RGBA pixels with the samples up to t
+
+    def __init__(self, df):
+        with matplotlib.rc_context({"font.size": 7}):
+            self.fig = Figure(figsize=VIDEO_SIZE, dpi=VIDEO_DPI)
+            self.canvas = FigureCanvasAgg(self.fig)
+            self.figure = TelemetryFigure(df, self.fig, time_limits=(0, max(df["Time"].iloc[-1], 1)))
+            self.status = self.fig.text(0.5, 0.995, "", ha="center", va="top")
+            self.fig.tight_layout(rect=(0, 0, 1, 0.98))
+
+        self.artists = list(self.figure.lines.values()) + [self.status]
+        for artist in self.artists:
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.width, self.height = self.canvas.get_width_height()
+
+    def render(self, t):
+        self.figure.show(np.searchsorted(self.figure.time, t, side="right"))
+        self.status.set_text(f"T{t:+6.1f} s")
+        self.canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+        return self.canvas.buffer_rgba()
+
+
+def write_frames(encoder, frames):
+    # Feeds frames (an iterable of buffers) to an encoder process and waits for it to finish
+    try:
+        for frame in frames:
+            encoder.stdin.write(frame)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early, reported below with its exit code
+    finally:
+        try:
+            encoder.stdin.close()
+        except BrokenPipeError:
+            pass
+        encoder.wait()
+    if encoder.returncode:
+        raise RuntimeError(f"ffmpeg failed with exit code {encoder.returncode}")
+
+
+def render_chunk(log_path, path, fps, start, stop):
+    # Encodes frames [start, stop) of the flight into one video file; returns the frame count
+    renderer = FrameRenderer(load_for_video(log_path))
+    encoder = _encoder(path, renderer.width, renderer.height, fps)
+    write_frames(encoder, (renderer.render(frame / fps) for frame in range(start, stop)))
+    return stop - start
+
+
+def export_video(log_path, path, fps=DEFAULT_FPS, processes=1):
+    frames = frame_count(load_for_video(log_path), fps)
+    if processes <= 1:
+        return render_chunk(log_path, path, fps, 0, frames)
+
+    # Chunks are encoded separately (each starts with a key frame) and joined with the concat demuxer
+    bounds = np.linspace(0, frames, processes + 1).astype(int)
+    tmp = tempfile.mkdtemp(prefix="telemetry_video_")
+    try:
+        parts = [os.path.join(tmp, f"part_{i:03d}.mp4") for i in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            done = sum(pool.map(render_chunk, [log_path] * processes, parts, [fps] * processes,
+                                bounds[:-1].tolist(), bounds[1:].tolist()))
+        list_file = os.path.join(tmp, "list.txt")
+        with open(list_file, "w") as f:
+            for part in parts:
+                f.write(f"file '{part}'\n")
+        subprocess.run([FFMPEG, "-loglevel", "error", "-y", "-f", "concat", "-safe", "0", "-i", list_file,
+                        "-c", "copy", path], check=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return done
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python telemetry_video.py <log> <output.mp4> [fps] [processes]")
+        sys.exit(1)
+    fps = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_FPS
+    processes = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    frames = export_video(sys.argv[1], sys.argv[2], fps, processes)
+    print(f"🎬 {frames} frames written to {sys.argv[2]}")
@@ -0,0 +1,53 @@
+import os
+import math
+import numpy as np
+from flight_log import load_flight
+from telemetry_replay import sensor_channels
+from state_estimator import StateEstimator
+from event_detector import FlightEventDetector, APOGEE, BURNOUT, LIFTOFF, COAST, DESCENT
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+IMU_RATE_HZ = 100  # send_data3.py in flight
+BARO_RATE_HZ = 32
+
+
+def onboard_events(name, duration=12.0):
+    # Replays a log like send_data3.py samples it: the IMU read at IMU_RATE_HZ, the barometer at
+    # BARO_RATE_HZ and held in between, every IMU sample through StateEstimator.update and then
+    # FlightEventDetector.update (same sequence as read_imu)
+    channels = sensor_channels(load_flight(os.path.join(DATA, name)))
+    estimator, detector = StateEstimator(), FlightEventDetector()
+    for t in np.arange(0.0, duration, 1 / IMU_RATE_HZ).tolist():
+        i = max(np.searchsorted(channels["t"], t, side="right") - 1, 0)
+        baro_t = math.floor(t * BARO_RATE_HZ) / BARO_RATE_HZ  # Latest barometer read
+        j = max(np.searchsorted(channels["t"], baro_t, side="right") - 1, 0)
+        altitude = float(channels["altitude"][j])
+        ax, ay, az, gx, gy, gz = (float(channels[c][i]) for c in (
+            "accel_x", "accel_y", "accel_z", "gyro_x", "gyro_y", "gyro_z"))
+        h, v, _, _, _ = estimator.update(t, altitude, ax, ay, az, gx, gy, gz)
+        for event in detector.update(t, h, v, math.sqrt(ax * ax + ay * ay + az * az)):
+            yield event, v
+
+
+def test_onboard_apogee_not_on_baro_dip():
+    # Flight4 has a 3.8 m barometer dip at 2.43 s while still climbing at ~40 m/s; apogee is ~7 s
+    events = {event.name: (event, v) for event, v in onboard_events("Flight4.csv")}
+    assert [LIFTOFF, BURNOUT, APOGEE] == list(events)[:3]
+    apogee, velocity = events[APOGEE]
+    assert 6.0 < apogee.t < 7.5
+    assert velocity <= 0
+
+
+def test_drop_rule_needs_coast_and_no_climb():
+    detector = FlightEventDetector()
+    detector.update(0.0, 0.0, 0.0, 30.0)
+    detector.update(0.1, 0.0, 0.0, 30.0)  # Liftoff after the hold
+    for t, altitude, velocity in ((1.0, 50.0, 40.0), (1.1, 45.0, 40.0)):
+        assert detector.update(t, altitude, velocity, 30.0) == []  # Dip under thrust
+    for t in (2.0, 2.1):
+        detector.update(t, 80.0, 30.0, 5.0)  # Burnout after the hold
+    assert detector.phase == COAST
+    assert detector.update(2.2, 70.0, 25.0, 5.0) == []  # Dip while climbing
+    events = detector.update(5.0, 90.0, 0.0, 9.8) + detector.update(5.1, 87.0, 0.0, 9.8)
+    assert [e.name for e in events] == [APOGEE]
+    assert detector.phase == DESCENT
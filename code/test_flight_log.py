@@ -0,0 +1,75 @@
+import os
+import time
+import datetime
+import numpy as np
+import pytest
+from onboard_log import BinaryLogWriter, LOG_COLUMNS, open_binary_log, export_csv
+from flight_log import load_flight, start_epoch
+
+START = 1_700_000_000.25  # Unix time of the first sample
+
+
+@pytest.fixture
+def local_timezone():
+    # A time zone away from UTC, so a UTC/local mix-up shows
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "Europe/Zurich"
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+def write_log(directory, rows, chunk_rows):
+    writer = BinaryLogWriter(directory, chunk_rows=chunk_rows)
+    values = np.arange(rows * len(LOG_COLUMNS), dtype=np.float64).reshape(rows, -1) / 8
+    values[:, 0] = 10.0 + np.arange(rows) * 0.01  # Time (s)
+    values[:, 1] = START + np.arange(rows) * 0.01  # Unix Time (s)
+    for row in values:
+        writer.append(row)
+    writer.close()
+    return values
+
+
+def test_binary_log_round_trip(tmp_path):
+    directory = str(tmp_path / "log")
+    values = write_log(directory, 250, chunk_rows=100)  # Three segments, the last partly filled
+    log = open_binary_log(directory)
+    for i, name in enumerate(LOG_COLUMNS):
+        np.testing.assert_array_equal(log[name], values[:, i])
+
+
+def test_binary_and_csv_agree(tmp_path, local_timezone):
+    directory = str(tmp_path / "log")
+    write_log(directory, 250, chunk_rows=100)
+    csv_path = str(tmp_path / "log.csv")
+    assert export_csv(directory, csv_path) == 250
+
+    binary, text = load_flight(directory), load_flight(csv_path, use_cache=False)
+    assert binary["Timestamp"].iloc[0] == datetime.datetime.fromtimestamp(START)
+    assert (binary["Timestamp"].dt.floor("s") == text["Timestamp"]).all()
+    np.testing.assert_allclose(binary["Time (s)"], text["Time (s)"], atol=1e-9)
+    np.testing.assert_allclose(binary["Altitude (m)"], text["Altitude (m)"], rtol=1e-6)
+    assert start_epoch(binary) == pytest.approx(START)
+    assert start_epoch(text) == pytest.approx(START, abs=0.5)  # Whole second timestamps
+
+
+@pytest.mark.parametrize("content", [b"", b"\x80\x04garbage", b"cpandas.nonexistent\nFrame\n."])
+def test_broken_cache_is_a_miss(tmp_path, monkeypatch, content):
+    import flight_log
+    monkeypatch.setattr(flight_log, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(flight_log, "_memory_cache", {})
+    csv_path = str(tmp_path / "log.csv")
+    with open(csv_path, "w") as f:
+        f.write("Time (s);Altitude (m)\n0.0;1.5\n0.1;2.5\n")
+    os.makedirs(flight_log.CACHE_DIR)
+    cache_file = os.path.join(flight_log.CACHE_DIR, f"{flight_log._cache_key(csv_path)}.pkl")
+    with open(cache_file, "wb") as f:
+        f.write(content)
+
+    df = load_flight(csv_path)
+    assert df["Altitude (m)"].tolist() == [1.5, 2.5]
+    assert os.path.getsize(cache_file) > len(content)  # Rewritten
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from geodesy import (WGS84_A, WGS84_B, valid_fix, first_fix, geodetic_to_ecef, ecef_to_geodetic,
+                     geodetic_to_enu, enu_to_geodetic, ground_track, predict_landing)
+
+PAD = (47.3977, 8.5456, 420.0)
+
+
+def test_ecef_known_points():
+    assert geodetic_to_ecef(0.0, 0.0, 0.0) == pytest.approx((WGS84_A, 0.0, 0.0))
+    assert geodetic_to_ecef(0.0, 90.0, 100.0) == pytest.approx((0.0, WGS84_A + 100, 0.0), abs=1e-6)
+    assert geodetic_to_ecef(90.0, 0.0, 0.0) == pytest.approx((0.0, 0.0, WGS84_B), abs=1e-6)
+
+
+def test_ecef_round_trip():
+    lat, lon, alt = np.array([-33.9, 0.0, 47.3977, 78.2]), np.array([151.2, -70.5, 8.5456, 15.6]), np.array([0.0, 10.0, 420.0, 3000.0])
+    back = ecef_to_geodetic(*geodetic_to_ecef(lat, lon, alt))
+    np.testing.assert_allclose(back[0], lat, atol=1e-9)
+    np.testing.assert_allclose(back[1], lon, atol=1e-9)
+    np.testing.assert_allclose(back[2], alt, atol=1e-3)
+
+
+def test_enu_known_distances():
+    # 0.001° of latitude at 45° is 111.13 m; 0.001° of longitude at 60° is 55.80 m (not 111 m * cos)
+    assert geodetic_to_enu(45.001, 8.0, 0.0, 45.0, 8.0, 0.0) == pytest.approx((0.0, 111.132, 0.0), abs=2e-3)
+    assert geodetic_to_enu(60.0, 8.001, 0.0, 60.0, 8.0, 0.0) == pytest.approx((55.800, 0.0, 0.0), abs=2e-3)
+    assert geodetic_to_enu(*PAD[:2], PAD[2] + 100, *PAD) == pytest.approx((0.0, 0.0, 100.0), abs=1e-6)
+
+
+def test_enu_round_trip():
+    east, north, up = np.array([0.0, 250.0, -1200.0]), np.array([0.0, -80.0, 3000.0]), np.array([0.0, 150.0, 5.0])
+    back = geodetic_to_enu(*enu_to_geodetic(east, north, up, *PAD), *PAD)
+    for result, expected in zip(back, (east, north, up)):
+        np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_no_fix_values():
+    lat, lon, alt = np.array([0.0, 0.0, PAD[0], np.nan]), np.array([0.0, 0.0, PAD[1], 8.0]), np.full(4, PAD[2])
+    assert valid_fix(lat, lon).tolist() == [False, False, True, False]
+    assert first_fix(lat, lon, alt) == PAD
+    assert all(np.isnan(first_fix([0.0], [0.0], [0.0])))
+    east, north = ground_track(lat, lon, alt, PAD)
+    assert np.isnan(east[[0, 1, 3]]).all() and np.isnan(north[[0, 1, 3]]).all()
+    assert (east[2], north[2]) == pytest.approx((0.0, 0.0), abs=1e-6)
+
+
+def test_predict_landing():
+    # Descending at 5 m/s while drifting 2 m/s east and 1 m/s south: 80 m left at t = 4 s
+    t = np.linspace(0.0, 4.0, 41)
+    east, north, height = 2 * t, -t, 100 - 5 * t
+    assert predict_landing(t, east, north, height) == pytest.approx((40.0, -20.0, 16.0))
+    assert predict_landing(t, east, north, 100 + 5 * t) is None  # Climbing
+    assert predict_landing(t, east, north, 100 - 0.5 * t) is None  # Too slow to be descending
+    assert predict_landing(t, np.full(41, np.nan), north, height) is None  # No GPS
+    assert predict_landing(t[:2], east[:2], north[:2], height[:2]) is None  # Too few points
+
+
+def test_predict_landing_uses_recent_window():
+    # A different drift before the window must not matter
+    t = np.linspace(0.0, 20.0, 201)
+    east = np.where(t < 10, 10 * t, 100 + 2 * (t - 10))
+    prediction = predict_landing(t, east, np.zeros_like(t), 200 - 5 * t, window=5.0)
+    assert prediction == pytest.approx((120.0 + 2 * 20.0, 0.0, 20.0))
@@ -0,0 +1,89 @@
+import pytest
+from gps_reader import GpsReader, NmeaError, checksum, command, parse_gga
+
+# The standard GGA example: 48°07.038' N 11°31.000' E, 545.4 m, 8 satellites, 12:35:19 UTC
+GGA = "$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47"
+
+
+def sentence(body):
+    return command(body).decode("ascii").strip()
+
+
+def test_checksum_and_command():
+    assert checksum("GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,") == 0x47
+    assert command("PMTK220,200") == b"$PMTK220,200*2C\r\n"
+
+
+def test_parse_gga():
+    fix = parse_gga(GGA)
+    assert fix.lat == pytest.approx(48 + 7.038 / 60)
+    assert fix.lon == pytest.approx(11 + 31.0 / 60)
+    assert (fix.alt, fix.satellites, fix.hdop, fix.utc) == (545.4, 8, 0.9, 12 * 3600 + 35 * 60 + 19)
+
+
+def test_hemisphere_signs():
+    fix = parse_gga(sentence("GNGGA,000001.5,3356.500,S,07030.000,W,1,05,1.2,10.0,M,,M,,"))
+    assert fix.lat == pytest.approx(-(33 + 56.5 / 60))
+    assert fix.lon == pytest.approx(-(70 + 30.0 / 60))
+    assert fix.utc == 1.5
+
+
+def test_no_fix_and_empty_fields():
+    assert parse_gga(sentence("GPGGA,123519,,,,,0,00,,,M,,M,,")) is None  # Quality 0
+    assert parse_gga(sentence("GPGGA,123519,,N,,E,1,00,,,M,,M,,")) is None  # No position yet
+    fix = parse_gga(sentence("GPGGA,,4807.038,N,01131.000,E,1,,,,M,,M,,"))
+    assert fix.satellites == 0 and fix.alt != fix.alt and fix.utc != fix.utc  # Missing values: 0 / NaN
+    assert parse_gga(sentence("PMTK001,220,3")) is None  # Not a GGA sentence
+
+
+@pytest.mark.parametrize("line", [
+    GGA[:-2] + "48",  # Wrong checksum
+    GGA[:-3],  # No checksum
+    "GPGGA,123519*00",  # No "$"
+    sentence("GPGGA,123519,4807.038,N"),  # Too short
+    sentence("GPGGA,123519,48x7.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"),  # Bad number
+])
+def test_corrupted_sentences(line):
+    with pytest.raises(NmeaError):
+        parse_gga(line)
+
+
+class FakeI2C:
+    # PA1010D output buffer: returns the queued bytes, then "\n" padding like the module
+    def __init__(self, data=b"", locked=False):
+        self.data = bytearray(data)
+        self.locked = locked
+        self.written = []
+
+    def try_lock(self):
+        return not self.locked
+
+    def unlock(self):
+        pass
+
+    def writeto(self, address, data):
+        self.written.append(bytes(data))
+
+    def readfrom_into(self, address, buffer):
+        chunk = self.data[:len(buffer)]
+        del self.data[:len(buffer)]
+        buffer[:] = chunk + b"\n" * (len(buffer) - len(chunk))
+
+
+def test_reader_joins_sentences_across_polls():
+    noise = b"$GPGGA,1*00\r\n"  # Bad checksum
+    i2c = FakeI2C(noise + GGA.encode("ascii") + b"\r\n")
+    gps = GpsReader(i2c, rate_hz=5, chunk_size=16)
+    assert i2c.written == [command("PMTK314,0,0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0"), command("PMTK220,200")]
+    fixes = [gps.poll() for _ in range(8)]
+    assert [f for f in fixes if f is not None] == [gps.fix]
+    assert gps.fix.alt == 545.4
+    assert (gps.sentences, gps.errors) == (1, 1)
+
+
+def test_reader_skips_busy_bus():
+    i2c = FakeI2C(GGA.encode("ascii") + b"\r\n")
+    gps = GpsReader(i2c)
+    i2c.locked = True
+    assert gps.poll() is None and gps.busy == 1
+    assert len(i2c.data) > 0  # Nothing was read
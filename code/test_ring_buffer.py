@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import pytest
+from ring_buffer import RingBuffer, load_spill
+
+
+def rows(start, stop):
+    return [(float(i), float(-i)) for i in range(start, stop)]
+
+
+def check(buffer, start, stop):
+    # The window holds rows [start, stop), both halves of the storage mirror each other
+    np.testing.assert_array_equal(buffer.view("a"), np.arange(start, stop))
+    np.testing.assert_array_equal(buffer.view("b"), -np.arange(start, stop))
+    np.testing.assert_array_equal(buffer._data[:, :buffer.capacity], buffer._data[:, buffer.capacity:])
+
+
+def test_fill_and_wrap_around():
+    buffer = RingBuffer(["a", "b"], 5)
+    buffer.extend(rows(0, 3))
+    assert len(buffer) == 3
+    check(buffer, 0, 3)
+    buffer.extend(rows(3, 7))  # Wraps
+    assert len(buffer) == 5 and buffer.total == 7
+    check(buffer, 2, 7)
+    for i in range(7, 13):
+        buffer.append((float(i), float(-i)))
+        check(buffer, i - 4, i + 1)
+    assert buffer.latest("a") == 12
+
+
+def test_block_larger_than_capacity():
+    buffer = RingBuffer(["a", "b"], 5)
+    buffer.extend(rows(0, 2))
+    buffer.extend(rows(2, 15))
+    assert buffer.total == 15
+    check(buffer, 10, 15)
+    buffer.extend(rows(15, 16))
+    check(buffer, 11, 16)
+
+
+def test_rejects_wrong_row_length():
+    with pytest.raises(ValueError):
+        RingBuffer(["a", "b"], 5).extend([(1.0, 2.0, 3.0)])
+
+
+def test_spill_keeps_everything_across_restarts(tmp_path):
+    path = str(tmp_path / "history.f64")
+    buffer = RingBuffer(["a", "b"], 5, spill_path=path)
+    buffer.extend(rows(0, 12))
+    buffer.close()
+    with open(path, "ab") as f:
+        f.write(b"\0" * 3)  # Partial row of a crash
+
+    buffer = RingBuffer(["a", "b"], 5, spill_path=path)  # Restart: continues the same file
+    buffer.extend(rows(12, 14))
+    buffer.close()
+    np.testing.assert_array_equal(load_spill(path)["a"], np.arange(14))
+
+    buffer = RingBuffer(["a", "b", "c"], 5, spill_path=path)  # Other channels: a new file
+    buffer.append((1.0, 2.0, 3.0))
+    buffer.close()
+    assert list(load_spill(path)) == ["a", "b", "c"]
+    assert os.path.getsize(path) == 24
@@ -0,0 +1,55 @@
+from scheduler import RateScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def run_until(scheduler, clock, end):
+    while clock.now < end:
+        clock.sleep(max(scheduler.run_pending() - clock.now, 0.0))
+
+
+def test_fixed_rate_deadlines():
+    clock = FakeClock()
+    scheduler = RateScheduler(clock, clock.sleep)
+    calls = []
+    scheduler.add("imu", 10, lambda t: calls.append(round(t, 6)))
+    run_until(scheduler, clock, 0.95)
+    assert calls == [i / 10 for i in range(10)]
+    assert scheduler.tasks["imu"].overruns == 0
+
+
+def test_set_rate_from_own_callback_keeps_deadline():
+    # Like the liftoff rate switch in send_data3.py: the IMU callback raises its own rate
+    clock = FakeClock()
+    scheduler = RateScheduler(clock, clock.sleep)
+    calls = []
+
+    def imu(t):
+        calls.append(round(t, 6))
+        if len(calls) == 3:
+            scheduler.set_rate("imu", 100)
+
+    scheduler.add("imu", 10, imu)
+    run_until(scheduler, clock, 0.25)
+    # 10 Hz until the switch at 0.2 s, then 100 Hz starting one new period after it
+    assert calls[:5] == [0.0, 0.1, 0.2, 0.21, 0.22]
+
+
+def test_set_rate_from_other_task():
+    clock = FakeClock()
+    scheduler = RateScheduler(clock, clock.sleep)
+    calls = []
+    scheduler.add("imu", 10, lambda t: calls.append(round(t, 6)))
+    scheduler.add("switch", 4, lambda t: t > 0 and scheduler.set_rate("imu", 20))
+    run_until(scheduler, clock, 0.42)
+    # Switched at 0.25 s: the next IMU run is one new period later
+    assert calls[:6] == [0.0, 0.1, 0.2, 0.3, 0.35, 0.4]
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+from flight_log import load_flight
+from state_estimator import StateEstimator, estimate
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+COLUMNS = ("Time (s)", "Altitude (m)", "Accel_X (m/s²)", "Accel_Y (m/s²)", "Accel_Z (m/s²)",
+           "Gyro_X (°/s)", "Gyro_Y (°/s)", "Gyro_Z (°/s)")
+
+
+def flight(name):
+    df = load_flight(os.path.join(DATA, name))
+    return [df[c].to_numpy(dtype=np.float64) for c in COLUMNS]
+
+
+def test_apogee_matches_barometer():
+    # Flight 4's barometer holds a flat top for about a second, so its peak time is loose
+    for name, meters, seconds in (("Flight3.csv", 1.0, 0.5), ("Flight2.csv", 1.0, 0.5), ("Flight4.csv", 3.5, 1.0)):
+        t, altitude, *imu = flight(name)
+        estimated = estimate(t, altitude, *imu)["Altitude_Estimate"]
+        i, j = np.argmax(estimated), np.argmax(altitude)
+        assert abs(estimated[i] - altitude[j]) < meters, name
+        assert abs(t[i] - t[j]) < seconds, name
+
+
+def test_batch_matches_sample_by_sample():
+    columns = [c[:3000] for c in flight("Flight3.csv")]
+    zeros = np.zeros(len(columns[0]))
+    batch = StateEstimator().process(*columns, zeros, zeros, zeros)
+
+    estimator = StateEstimator()
+    rows = np.array([estimator.update(*row) for row in zip(*(c.tolist() for c in columns))])
+    for k, name in enumerate(("Altitude_Estimate", "Vertical_Velocity", "Pitch", "Roll", "Yaw")):
+        np.testing.assert_allclose(batch[name], rows[:, k], atol=1e-9)
+
+
+def test_blocks_carry_state():
+    columns = [c[:3000] for c in flight("Flight3.csv")]
+    zeros = np.zeros(len(columns[0]))
+    whole = StateEstimator().process(*columns, zeros, zeros, zeros)
+
+    estimator = StateEstimator()
+    blocks = [estimator.process(*(c[i:i + n] for c in columns), *(zeros[i:i + n],) * 3)
+              for i, n in ((0, 5), (5, 100), (105, 2895))]
+    for name, values in whole.items():
+        np.testing.assert_allclose(np.concatenate([b[name] for b in blocks]), values, atol=1e-9)
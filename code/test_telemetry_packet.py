@@ -0,0 +1,69 @@
+import struct
+import binascii
+import pytest
+from telemetry_packet import (
+    Sample, Health, HEALTH_STAGES, PacketError, MAGIC, KIND_SAMPLE, PACKET_SIZE, HEALTH_PACKET_SIZE,
+    FORMAT_TEXT, encode, decode, decode_packet,
+)
+
+SAMPLE = Sample(41, 12.345, 21.5, 130.25, 512.0, 0.5, -1.25, 9.75, 0.01, -0.02, 0.03,
+                20.0, -5.0, 40.0, 47.3977123, 8.5456789)
+
+
+def test_sample_round_trip():
+    data = encode(SAMPLE, vehicle=7)
+    assert len(data) == PACKET_SIZE
+    vehicle, sample = decode_packet(data)
+    assert vehicle == 7
+    assert sample.seq == 41 and sample.t == 12.345
+    assert sample[2:14] == pytest.approx(SAMPLE[2:14], rel=1e-6)  # float32
+    assert sample.lat == pytest.approx(SAMPLE.lat, abs=1e-7)
+    assert sample.lon == pytest.approx(SAMPLE.lon, abs=1e-7)
+
+
+def test_health_round_trip():
+    timings = [float(i) for i in range(2 * len(HEALTH_STAGES))]
+    health = Health(3, 60.0, 55.0, 0.5, 12.5, *timings, 1, 2, 3, 4, 5)
+    data = encode(health, vehicle=1)
+    assert len(data) == HEALTH_PACKET_SIZE
+    assert decode_packet(data) == (1, health)
+
+
+def test_corrupted_byte_is_rejected():
+    data = bytearray(encode(SAMPLE))
+    for i in (5, 20, len(data) - 1):
+        corrupted = bytearray(data)
+        corrupted[i] ^= 0x01
+        with pytest.raises(PacketError, match="CRC"):
+            decode_packet(bytes(corrupted))
+
+
+def test_version_1_has_no_vehicle_byte():
+    header = struct.pack("<2sBBII", MAGIC, 1, KIND_SAMPLE, 41, 12345)
+    body = struct.pack("<12f2i", *SAMPLE[2:14], 473977123, 85456789)
+    data = header + body
+    data += struct.pack("<H", binascii.crc_hqx(data, 0xFFFF))
+    vehicle, sample = decode_packet(data)
+    assert vehicle == 0
+    assert (sample.seq, sample.t, sample.lat) == (41, 12.345, 47.3977123)
+
+
+def test_unknown_version_and_bad_length():
+    data = bytearray(encode(SAMPLE))
+    data[2] = 9
+    with pytest.raises(PacketError, match="version"):
+        decode_packet(bytes(data))
+    with pytest.raises(PacketError):
+        decode_packet(encode(SAMPLE)[:10])
+
+
+def test_text_fallback():
+    data = encode(SAMPLE, FORMAT_TEXT)
+    assert not data.startswith(MAGIC)
+    vehicle, sample = decode_packet(data)
+    assert vehicle == 0 and sample.seq is None
+    assert sample.altitude == 130.25 and sample.lat == pytest.approx(SAMPLE.lat, abs=1e-6)
+    with pytest.raises(ValueError):
+        encode(Health(0, 0.0, *[0.0] * (3 + 2 * len(HEALTH_STAGES)), 0, 0, 0, 0, 0), FORMAT_TEXT)
+    with pytest.raises(PacketError):
+        decode(b"not,a,packet")
@@ -0,0 +1,59 @@
+from telemetry_packet import Sample, Health, HEALTH_STAGES
+from telemetry_receiver import LinkStats, RESTART_GAP
+
+
+def sample(seq):
+    return Sample(seq, 0.0 if seq is None else seq / 100, *[0.0] * 14)
+
+
+def feed(stats, seqs):
+    return [stats.accept(sample(seq)) for seq in seqs]
+
+
+def counters(stats):
+    return stats.received, stats.lost, stats.late
+
+
+def test_in_order():
+    stats = LinkStats()
+    assert feed(stats, range(5)) == [True] * 5
+    assert counters(stats) == (5, 0, 0)
+
+
+def test_gap_counts_lost():
+    stats = LinkStats()
+    feed(stats, [0, 1, 4, 5, 9])
+    assert counters(stats) == (5, 5, 0)
+
+
+def test_late_packet_is_credited_and_dropped():
+    stats = LinkStats()
+    assert feed(stats, [0, 1, 3, 2, 4]) == [True, True, True, False, True]
+    assert counters(stats) == (4, 0, 1)
+
+
+def test_duplicate_is_not_credited():
+    stats = LinkStats()
+    assert feed(stats, [0, 1, 3, 3, 4]) == [True, True, True, False, True]
+    assert counters(stats) == (4, 1, 1)  # 2 is still lost
+
+
+def test_restart():
+    stats = LinkStats()
+    feed(stats, range(RESTART_GAP + 10))
+    assert feed(stats, [0, 1, 3]) == [True, True, True]  # Sender restarted: new sequence
+    assert counters(stats) == (RESTART_GAP + 13, 1, 0)
+    # Within RESTART_GAP it is an old packet, not a restart
+    stats = LinkStats()
+    feed(stats, range(RESTART_GAP))
+    assert feed(stats, [1]) == [False]
+    assert counters(stats) == (RESTART_GAP, 0, 1)
+
+
+def test_text_and_health_packets():
+    stats = LinkStats()
+    assert stats.accept(sample(None))
+    health = Health(0, 1.0, *[0.0] * (3 + 2 * len(HEALTH_STAGES)), 0, 0, 0, 0, 0)
+    assert not stats.accept(health)
+    assert stats.health is health
+    assert counters(stats) == (1, 0, 0)
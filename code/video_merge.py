@@ -1,22 +1,170 @@
 import os
+import sys
+import json
+import time
+import datetime
+import argparse
+import threading
 import subprocess
+from collections import namedtuple
+import numpy as np
+from flight_log import start_epoch
+from telemetry_video import FrameRenderer, load_for_video, write_frames, FFMPEG, DEFAULT_FPS
 
-# Path to your Downloads folder
-downloads_path = os.path.expanduser("~/Downloads")
-os.chdir(downloads_path)
+# Camera video merge and telemetry composite in one streaming ffmpeg pass
+#
+#   python video_merge.py ~/Downloads                                   camera segments -> output.mp4
+#   python video_merge.py ~/Downloads ../data/Flight4.csv               camera and dashboard side by side
+#   python video_merge.py ~/Downloads ../data/Flight4.csv --layout overlay -o flight4.mp4
+#
+# Segments are ordered by the wall clock time of their first frame (the .json/.pts files that
+# camera.py writes next to every .h264; older recordings fall back to the time in the file name)
+# and their bytes are streamed one after the other into ffmpeg, so there is no merged.h264 copy.
+# The telemetry dashboard is rendered for the wall clock time of every camera frame and piped into
+# the same ffmpeg process, which stacks or overlays the two streams and encodes the result once.
 
-# Get and sort .h264 files
-h264_files = sorted([f for f in os.listdir() if f.endswith(".h264")])
+DEFAULT_DIR = os.path.expanduser("~/Downloads")
+CHUNK_BYTES = 1 << 20
 
-# Write to list.txt
-with open("list.txt", "w") as f:
-    for file in h264_files:
-        f.write(f"file '{file}'\n")
+Segment = namedtuple("Segment", ["path", "start", "fps", "frame_times"])  # frame_times: s from start, or None
 
-# Merge .h264 files
-subprocess.run(["ffmpeg", "-f", "concat", "-safe", "0", "-i", "list.txt", "-c", "copy", "merged.h264"])
 
-# Convert to .mp4
-subprocess.run(["ffmpeg", "-framerate", "30", "-i", "merged.h264", "-c", "copy", "output.mp4"])
+def read_pts(path):
+    # Frame timestamps (s from the first frame) from a picamera2 / mkvmerge v2 timecode file
+    try:
+        with open(path) as f:
+            ms = [float(line) for line in f if line.strip() and not line.startswith("#")]
+    except OSError:
+        return None
+    return np.array(ms) / 1000 - (ms[0] / 1000 if ms else 0)
 
-print("🎬 All videos merged and converted to output.mp4")
+
+def _name_time(path):
+    # Wall clock time in camera.py file names (video_%Y-%m-%d_%H-%M-%S), else the modification time
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        return time.mktime(datetime.datetime.strptime(name[-19:], "%Y-%m-%d_%H-%M-%S").timetuple())
+    except ValueError:
+        return os.path.getmtime(path)
+
+
+def find_segments(directory):
+    segments = []
+    for name in os.listdir(directory):
+        if not name.endswith(".h264"):
+            continue
+        path = os.path.join(directory, name)
+        base = os.path.splitext(path)[0]
+        try:
+            with open(base + ".json") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            info = {}
+        frame_times = read_pts(base + ".pts")
+        fps = info.get("fps", DEFAULT_FPS)
+        if frame_times is not None and len(frame_times) > 1 and frame_times[-1] > 0:
+            fps = (len(frame_times) - 1) / frame_times[-1]  # Measured, the sensor is rarely exactly 30.00
+        segments.append(Segment(path, info.get("start", _name_time(path)), fps, frame_times))
+    return sorted(segments, key=lambda s: s.start)
+
+
+def frame_epochs(segments, end=None):
+    # Wall clock time of every frame of the merged video; segments without a .pts file are assumed
+    # to run at their frame rate until the next segment starts (the last one until end)
+    epochs = []
+    for i, segment in enumerate(segments):
+        if segment.frame_times is not None:
+            times = segment.frame_times
+        else:
+            stop = segments[i + 1].start if i + 1 < len(segments) else end
+            if stop is None:
+                return None
+            times = np.arange(0, max(stop - segment.start, 0), 1 / segment.fps)
+        epochs.append(segment.start + times)
+    return np.concatenate(epochs) if epochs else np.array([])
+
+
+def _feed(segments, fd):
+    with os.fdopen(fd, "wb") as pipe:
+        try:
+            for segment in segments:
+                with open(segment.path, "rb") as f:
+                    for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+                        pipe.write(block)
+        except BrokenPipeError:
+            pass  # ffmpeg stopped, its exit code is reported by the caller
+
+
+def merge(segments, output, log_path=None, layout="side", offset=0.0):
+    # Returns the number of camera frames (None if unknown without telemetry)
+    fps = np.average([s.fps for s in segments],
+                     weights=[len(s.frame_times) if s.frame_times is not None else 1 for s in segments])
+    read_fd, write_fd = os.pipe()
+    camera_input = ["-f", "h264", "-framerate", f"{fps:.3f}", "-i", f"pipe:{read_fd}"]
+
+    if log_path is None:
+        # Only the camera: remux without re-encoding
+        command = [FFMPEG, "-loglevel", "error", "-y", *camera_input, "-c", "copy", output]
+        encoder = subprocess.Popen(command, pass_fds=(read_fd,))
+        os.close(read_fd)
+        _feed(segments, write_fd)
+        encoder.wait()
+        if encoder.returncode:
+            raise RuntimeError(f"ffmpeg failed with exit code {encoder.returncode}")
+        epochs = frame_epochs(segments)
+        return None if epochs is None else len(epochs)
+
+    df = load_for_video(log_path)
+    log_start = start_epoch(df)
+    if log_start is None:
+        raise ValueError(f"{log_path} has no wall clock time, it cannot be synchronized with the video")
+    epochs = frame_epochs(segments, end=log_start + df["Time"].iloc[-1])
+    renderer = FrameRenderer(df)
+
+    if layout == "overlay":
+        graph = ("[1:v]scale=iw*0.45:-2,format=yuva420p,colorchannelmixer=aa=0.8[tel];"
+                 "[0:v][tel]overlay=W-w-10:10,format=yuv420p[out]")
+    else:
+        graph = "[0:v]scale=-2:720,setsar=1[cam];[1:v]scale=-2:720,setsar=1[tel];[cam][tel]hstack,format=yuv420p[out]"
+    command = [FFMPEG, "-loglevel", "error", "-y", *camera_input,
+               "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{renderer.width}x{renderer.height}",
+               "-framerate", f"{fps:.3f}", "-i", "-",
+               "-filter_complex", graph, "-map", "[out]",
+               "-c:v", "libx264", "-preset", "veryfast", "-crf", "20", output]
+    encoder = subprocess.Popen(command, stdin=subprocess.PIPE, pass_fds=(read_fd,))
+    os.close(read_fd)
+
+    # Both inputs are fed at the same time, otherwise ffmpeg and a full pipe could wait for each other
+    feeder = threading.Thread(target=_feed, args=(segments, write_fd), daemon=True)
+    feeder.start()
+    telemetry_times = epochs - log_start + offset
+    write_frames(encoder, (renderer.render(t) for t in telemetry_times))
+    feeder.join()
+    return len(epochs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge camera segments and add the telemetry dashboard")
+    parser.add_argument("directory", nargs="?", default=DEFAULT_DIR, help="directory with the .h264 segments")
+    parser.add_argument("log", nargs="?", help="flight log to show next to the video")
+    parser.add_argument("-o", "--output", default="output.mp4", help="output video (default: output.mp4)")
+    parser.add_argument("--layout", choices=("side", "overlay"), default="side",
+                        help="dashboard next to the video or over its corner")
+    parser.add_argument("--offset", type=float, default=0.0,
+                        help="seconds added to the telemetry time, to correct a clock difference")
+    args = parser.parse_args(argv)
+
+    segments = find_segments(args.directory)
+    if not segments:
+        print(f"⚠️ No .h264 files in {args.directory}")
+        return 1
+    for segment in segments:
+        print(f"  {datetime.datetime.fromtimestamp(segment.start):%Y-%m-%d %H:%M:%S.%f}  "
+              f"{segment.fps:6.2f} fps  {os.path.basename(segment.path)}")
+    frames = merge(segments, args.output, args.log, args.layout, args.offset)
+    print(f"🎬 {len(segments)} segment(s){'' if frames is None else f', {frames} frames'} written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())